@@ -2,9 +2,17 @@ __version__ = "1.0.0"
 __author__ = "phemi"
 
 from app.config import ConfigManager
-from app.ui import AcheiriaApp
 
 __all__ = [
     'ConfigManager',
     'AcheiriaApp',
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # The UI pulls in Flet; import it only when asked for, so headless
+    # entry points (app.cli, app.bench) start without it
+    if name == 'AcheiriaApp':
+        from app.ui import AcheiriaApp
+        return AcheiriaApp
+    raise AttributeError(f"module 'app' has no attribute {name!r}")
@@ -0,0 +1,276 @@
+"""
+Keystroke backends - pluggable keyboard injection
+"""
+
+import sys
+import time
+import logging
+import unicodedata
+from importlib.util import find_spec
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# pynput starts platform input machinery on import, so only check that it is
+# installed here; it is imported by the first PynputBackend
+HAS_PYNPUT = find_spec("pynput") is not None
+keyboard = None
+if not HAS_PYNPUT:
+    logger.error("pynput not installed")
+
+# Seconds after each paste for the target app to read the clipboard before
+# it is overwritten by the next chunk (or restored)
+PASTE_DELAY = 0.05
+
+
+def _load_pynput():
+    global keyboard
+    if keyboard is None:
+        from pynput import keyboard as pynput_keyboard
+        keyboard = pynput_keyboard
+        logger.info("pynput loaded")
+    return keyboard
+
+
+class KeyboardBackend:
+    """Base class for keystroke injection backends"""
+
+    name = "base"
+
+    def type(self, text: str) -> bool:
+        """Inject text; return False if it could not be typed"""
+        raise NotImplementedError
+
+    def translate(self, char: str) -> Optional[object]:
+        """Translate a character to the backend's native key, None if untypeable"""
+        # Control characters are untypeable, except newline, tab and forward delete
+        if unicodedata.category(char) in ("Cc", "Cs", "Cn") and char not in "\n\r\t\x7f":
+            return None
+        return char
+
+    def send_key(self, key) -> bool:
+        """Send one translated key; return False if it was rejected"""
+        return self.type(key)
+
+    def send_keys(self, keys: Sequence) -> int:
+        """Send a run of translated keys in one call.
+
+        Returns how many keys were sent before the first rejected one, so
+        the caller can skip that key and resume without duplicating any.
+        """
+        for sent, key in enumerate(keys):
+            if not self.send_key(key):
+                return sent
+        return len(keys)
+
+    def begin_session(self):
+        """Called once typing starts, after the countdown"""
+
+    def end_session(self):
+        """Called when typing ends, whether it completed, stopped or failed"""
+
+    def estimated_cps(self, run_size: int) -> Optional[float]:
+        """Expected unpaced throughput for runs of ``run_size``; None if unknown"""
+        return None
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+
+class PynputBackend(KeyboardBackend):
+    """Injects keystrokes into the focused window via pynput"""
+
+    name = "pynput"
+
+    def __init__(self):
+        if not HAS_PYNPUT:
+            raise RuntimeError("pynput not installed")
+        keyboard = _load_pynput()
+        self.controller = keyboard.Controller()
+        self._control_keys = {
+            "\n": keyboard.Key.enter,
+            "\r": keyboard.Key.enter,
+            "\t": keyboard.Key.tab,
+            # Forward delete, e.g. of an editor's auto-inserted closer
+            "\x7f": keyboard.Key.delete,
+        }
+
+    def type(self, text: str) -> bool:
+        try:
+            self.controller.type(text)
+            return True
+        except Exception:
+            if len(text) > 1:
+                # A run failed part-way: fall back to one key at a time
+                return all([self._type_char(char) for char in text])
+            return self._type_char(text)
+
+    def _type_char(self, char: str) -> bool:
+        try:
+            self.controller.type(char)
+            return True
+        except Exception:
+            try:
+                self.controller.press(char)
+                self.controller.release(char)
+                return True
+            except Exception:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"skipped: {repr(char)}")
+                return False
+
+    def translate(self, char: str) -> Optional[object]:
+        key = self._control_keys.get(char)
+        if key is not None:
+            return key
+        if super().translate(char) is None:
+            return None
+        return keyboard.KeyCode.from_char(char)
+
+    def send_key(self, key) -> bool:
+        try:
+            self.controller.press(key)
+            self.controller.release(key)
+            return True
+        except Exception:
+            return False
+
+    def send_keys(self, keys: Sequence) -> int:
+        press = self.controller.press
+        release = self.controller.release
+        sent = 0
+        try:
+            for key in keys:
+                press(key)
+                release(key)
+                sent += 1
+        except Exception:
+            pass
+        return sent
+
+    def probe(self):
+        """Tap shift to check accessibility permissions; raises if denied"""
+        self.controller.press(keyboard.Key.shift)
+        self.controller.release(keyboard.Key.shift)
+
+
+class ClipboardBackend(KeyboardBackend):
+    """Pastes each run through the clipboard - turbo mode for bulk text.
+
+    A run is put on the clipboard and the platform paste shortcut is sent,
+    so one backend call types a whole chunk. The user's clipboard is saved
+    when a session begins and put back when it ends.
+    """
+
+    name = "clipboard"
+
+    def __init__(self, paste_delay: float = PASTE_DELAY):
+        if not HAS_PYNPUT:
+            raise RuntimeError("pynput not installed")
+        import pyperclip
+        keyboard = _load_pynput()
+        self.clipboard = pyperclip
+        self.controller = keyboard.Controller()
+        self.modifier = keyboard.Key.cmd if sys.platform == "darwin" else keyboard.Key.ctrl
+        self.paste_delay = paste_delay
+        self._saved: Optional[str] = None
+
+    def begin_session(self):
+        try:
+            self._saved = self.clipboard.paste()
+        except Exception as e:
+            logger.warning(f"could not save clipboard: {e}")
+            self._saved = None
+
+    def end_session(self):
+        if self._saved is None:
+            return
+        try:
+            self.clipboard.copy(self._saved)
+            logger.info("clipboard restored")
+        except Exception as e:
+            logger.warning(f"could not restore clipboard: {e}")
+        self._saved = None
+
+    def estimated_cps(self, run_size: int) -> Optional[float]:
+        return run_size / self.paste_delay
+
+    def translate(self, char: str) -> Optional[object]:
+        # A paste never triggers auto-pairing, so there is nothing to delete
+        if char == "\x7f":
+            return None
+        return super().translate(char)
+
+    def type(self, text: str) -> bool:
+        try:
+            self.clipboard.copy(text)
+            with self.controller.pressed(self.modifier):
+                self.controller.press("v")
+                self.controller.release("v")
+        except Exception as e:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"paste failed: {e}")
+            return False
+        # The target app reads the clipboard asynchronously
+        time.sleep(self.paste_delay)
+        return True
+
+    def send_keys(self, keys: Sequence) -> int:
+        return len(keys) if self.type("".join(keys)) else 0
+
+
+class NullBackend(KeyboardBackend):
+    """Accepts every keystroke and does nothing - for headless benchmarks"""
+
+    name = "null"
+
+    def type(self, text: str) -> bool:
+        return True
+
+    def send_key(self, key) -> bool:
+        return True
+
+    def send_keys(self, keys: Sequence) -> int:
+        return len(keys)
+
+
+class RecordingBackend(KeyboardBackend):
+    """Records injected text and monotonic timestamps in memory"""
+
+    name = "recording"
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.events: List[Tuple[float, str]] = []
+
+    def type(self, text: str) -> bool:
+        self.events.append((self.clock(), text))
+        return True
+
+    def send_keys(self, keys: Sequence) -> int:
+        self.events.append((self.clock(), "".join(keys)))
+        return len(keys)
+
+    @property
+    def text(self) -> str:
+        return "".join(t for _, t in self.events)
+
+    def clear(self):
+        self.events.clear()
+
+
+BACKENDS = {
+    PynputBackend.name: PynputBackend,
+    ClipboardBackend.name: ClipboardBackend,
+    NullBackend.name: NullBackend,
+    RecordingBackend.name: RecordingBackend,
+}
+
+
+def create_backend(name: str = "pynput") -> KeyboardBackend:
+    """Instantiate a backend by name"""
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"unknown keyboard backend: {name}")
+    return backend_cls()
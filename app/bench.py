@@ -0,0 +1,170 @@
+"""
+Benchmarks - headless throughput and pacing measurements for the typing engine
+
+Run with ``python -m app.bench``; no window, keyboard or display is needed.
+Exits non-zero when a paced run misses its rate by more than RATE_TOLERANCE
+or spends more than ``--cpu-budget`` CPU milliseconds per 1k characters.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Dict, Any, List
+
+from app.backends import NullBackend, RecordingBackend
+from app.engine import TypingEngine
+from app.pacing import JITTER_PERIOD, RATE_TOLERANCE
+from app.plan import BURST_MODES, BURST_OFF
+from app.telemetry import percentile
+
+# Corpus sizes in characters
+CORPUS_SIZES = {
+    "small": 2_000,
+    "medium": 200_000,
+    "large": 4_000_000,
+}
+
+# Speeds (wpm) and duration (s) for the paced scheduling-error runs
+PACED_SPEEDS = (60, 300, 600, 1000)
+PACED_SECONDS = 2.0
+
+# CPU milliseconds per 1k characters a paced run may use (idle waits included)
+PACED_CPU_BUDGET = 400.0
+
+_WORDS = (
+    "the quick brown fox jumps over lazy dog def return import class self "
+    "for while if else none true false print lambda yield async await"
+).split()
+
+
+def make_corpus(size: int, seed: int = 1) -> str:
+    """Deterministic text of roughly ``size`` characters with code-like lines"""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        indent = "    " * rng.randint(0, 3)
+        line = indent + " ".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 12)))
+        line += rng.choice(("", ":", "()", "(x, y)", ".", ","))
+        parts.append(line)
+        length += len(line) + 1
+    return "\n".join(parts)[:size]
+
+
+def bench_throughput(text: str, burst_mode: str = BURST_OFF) -> Dict[str, Any]:
+    """Drive the engine unpaced and measure raw hot-loop cost"""
+    engine = TypingEngine(NullBackend())
+    engine.burst_mode = burst_mode
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    engine.run(text, countdown=0, speed=None, settle_delay=0)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    chars = engine.typed
+    return {
+        "chars": chars,
+        "seconds": round(wall, 4),
+        "chars_per_sec": round(chars / wall) if wall else 0,
+        "cpu_ms_per_1k": round(cpu * 1000 / (chars / 1000), 4) if chars else 0,
+    }
+
+
+def bench_paced(speed: int, seconds: float = PACED_SECONDS,
+                burst_mode: str = BURST_OFF) -> Dict[str, Any]:
+    """Drive the engine at a target speed and measure scheduling error"""
+    cps = (speed * 5) / 60
+    # At least one full rhythm period, so the rate error is not skewed by it
+    text = make_corpus(max(JITTER_PERIOD + 1, int(cps * seconds)))
+    backend = RecordingBackend()
+    engine = TypingEngine(backend)
+    engine.burst_mode = burst_mode
+    engine.lateness_log = []
+    cpu_start = time.process_time()
+    engine.run(text, countdown=0, speed=speed, settle_delay=0)
+    cpu = time.process_time() - cpu_start
+
+    events = backend.events
+    span = events[-1][0] - events[0][0] if len(events) > 1 else 0
+    # The last run's characters are sent at its start, so exclude them
+    achieved_cps = (engine.typed - len(events[-1][1])) / span if span else 0
+    lateness_ms = [x * 1000 for x in engine.lateness_log]
+    return {
+        "wpm": speed,
+        "chars": engine.typed,
+        "calls": len(events),
+        "achieved_wpm": round(achieved_cps * 60 / 5, 1),
+        "rate_error_pct": round((achieved_cps / cps - 1) * 100, 2) if cps else 0,
+        "lateness_ms_p50": round(percentile(lateness_ms, 50), 3),
+        "lateness_ms_p90": round(percentile(lateness_ms, 90), 3),
+        "lateness_ms_p99": round(percentile(lateness_ms, 99), 3),
+        "lateness_ms_max": round(max(lateness_ms, default=0), 3),
+        "cpu_ms_per_1k": round(cpu * 1000 / (engine.typed / 1000), 4) if events else 0,
+    }
+
+
+def check_paced(result: Dict[str, Any], cpu_budget: float = PACED_CPU_BUDGET) -> List[str]:
+    """Why a paced run failed its budgets; empty if it passed"""
+    failures = []
+    if abs(result["rate_error_pct"]) > RATE_TOLERANCE * 100:
+        failures.append(f"rate error {result['rate_error_pct']}% over {RATE_TOLERANCE * 100:g}%")
+    if result["cpu_ms_per_1k"] > cpu_budget:
+        failures.append(f"{result['cpu_ms_per_1k']} cpu ms/1k over {cpu_budget:g}")
+    return failures
+
+
+def run_all(sizes=None, speeds=PACED_SPEEDS, seconds: float = PACED_SECONDS,
+            burst_mode: str = BURST_OFF) -> Dict[str, Any]:
+    sizes = sizes or list(CORPUS_SIZES)
+    results = {"burst_mode": burst_mode, "throughput": {}, "paced": []}
+    for name in sizes:
+        results["throughput"][name] = bench_throughput(make_corpus(CORPUS_SIZES[name]), burst_mode)
+    for speed in speeds:
+        results["paced"].append(bench_paced(speed, seconds, burst_mode))
+    return results
+
+
+def _print_results(results: Dict[str, Any], burst_mode: str):
+    print(f"throughput (unpaced, null backend, burst {burst_mode})")
+    for name, r in results["throughput"].items():
+        print(f"  {name:<7} {r['chars']:>9} chars  {r['chars_per_sec']:>10} chars/s  "
+              f"{r['cpu_ms_per_1k']:>8} cpu ms/1k")
+    print("pacing (recording backend)")
+    for r in results["paced"]:
+        print(f"  {r['wpm']:>5} wpm  achieved {r['achieved_wpm']:>7}  "
+              f"err {r['rate_error_pct']:>6}%  lateness p50/p90/p99 "
+              f"{r['lateness_ms_p50']}/{r['lateness_ms_p90']}/{r['lateness_ms_p99']} ms  "
+              f"{r['cpu_ms_per_1k']} cpu ms/1k")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.bench",
+                                     description="typing engine benchmarks")
+    parser.add_argument("--sizes", nargs="+", choices=list(CORPUS_SIZES),
+                        help="corpus sizes for the throughput runs (default: all)")
+    parser.add_argument("--speeds", nargs="+", type=int, default=list(PACED_SPEEDS),
+                        help="wpm values for the paced runs")
+    parser.add_argument("--seconds", type=float, default=PACED_SECONDS,
+                        help="duration of each paced run")
+    parser.add_argument("--burst", choices=BURST_MODES, default=BURST_OFF,
+                        help="burst injection mode")
+    parser.add_argument("--cpu-budget", type=float, default=PACED_CPU_BUDGET,
+                        help="cpu ms per 1k characters allowed in a paced run")
+    parser.add_argument("--json", action="store_true", help="print raw JSON")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.sizes, args.speeds, args.seconds, args.burst)
+    failures = [f"{r['wpm']} wpm: {failure}"
+                for r in results["paced"] for failure in check_paced(r, args.cpu_budget)]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_results(results, args.burst)
+    for failure in failures:
+        print(f"FAILED {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
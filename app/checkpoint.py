@@ -0,0 +1,152 @@
+"""
+Checkpoints - crash-safe resume points for long typing sessions
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from app.config import write_json_atomic
+from app.sources import MappedFileSource, TextSource
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checkpoint writes while typing
+CHECKPOINT_INTERVAL = 2.0
+
+CHECKPOINT_VERSION = 1
+
+
+class CheckpointStore:
+    """Reads and writes the single resumable session in ~/.acheiria"""
+
+    def __init__(self, path: Optional[Path] = None):
+        if path is None:
+            config_dir = Path.home() / '.acheiria'
+            config_dir.mkdir(exist_ok=True)
+            path = config_dir / 'checkpoint.json'
+        self.path = Path(path)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get("version") != CHECKPOINT_VERSION:
+                return None
+            return data
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"ignoring unreadable checkpoint: {e}")
+            return None
+
+    def save(self, data: Dict[str, Any]):
+        write_json_atomic(self.path, data)
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def find(self, source: TextSource,
+             data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Return the checkpoint (``data`` or the saved one) if source can resume from it"""
+        if data is None:
+            data = self.load()
+        if not data or data.get("total") != source.total:
+            # Cheap size check first; only hash when it could match
+            return None
+        if not 0 < data.get("chars", 0):
+            return None
+        if data.get("fingerprint") != source.fingerprint():
+            return None
+        return data
+
+
+def describe_source(source: TextSource) -> Dict[str, Any]:
+    """Where a checkpointed source came from, so it can be reopened"""
+    if isinstance(source, MappedFileSource):
+        return {"kind": "file", "path": str(source.path)}
+    return {"kind": "text"}
+
+
+class Checkpointer:
+    """Persists an engine's confirmed position from a background thread.
+
+    The typing loop only updates ``engine.chars_typed`` / ``engine.typed``;
+    this thread samples them every ``interval`` seconds, so the hot loop never
+    does any I/O. A final checkpoint is written when the session stops or
+    fails, and the checkpoint is removed when it completes.
+    """
+
+    def __init__(self, store: CheckpointStore, interval: float = CHECKPOINT_INTERVAL):
+        self.store = store
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._engine = None
+        self._record: Optional[Dict[str, Any]] = None
+        self._written_chars = -1
+
+    def begin(self, engine, source: TextSource, settings: Dict[str, Any]):
+        self.end(success=False)
+        self._engine = engine
+        self._record = {
+            "version": CHECKPOINT_VERSION,
+            "source": describe_source(source),
+            "total": source.total,
+            "unit": source.unit,
+            "settings": settings,
+        }
+        self._written_chars = -1
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(source,), daemon=True)
+        self._thread.start()
+
+    def end(self, success: bool):
+        """Stop checkpointing; keep the final position unless the run completed"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+        try:
+            if success:
+                self.store.clear()
+            else:
+                self._write()
+        except Exception as e:
+            logger.error(f"checkpoint error: {e}", exc_info=True)
+        self._engine = None
+
+    def _loop(self, source: TextSource):
+        try:
+            # Hash off the typing thread; large files take a moment
+            self._record["fingerprint"] = source.fingerprint()
+        except Exception as e:
+            logger.error(f"checkpoint fingerprint failed: {e}")
+            return
+        while not self._stop.wait(self.interval):
+            try:
+                self._write()
+            except Exception as e:
+                logger.debug(f"checkpoint write failed: {e}")
+
+    def _write(self):
+        record, engine = self._record, self._engine
+        if record is None or engine is None or "fingerprint" not in record:
+            return
+        chars = engine.chars_typed
+        if chars == self._written_chars:
+            return
+        record["chars"] = chars
+        record["offset"] = engine.typed
+        record["updated"] = time.time()
+        self.store.save(record)
+        self._written_chars = chars
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"checkpoint at {chars} chars")
@@ -0,0 +1,249 @@
+"""
+Command Line - headless typing without starting Flet
+
+    python main.py type --file notes.txt --wpm 400 --delay 5
+    cat notes.txt | python main.py type --wpm 400
+    python main.py type --file big.txt --turbo --turbo-chunk 4000
+    python main.py type --file notes.txt --wpm 400 --isolate
+"""
+
+import argparse
+import logging
+import math
+import sys
+import threading
+from typing import List, Optional
+
+from app.backends import BACKENDS, PASTE_DELAY, create_backend
+from app.checkpoint import CHECKPOINT_INTERVAL, Checkpointer, CheckpointStore
+from app.config import ConfigManager
+from app.engine import TypingEngine, format_time, parse_time
+from app.logs import setup_logging, stop_logging
+from app.pacing import wpm_to_cps
+from app.plan import BURST_MODES
+from app.preprocess import STAGES, create_pipeline
+from app.process import ENGINE_LOG, EngineProcess, serve
+from app.sources import MappedFileSource, StringSource
+from app.telemetry import SessionTelemetry, default_report_path, summary_line
+from app.timing import PROFILES
+
+logger = logging.getLogger(__name__)
+
+# Seconds between progress line refreshes
+PROGRESS_INTERVAL = 0.25
+
+
+def build_parser(config) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="acheiria", description="acheiria: nuturing laziness in youths")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    type_cmd = commands.add_parser("type", help="type a file or stdin into the focused window")
+    source = type_cmd.add_mutually_exclusive_group()
+    source.add_argument("--file", "-f", help="file to type (memory-mapped, any size)")
+    source.add_argument("--text", "-t", help="text to type")
+    type_cmd.add_argument("--wpm", type=int, default=config.get('typing_speed', 60),
+                          help="typing speed in words per minute")
+    type_cmd.add_argument("--duration", "-d", type=parse_time, default=None,
+                          help="finish in this long instead (e.g. 12m, 1h30m, 12:00); any wpm")
+    type_cmd.add_argument("--delay", type=int, default=int(config.get('countdown_duration', 4)),
+                          help="whole seconds to wait before typing")
+    type_cmd.add_argument("--burst", choices=BURST_MODES, default=config.get('burst_mode', 'off'),
+                          help="send whole words or chunks per keystroke call")
+    type_cmd.add_argument("--burst-size", type=int, default=config.get('burst_size', 32))
+    type_cmd.add_argument("--turbo", action="store_true", default=config.get('turbo_mode', False),
+                          help="paste chunks through the clipboard instead of typing")
+    type_cmd.add_argument("--turbo-chunk", type=int, default=config.get('turbo_chunk_size', 2000),
+                          help="characters per paste in turbo mode")
+    type_cmd.add_argument("--profile", choices=PROFILES, default=config.get('timing_profile', 'sawtooth'),
+                          help="inter-key timing profile")
+    type_cmd.add_argument("--preprocess", default=",".join(config.get('preprocess', [])),
+                          help=f"comma-separated stages to run first ({', '.join(STAGES)}), '' for none")
+    type_cmd.add_argument("--tab-width", type=int, default=config.get('tab_width', 4),
+                          help="spaces per tab for the 'tabs' stage")
+    type_cmd.add_argument("--backend", choices=sorted(BACKENDS), default="pynput",
+                          help="keystroke backend ('null' types nothing, for dry runs)")
+    type_cmd.add_argument("--isolate", action="store_true", default=config.get('engine_process', False),
+                          help="type from a separate process")
+    type_cmd.add_argument("--resume", action="store_true",
+                          help="continue from the saved checkpoint for this input")
+    type_cmd.add_argument("--quiet", "-q", action="store_true", help="no progress output")
+
+    engine_cmd = commands.add_parser("engine", help="internal: the process behind --isolate")
+    engine_cmd.add_argument("--block", required=True, help="progress block to write")
+    engine_cmd.add_argument("--backend", choices=sorted(BACKENDS), default="pynput")
+    return parser
+
+
+def _read_source(args):
+    if args.file:
+        return MappedFileSource(args.file)
+    if args.text is not None:
+        return StringSource(args.text)
+    if sys.stdin.isatty():
+        print("reading text from stdin, end with Ctrl-D", file=sys.stderr)
+    return StringSource(sys.stdin.read())
+
+
+def _print_progress(engine: TypingEngine, estimated: float, final: bool = False):
+    total = max(1, engine.total)
+    elapsed = engine.elapsed()
+    remaining = engine.remaining_time()
+    if remaining is None:
+        remaining = max(0, estimated - elapsed)
+    line = (f"\r{int(engine.typed / total * 100):3d}%  {engine.typed}/{engine.total} {engine.unit}"
+            f"  elapsed {format_time(elapsed)}  remaining ~{format_time(remaining)}")
+    sys.stderr.write(line.ljust(72) + ("\n" if final else ""))
+    sys.stderr.flush()
+
+
+def run_type(args, config) -> int:
+    try:
+        source = _read_source(args)
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    if source.total == 0:
+        print("nothing to type", file=sys.stderr)
+        return 1
+
+    if args.isolate:
+        # Backends are created (and their errors reported) by the child
+        engine = EngineProcess(args.backend, max_catchup=config.get('max_catchup', 0.25),
+                               rate_control=config.get('rate_control', True))
+    else:
+        try:
+            backend = create_backend(args.backend)
+        except Exception as e:
+            print(f"error: keyboard backend unavailable: {e}", file=sys.stderr)
+            return 1
+        engine = TypingEngine(backend, max_catchup=config.get('max_catchup', 0.25),
+                              rate_control=config.get('rate_control', True))
+    engine.burst_mode = args.burst
+    engine.burst_size = max(1, args.burst_size)
+    engine.timing_profile = args.profile
+    try:
+        names = [name.strip() for name in args.preprocess.split(",") if name.strip()]
+        engine.preprocess = create_pipeline(names, args.tab_width)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    turbo_chunk = max(1, args.turbo_chunk) if args.turbo else 0
+    if turbo_chunk and not args.isolate:
+        try:
+            # Dry-run backends stand in for the clipboard too
+            engine.turbo_backend = create_backend("clipboard") if args.backend == "pynput" else backend
+        except Exception as e:
+            print(f"error: clipboard backend unavailable: {e}", file=sys.stderr)
+            return 1
+
+    store = CheckpointStore()
+    engine.checkpointer = Checkpointer(store, config.get('checkpoint_interval', CHECKPOINT_INTERVAL))
+    engine.telemetry = SessionTelemetry()
+
+    start_chars, start_offset = 0, 0
+    if args.resume:
+        checkpoint = store.find(source)
+        if checkpoint is None:
+            print("no checkpoint for this input, starting from the beginning", file=sys.stderr)
+        else:
+            start_chars, start_offset = checkpoint['chars'], checkpoint.get('offset', 0)
+            print(f"resuming at {start_offset}/{source.total} {source.unit}", file=sys.stderr)
+
+    speed = max(1, args.wpm)
+    keystrokes = source.total - start_offset
+    pipeline = create_pipeline(names, args.tab_width)
+    if pipeline is not None and turbo_chunk:
+        pipeline = pipeline.for_paste()
+    if pipeline is not None and isinstance(source, StringSource):
+        keystrokes = pipeline.count(source.iter_pieces(), start_chars)
+    budget = args.duration if not turbo_chunk else None
+    if budget is not None and budget <= 0:
+        print("error: --duration must be positive", file=sys.stderr)
+        return 1
+    if turbo_chunk:
+        estimated = math.ceil(keystrokes / turbo_chunk) * PASTE_DELAY
+    elif budget:
+        estimated = budget
+    else:
+        estimated = keystrokes / wpm_to_cps(speed)
+    result = {}
+    done = threading.Event()
+
+    def on_status(text: str):
+        if not args.quiet:
+            sys.stderr.write("\r" + text.strip().ljust(72))
+            sys.stderr.flush()
+
+    def on_complete(success: bool, message: str):
+        result['success'] = success
+        result['message'] = message
+        done.set()
+
+    engine.on_status = on_status
+    engine.on_complete = on_complete
+
+    countdown = max(0, args.delay)
+    if not args.quiet:
+        if turbo_chunk:
+            pace = f"in turbo mode ({turbo_chunk} chars per paste)"
+        elif budget:
+            pace = f"in {format_time(budget)} (~{keystrokes / budget * 12:.0f} wpm)"
+        else:
+            pace = f"at {speed} wpm"
+        print(f"typing {source.describe()} {pace}, est. {format_time(estimated)}",
+              file=sys.stderr)
+
+    worker = threading.Thread(
+        target=engine.run,
+        args=(source, countdown, speed),
+        kwargs={'start_chars': start_chars, 'turbo_chunk': turbo_chunk, 'budget': budget,
+                'start_offset': start_offset},
+        daemon=True,
+    )
+    worker.start()
+    # Wait on an Event rather than join(): an interrupted join can leave the
+    # thread looking finished while it is still typing
+    try:
+        while not done.wait(PROGRESS_INTERVAL):
+            if not args.quiet and engine.start_time is not None:
+                _print_progress(engine, estimated)
+    except KeyboardInterrupt:
+        engine.stop()
+        try:
+            done.wait()
+        except KeyboardInterrupt:
+            # Pressed again while the run was still winding down
+            print("\ninterrupted", file=sys.stderr)
+            return 130
+
+    if not args.quiet and engine.start_time is not None:
+        _print_progress(engine, estimated, final=True)
+    message = result.get('message', 'stopped')
+    print(message, file=sys.stderr)
+    report = engine.telemetry.report
+    if report and not args.quiet:
+        print(f"{summary_line(report)} (report: {default_report_path()})", file=sys.stderr)
+    if not result.get('success') and engine.start_time is not None:
+        print("resume with --resume", file=sys.stderr)
+    if args.isolate:
+        engine.close()
+    return 0 if result.get('success') else 1
+
+
+def run_engine(args) -> int:
+    # A log of its own: two processes can't share a rotating file
+    stop_logging()
+    setup_logging(console=False, name=ENGINE_LOG)
+    return serve(args.block, args.backend)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for ``python main.py <command> ...``"""
+    # Read-only: scripted runs shouldn't leave a config.json in the cwd
+    config = ConfigManager().load_config(create=False)
+    args = build_parser(config).parse_args(argv)
+    if args.command == "type":
+        return run_type(args, config)
+    if args.command == "engine":
+        return run_engine(args)
+    return 2
@@ -2,18 +2,45 @@
 Configuration Manager - Fixed for bundled apps
 """
 
+import atexit
+import copy
 import json
 import logging
+import os
 import sys
+import tempfile
+import threading
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Seconds of quiet after the last change before the config is written
+SAVE_DEBOUNCE = 0.75
+
+
+def write_json_atomic(path: Path, data: Any):
+    """Write JSON to a temp file in the same directory, then rename over path"""
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
 class ConfigManager:
     """Manages application configuration and settings"""
     
-    def __init__(self, config_file: str = "config.json"):
+    def __init__(self, config_file: str = "config.json", save_delay: float = SAVE_DEBOUNCE):
         # Get user's home directory for config (writable in bundled apps)
         if getattr(sys, 'frozen', False):
             # Running as bundled app
@@ -28,35 +55,131 @@ class ConfigManager:
         
         self.default_config = {
             "typing_speed": 60,
+            "time_budget": "",
             "countdown_duration": 4,
+            "max_catchup": 0.25,
+            "rate_control": True,
+            "engine_process": False,
+            "burst_mode": "off",
+            "burst_size": 32,
+            "turbo_mode": False,
+            "turbo_chunk_size": 2000,
+            "timing_profile": "sawtooth",
+            "preprocess": ["crlf"],
+            "tab_width": 4,
+            "ui_refresh_hz": 12,
+            "checkpoint_interval": 2.0,
             "always_on_top": True,
             "window_position": {"x": 100, "y": 100},
             "first_run": False,
         }
+        
+        # Write-behind state
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
+        
+        # Parsed config, valid while the file's (mtime, size) is unchanged
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_key: Optional[Tuple[int, int]] = None
+    
+    def load_config(self, create: bool = True) -> Dict[str, Any]:
+        """Return a private copy of the config, re-reading only if the file changed.
+        
+        A missing file is written with the defaults unless ``create`` is False.
+        """
+        return copy.deepcopy(self._current(create))
+    
+    def view(self) -> Mapping[str, Any]:
+        """Read-only view of the current config, without copying"""
+        return MappingProxyType(self._current())
     
-    def load_config(self) -> Dict[str, Any]:
+    def _current(self, create: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            if self._pending is not None:
+                # Unflushed changes are newer than the file
+                return self._pending
+            cached = self._cache
         try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    merged_config = self.default_config.copy()
-                    merged_config.update(config)
-                    logger.info("Configuration loaded successfully")
-                    return merged_config
-            else:
+            key = self._stat_key()
+            if key is None:
+                if not create:
+                    return self.default_config
                 logger.info("Config file not found, creating default")
-                self.save_config(self.default_config)
-                return self.default_config.copy()
+                self.save_config(self.default_config, immediate=True)
+                return self._cache if self._cache is not None else self.default_config
+            if cached is not None and key == self._cache_key:
+                return cached
+            with open(self.config_file, 'r') as f:
+                config = json.load(f)
+            merged_config = self.default_config.copy()
+            merged_config.update(config)
+            with self._lock:
+                self._cache = merged_config
+                self._cache_key = key
+            logger.info("Configuration loaded successfully")
+            return merged_config
         except Exception as e:
             logger.error(f"Error loading config: {e}", exc_info=True)
-            return self.default_config.copy()
+            return cached if cached is not None else self.default_config
+    
+    def _stat_key(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.config_file)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
     
-    def save_config(self, config: Dict[str, Any]) -> bool:
+    def save_config(self, config: Dict[str, Any], immediate: bool = False) -> bool:
+        """Queue config for writing; it is flushed once changes settle"""
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
-            logger.info("Configuration saved successfully")
-            return True
+            # Snapshot now so later mutation by the caller can't leak in
+            snapshot = json.loads(json.dumps(config))
         except Exception as e:
             logger.error(f"Error saving config: {e}", exc_info=True)
-            return False
\ No newline at end of file
+            return False
+        
+        with self._lock:
+            self._pending = snapshot
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not immediate and self.save_delay > 0:
+                self._timer = threading.Timer(self.save_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+                return True
+        return self.flush()
+    
+    def update_config(self, changes: Dict[str, Any]) -> bool:
+        """Merge changes into the current config and queue it for writing"""
+        config = self.load_config()
+        config.update(changes)
+        return self.save_config(config)
+    
+    def flush(self) -> bool:
+        """Write pending changes to disk now, atomically"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            config = self._pending
+            if config is None:
+                return True
+            try:
+                write_json_atomic(self.config_file, config)
+                self._pending = None
+                # What we just wrote is the new cache; no need to parse it back
+                self._cache = config
+                self._cache_key = self._stat_key()
+                logger.debug("Configuration saved successfully")
+                return True
+            except Exception as e:
+                logger.error(f"Error saving config: {e}", exc_info=True)
+                return False
+    
+    @property
+    def dirty(self) -> bool:
+        return self._pending is not None
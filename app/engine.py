@@ -0,0 +1,552 @@
+"""
+Typing Engine - paced keystroke injection, independent of the UI
+"""
+
+import re
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Union
+
+from app.backends import KeyboardBackend
+from app.pacing import (
+    BudgetPlanner, DeadlineScheduler, RateController, RateEstimator, wpm_to_cps,
+)
+from app.plan import BURST_CHUNKS, BURST_OFF, KeyTable, compile_plan
+from app.sources import StringSource, TextSource
+from app.timing import PROFILE_SAWTOOTH, create_profile
+
+logger = logging.getLogger(__name__)
+
+# Chunks compiled ahead during the countdown; bounds memory for huge sources
+PRECOMPILE_CHUNKS = 64
+
+# Runs sent later than this (seconds) are logged at debug level
+LATE_LOG_THRESHOLD = 0.02
+
+
+class TypingEngine:
+    """Types text through a keyboard backend at a target speed.
+
+    The engine knows nothing about Flet: the UI (or a benchmark) hooks the
+    ``on_*`` callbacks, which are called from the thread running ``run``.
+
+    ``stop``, ``pause`` and ``resume`` signal events, so any thread can call
+    them and the typing thread reacts at once: its sleeps wake early and a
+    paused session blocks without polling. A custom ``sleep`` (e.g. a fake
+    clock's) replaces the interruptible one.
+    """
+
+    def __init__(self, backend: KeyboardBackend, max_catchup: float = 0.25,
+                 clock=time.monotonic, sleep=None, rate_control: bool = True):
+        self.backend = backend
+        self.max_catchup = max_catchup
+        self.rate_control = rate_control
+        self.clock = clock
+        self.sleep = sleep if sleep is not None else self._sleep
+
+        # Control signals: _wake interrupts sleeps, _running is clear while paused
+        self._wake = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        self._prepared = False
+
+        # State
+        self.is_typing = False
+        self.is_paused = False
+        self.stop_requested = False
+        self.start_time = None
+        self.typed = 0
+        self.chars_typed = 0
+        self.total = 0
+        self.unit = "chars"
+
+        # Hooks
+        self.on_status: Optional[Callable[[str], None]] = None
+        self.on_started: Optional[Callable[[], None]] = None
+        self.on_progress: Optional[Callable[[int, int], None]] = None
+        self.on_complete: Optional[Callable[[bool, str], None]] = None
+        self.progress_every = 20
+
+        # Burst injection
+        self.burst_mode = BURST_OFF
+        self.burst_size = 32
+
+        # Backend for turbo runs (e.g. app.backends.ClipboardBackend)
+        self.turbo_backend: Optional[KeyboardBackend] = None
+        self._session_backend: Optional[KeyboardBackend] = None
+
+        # Optional app.preprocess.Pipeline, run over the text before compiling
+        self.preprocess = None
+        self._pipeline = None
+
+        # Inter-key delay profile (see app.timing); planned_duration is the
+        # exact typing time once the whole plan compiled during the countdown
+        self.timing_profile = PROFILE_SAWTOOTH
+        self.planned_duration: Optional[float] = None
+
+        # Memoized char -> key translation, reused across runs
+        self.table: Optional[KeyTable] = None
+        self._reported_skipped = 0
+
+        # Optional app.checkpoint.Checkpointer, started once typing begins
+        self.checkpointer = None
+        self._checkpointing = False
+
+        # Throughput average behind remaining_time(), set for paced runs
+        self.rate_estimator: Optional[RateEstimator] = None
+
+        # End of a time-budgeted session, once typing has started
+        self.deadline: Optional[float] = None
+
+        # Per-keystroke scheduling lateness, collected only when set to a list
+        self.lateness_log: Optional[List[float]] = None
+
+        # Optional app.telemetry.SessionTelemetry, reported after each session
+        self.telemetry = None
+        self._recording = False
+
+    def stop(self):
+        self.stop_requested = True
+        self._running.set()
+        self._wake.set()
+
+    def pause(self):
+        self.is_paused = True
+        self._running.clear()
+        self._wake.set()
+
+    def resume(self):
+        self.is_paused = False
+        self._running.set()
+
+    def prepare(self):
+        """Clear stop and pause ahead of ``run``.
+
+        ``run`` does this itself; call it earlier (e.g. when a job is taken
+        off a queue) so a stop signalled before ``run`` starts is kept.
+        """
+        self.is_paused = False
+        self.stop_requested = False
+        self._running.set()
+        self._wake.clear()
+        self._prepared = True
+
+    def _sleep(self, seconds: float) -> bool:
+        """Sleep unless stopped or paused; True if woken early"""
+        return self._wake.wait(seconds)
+
+    def _hold(self) -> float:
+        """Block while paused, without waking; return the time spent paused"""
+        started = self.clock()
+        while self.is_paused and not self.stop_requested:
+            self._running.wait()
+        self._wake.clear()
+        if self.is_paused or self.stop_requested:
+            # Paused or stopped again right after waking: keep sleeps interrupted
+            self._wake.set()
+        return self.clock() - started
+
+    def elapsed(self) -> float:
+        """Seconds spent typing so far, excluding pauses"""
+        if self.start_time is None:
+            return 0.0
+        return self.clock() - self.start_time
+
+    def remaining_time(self) -> Optional[float]:
+        """Seconds left at the observed (EWMA) throughput; None if unknown.
+
+        Meant for a single reader such as the UI timer; it never touches the
+        typing thread's state beyond reading ``typed``.
+        """
+        if self.deadline is not None:
+            return max(0.0, self.deadline - self.clock())
+        estimator = self.rate_estimator
+        if estimator is None or self.start_time is None:
+            return None
+        typed = self.typed
+        if typed:
+            estimator.update(self.elapsed(), typed)
+        return estimator.remaining(self.total - typed)
+
+    def _send_run(self, ids, start: int, end: int, send_keys):
+        """Send ids[start:end] in one backend call, skipping rejected keys"""
+        keys = self.table.keys
+        pending = [k for k in ids[start:end] if keys[k] is not None]
+        while pending:
+            sent = send_keys([keys[k] for k in pending])
+            if sent >= len(pending):
+                return
+            self.table.mark_failed(pending[sent])
+            # Resume after the rejected key
+            pending = [k for k in pending[sent + 1:] if keys[k] is not None]
+
+    def _report_skipped(self, skipped: Dict[str, int]):
+        """Tell the user about untypeable characters, once per new character"""
+        if len(skipped) == self._reported_skipped:
+            return
+        self._reported_skipped = len(skipped)
+        count = sum(skipped.values())
+        sample = " ".join(repr(c) for c in list(skipped)[:5])
+        logger.warning(f"skipping {count} untypeable characters: {sample}")
+        self._emit(self.on_status, f"skipping {count} untypeable chars ({sample})")
+
+    def _emit(self, hook, *args):
+        if hook is not None:
+            hook(*args)
+
+    def run(self, text: Union[str, TextSource], countdown: int = 0,
+            speed: Optional[int] = 60, settle_delay: float = 0.2, start_chars: int = 0,
+            turbo_chunk: int = 0, budget: Optional[float] = None, start_offset: int = 0):
+        """Type text or a TextSource synchronously; ``speed=None`` types unpaced.
+
+        ``start_chars`` resumes a previous session that had already typed
+        that many characters of the same source, ``start_offset`` units in
+        (progress starts there). A ``turbo_chunk`` sends
+        unpaced chunks of that many characters through ``turbo_backend``.
+        A ``budget`` in seconds replaces ``speed``: the rate is re-solved as
+        typing goes so the session ends that long after it starts, pauses
+        and stalls included.
+        """
+        source = StringSource(text) if isinstance(text, str) else text
+        if not self._prepared:
+            self.prepare()
+        self._prepared = False
+        self.is_typing = True
+        self.start_time = None
+        self.typed = start_offset
+        self.chars_typed = start_chars
+        self.total = source.total
+        self.unit = source.unit
+        if turbo_chunk:
+            if self.turbo_backend is None:
+                raise ValueError("turbo mode needs a turbo_backend")
+            backend, speed = self.turbo_backend, None
+            burst_mode, burst_size = BURST_CHUNKS, max(1, turbo_chunk)
+        else:
+            backend, burst_mode, burst_size = self.backend, self.burst_mode, self.burst_size
+        if turbo_chunk or not budget:
+            budget = None
+        pipeline = self.preprocess
+        if turbo_chunk and pipeline is not None:
+            # A paste is not auto-indented or auto-paired
+            pipeline = pipeline.for_paste()
+        self._pipeline = pipeline
+        rate = wpm_to_cps(speed) if speed else backend.estimated_cps(burst_size)
+        self.rate_estimator = RateEstimator(rate) if rate and not budget else None
+        self.planned_duration = budget
+        self.deadline = None
+        self._reported_skipped = 0
+        self._checkpointing = False
+        self._recording = False
+        if self.telemetry is not None:
+            # Only a run that starts typing reports; never show the last one's
+            self.telemetry.report = None
+        self._session_backend = None
+        try:
+            success, message = self._run(source, countdown, speed, settle_delay, start_chars,
+                                         backend, burst_mode, burst_size, budget)
+        except Exception as e:
+            logger.error(f"typing error: {e}", exc_info=True)
+            success, message = False, f"error: {str(e)}"
+        finally:
+            self.is_typing = False
+            if self._session_backend is not None:
+                self._session_backend.end_session()
+        if self._checkpointing:
+            self.checkpointer.end(success)
+        if self._recording:
+            try:
+                self.telemetry.end(self.clock(), success, source.describe())
+            except Exception as e:
+                logger.error(f"telemetry error: {e}", exc_info=True)
+        self._emit(self.on_complete, success, message)
+
+    def _run(self, source: TextSource, countdown: int, speed: Optional[int],
+             settle_delay: float, start_chars: int, backend: KeyboardBackend,
+             burst_mode: str, burst_size: int, budget: Optional[float] = None):
+        if self.table is None or self.table.backend is not backend:
+            self.table = KeyTable(backend)
+        skipped: Dict[str, int] = {}
+        pipeline = self._pipeline
+        if pipeline is not None:
+            # From the start: the pipeline rewinds to the resumed line itself
+            pipeline.reset()
+            pieces = pipeline.run(source.iter_pieces(), start_chars)
+        else:
+            pieces = source.iter_pieces(start_chars)
+        compiler = compile_plan(pieces, self.table, skipped,
+                                burst_mode, burst_size, start_chars=start_chars,
+                                profile=create_profile(self.timing_profile))
+        compiled = deque()
+
+        # Schedule length (summed steps) and source span compiled so far,
+        # from which a time budget extrapolates the rest
+        plan_steps = 0.0
+        plan_start = plan_end = None
+
+        def account(chunk):
+            nonlocal plan_steps, plan_start, plan_end
+            if len(chunk.offsets):
+                plan_steps += sum(chunk.steps)
+                if plan_start is None:
+                    plan_start = chunk.offsets[0]
+                plan_end = chunk.offsets[-1]
+
+        def total_position() -> float:
+            if compiler is None or plan_end is None:
+                return plan_steps if plan_end is not None else float(self.total)
+            span = plan_end - plan_start
+            per_unit = plan_steps / span if span > 0 else 1.0
+            return plan_steps + (self.total - plan_end) * per_unit
+
+        # Countdown, compiling the plan while the user positions the cursor
+        for i in range(countdown, 0, -1):
+            if self.stop_requested:
+                logger.info("cancelled during countdown")
+                return False, "stopped by user"
+            self._emit(self.on_status, f" {i}s to put your cursor where you want to type")
+            tick_end = self.clock() + 1
+            while (compiler is not None and len(compiled) < PRECOMPILE_CHUNKS
+                   and not self._wake.is_set() and self.clock() < tick_end):
+                chunk = next(compiler, None)
+                if chunk is None:
+                    compiler = None
+                    # A budget is the plan already; don't overwrite it
+                    if not budget:
+                        self._plan_duration(compiled, speed, settle_delay)
+                else:
+                    account(chunk)
+                    compiled.append(chunk)
+            self._report_skipped(skipped)
+            while True:
+                remaining = tick_end - self.clock()
+                if remaining <= 0 or not self.sleep(remaining):
+                    break
+                # Woken early: a pause holds the countdown, a stop ends it
+                if self.stop_requested:
+                    logger.info("cancelled during countdown")
+                    return False, "stopped by user"
+                tick_end += self._hold()
+
+        # Start typing
+        self.start_time = self.clock()
+        self._emit(self.on_status, "typing now...")
+        self._emit(self.on_started)
+        if self.checkpointer is not None:
+            self.checkpointer.begin(self, source, {
+                "speed": speed,
+                "burst_mode": burst_mode,
+                "burst_size": burst_size,
+                "turbo": backend is not self.backend,
+                "timing_profile": self.timing_profile,
+                "preprocess": pipeline.names if pipeline is not None else [],
+                "budget": budget,
+            })
+            self._checkpointing = True
+        backend.begin_session()
+        self._session_backend = backend
+
+        if budget:
+            self.deadline = self.start_time + budget
+        if settle_delay:
+            self.sleep(settle_delay)
+
+        total = self.total
+        scheduler = None
+        controller = None
+        planner = None
+        if budget:
+            scheduler = DeadlineScheduler(1.0, max_catchup=self.max_catchup,
+                                          clock=self.clock, sleep=self.sleep)
+            planner = BudgetPlanner(scheduler, self.deadline)
+            planner.update(total_position)
+            speed = max(1, round(planner.rate * 60 / 5))
+            logger.info(f"typing {total} {source.unit} in {format_time(budget)} (~{speed} wpm to start)")
+            scheduler.start()
+        elif speed:
+            chars_per_sec = wpm_to_cps(speed)
+            scheduler = DeadlineScheduler(chars_per_sec, max_catchup=self.max_catchup,
+                                          clock=self.clock, sleep=self.sleep)
+            logger.info(f"typing {total} {source.unit} at {speed} wpm ({chars_per_sec:.2f} chars/sec)")
+            scheduler.start()
+            controller = RateController(scheduler) if self.rate_control else None
+        elif backend is not self.backend:
+            logger.info(f"typing {total} {source.unit} in turbo chunks of {burst_size}")
+        else:
+            logger.info(f"typing {total} {source.unit} unpaced")
+
+        telemetry = self.telemetry
+        record = None
+        if telemetry is not None:
+            telemetry.begin(self.clock(), speed)
+            record = telemetry.record
+            self._recording = True
+
+        clock = self.clock
+        table = self.table
+        keys = table.keys
+        send_key = backend.send_key
+        send_keys = backend.send_keys
+        lateness_log = self.lateness_log
+        # Checked once: a disabled debug call in the loop costs nothing
+        debug = logger.isEnabledFor(logging.DEBUG)
+        progress_every = self.progress_every
+        on_progress = self.on_progress
+        next_progress = 0
+        typed = self.typed
+
+        def hold():
+            # Shift start time and deadlines to account for the pause
+            paused_for = self._hold()
+            self.start_time += paused_for
+            if scheduler:
+                scheduler.shift(paused_for)
+            if controller is not None:
+                controller.reset()
+            if planner is not None:
+                planner.reset()
+            if telemetry is not None:
+                telemetry.pause(paused_for)
+
+        def chunks():
+            nonlocal compiler
+            while compiled:
+                yield compiled.popleft()
+            while compiler is not None:
+                chunk = next(compiler, None)
+                if chunk is None:
+                    compiler = None
+                    break
+                account(chunk)
+                yield chunk
+
+        # Type each run (a single character unless burst mode is on)
+        for chunk in chunks():
+            if chunk.skipped:
+                self._report_skipped(skipped)
+            ids, bounds, offsets, chars = chunk.ids, chunk.bounds, chunk.offsets, chunk.chars
+            steps = chunk.steps
+            start = 0
+            for r in range(len(bounds)):
+                if self.stop_requested:
+                    break
+
+                # Handle pause
+                if self.is_paused:
+                    hold()
+                    if self.stop_requested:
+                        break
+
+                end = bounds[r]
+                count = end - start
+                if count:
+                    # Wait for this run's deadline
+                    lateness = 0.0
+                    if scheduler:
+                        lateness = scheduler.wait(count, steps[r])
+                        while lateness is None and not self.stop_requested:
+                            # Woken before the deadline by a pause: wait again after it
+                            hold()
+                            lateness = scheduler.wait(count, steps[r])
+                        if lateness is None:
+                            break
+                        if controller is not None:
+                            controller.update()
+                        elif planner is not None:
+                            planner.update(total_position)
+                        if lateness_log is not None:
+                            lateness_log.append(lateness)
+                        if debug and lateness > LATE_LOG_THRESHOLD:
+                            logger.debug(f"run at {typed} sent {lateness * 1000:.1f} ms late")
+
+                    if record is not None:
+                        sent_at = clock()
+                    if count == 1:
+                        key = keys[ids[start]]
+                        if key is not None and not send_key(key):
+                            table.mark_failed(ids[start])
+                    else:
+                        self._send_run(ids, start, end, send_keys)
+                    if record is not None:
+                        record(sent_at, lateness, clock() - sent_at, count)
+
+                typed = offsets[r]
+                self.typed = typed
+                self.chars_typed = chars[r]
+                start = end
+
+                if on_progress and (typed >= next_progress or typed == total):
+                    on_progress(typed, total)
+                    next_progress = typed + progress_every
+
+            if self.stop_requested:
+                logger.info(f"stopped at {typed}/{total}")
+                break
+
+        if scheduler and scheduler.forgiven:
+            logger.info(f"forgave {scheduler.forgiven:.2f}s of stalls")
+        if controller is not None and controller.multiplier != 1.0:
+            logger.info(f"rate trimmed to {controller.multiplier:.2f}x target at the end")
+        if planner is not None:
+            logger.info(f"budget ended {self.clock() - self.deadline:+.2f}s from the deadline "
+                        f"at {planner.rate * 12:.0f} wpm")
+
+        if pipeline is not None:
+            logger.info(f"preprocessing saved {pipeline.saved} keystrokes: {pipeline.report()}")
+
+        # Complete
+        final_time = self.elapsed()
+        if not self.stop_requested:
+            self.typed = total
+            logger.info(f"completed {total} {source.unit} in {final_time:.1f}s")
+            message = f"typed {source.describe()} in {format_time(final_time)}"
+            if pipeline is not None and pipeline.saved > 0:
+                message += f", {pipeline.saved} keystrokes saved"
+            return True, message
+        return False, "stopped by user"
+
+    def _plan_duration(self, compiled, speed: Optional[int], settle_delay: float):
+        """Set planned_duration from a fully compiled plan, if the rate is known"""
+        if speed:
+            steps = sum(sum(chunk.steps) for chunk in compiled)
+            self.planned_duration = steps / wpm_to_cps(speed) + settle_delay
+        elif self.rate_estimator is not None:
+            keys = sum(len(chunk) for chunk in compiled)
+            self.planned_duration = keys / self.rate_estimator.rate + settle_delay
+        else:
+            return
+        logger.info(f"planned duration {self.planned_duration:.1f}s")
+
+
+_TIME_PARTS = re.compile(r"(\d+(?:\.\d+)?)\s*([hms])")
+_TIME_UNITS = {"h": 3600, "m": 60, "s": 1}
+
+
+def parse_time(text: str) -> float:
+    """Parse '90', '90s', '12m', '1h 30m', '12:00' or '1:02:03' into seconds"""
+    text = text.strip().lower()
+    try:
+        if ":" in text:
+            seconds = 0.0
+            for part in text.split(":"):
+                seconds = seconds * 60 + float(part)
+            return seconds
+        return float(text)
+    except ValueError:
+        pass
+    parts = _TIME_PARTS.findall(text)
+    if not parts or _TIME_PARTS.sub("", text).strip():
+        raise ValueError(f"not a duration: {text!r}")
+    return sum(float(value) * _TIME_UNITS[unit] for value, unit in parts)
+
+
+def format_time(seconds: float) -> str:
+    """Format seconds to readable time"""
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    else:
+        mins = int(seconds // 60)
+        secs = int(seconds % 60)
+        return f"{mins}m {secs}s"
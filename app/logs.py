@@ -0,0 +1,75 @@
+"""
+Logging - queued, rotating log file in ~/.acheiria
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+from pathlib import Path
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Rotate the log at this size, keeping this many old files
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+
+LOG_NAME = 'acheiria.log'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def log_path(name: str = LOG_NAME) -> Path:
+    log_dir = Path.home() / '.acheiria'
+    log_dir.mkdir(exist_ok=True)
+    return log_dir / name
+
+
+def setup_logging(level: int = logging.INFO, console: bool = True, name: str = LOG_NAME) -> Path:
+    """Route the root logger through a queue to a background listener.
+
+    Logging threads (including the typing thread) only enqueue the record;
+    the file and console writes happen on the listener thread. Returns the
+    log file path. Each process logs to its own ``name``: rotation is not
+    safe with two processes writing one file.
+    """
+    global _listener
+    path = log_path(name)
+    if _listener is not None:
+        return path
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.handlers.RotatingFileHandler(
+        str(path), maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+        encoding='utf-8', delay=True,
+    )]
+    # Windowed frozen builds have no console stream at all
+    if console and sys.stderr is not None:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return path
+
+
+def stop_logging():
+    """Drain queued records to the handlers and stop the listener"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
@@ -0,0 +1,128 @@
+"""
+Update Meter - counts Flet updates and the bytes they send, for debugging
+
+Set ``ACHEIRIA_UPDATE_METER=1`` (or pass ``--update-meter``) to log, after
+every typing job, how many updates the UI sent, how many of them reached
+the client and how large they were, broken down by the calling method.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+METER_ENV = "ACHEIRIA_UPDATE_METER"
+METER_FLAG = "--update-meter"
+
+
+def meter_enabled() -> bool:
+    value = os.environ.get(METER_ENV, "").strip().lower()
+    return value not in ("", "0", "false", "no") or METER_FLAG in sys.argv[1:]
+
+
+def _caller() -> str:
+    """Name of the first app function on the stack above Flet and the meter"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith("flet") and module != __name__:
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return "?"
+
+
+class UpdateMeter:
+    """Wraps ``page.update`` and the page's connection to measure traffic.
+
+    ``updates`` counts update calls (including ``control.update()``, which
+    goes through the page); ``messages`` and ``bytes`` count the command
+    batches actually sent, measured as Flet encodes them. Calls that change
+    nothing send no message, so ``updates - messages`` is wasted diffing.
+    """
+
+    encoder = None  # JSON encoder for command batches; Flet's by default
+
+    def __init__(self, page):
+        self.page = page
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.monotonic()
+            self.updates = 0
+            self.messages = 0
+            self.bytes = 0
+            self.largest = 0
+            self.callers = Counter()
+
+    def install(self) -> "UpdateMeter":
+        page_update = self.page.update
+
+        def update(*controls):
+            with self._lock:
+                self.updates += 1
+                self.callers[_caller()] += 1
+            return page_update(*controls)
+
+        self.page.update = update
+
+        # Flet keeps the connection private; without it only calls are counted
+        conn = getattr(self.page, "_Page__conn", None)
+        if conn is not None and hasattr(conn, "send_commands"):
+            if self.encoder is None:
+                from flet.core.protocol import CommandEncoder
+                self.encoder = CommandEncoder
+            send_commands = conn.send_commands
+
+            def send(session_id, commands):
+                self._measure(commands)
+                return send_commands(session_id, commands)
+
+            conn.send_commands = send
+        else:
+            logger.warning("update meter: connection not found, counting calls only")
+        logger.info("update meter installed")
+        return self
+
+    def _measure(self, commands):
+        if not commands:
+            # Flet calls through with an empty batch when nothing changed
+            return
+        try:
+            size = len(json.dumps(commands, cls=self.encoder, separators=(",", ":")).encode())
+        except Exception:
+            size = 0
+        with self._lock:
+            self.messages += 1
+            self.bytes += size
+            self.largest = max(self.largest, size)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            seconds = max(1e-9, time.monotonic() - self.started)
+            return {
+                "seconds": round(seconds, 1),
+                "updates": self.updates,
+                "messages": self.messages,
+                "messages_per_sec": round(self.messages / seconds, 1),
+                "bytes": self.bytes,
+                "largest_bytes": self.largest,
+                "callers": dict(self.callers.most_common()),
+            }
+
+    def log(self, label: str):
+        stats = self.snapshot()
+        average = stats["bytes"] // stats["messages"] if stats["messages"] else 0
+        logger.info(
+            f"{label}: {stats['updates']} updates, {stats['messages']} messages "
+            f"({stats['messages_per_sec']}/s) in {stats['seconds']}s, "
+            f"{stats['bytes']} bytes (avg {average}, max {stats['largest_bytes']}), "
+            f"by caller {stats['callers']}"
+        )
@@ -0,0 +1,307 @@
+"""
+Pacing - deadline-based keystroke scheduling
+"""
+
+import math
+import time
+import logging
+from collections import deque
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Natural rhythm: a sawtooth over 50 keystrokes, normalised so that its
+# average factor is exactly 1.0 and the long-run rate equals the target.
+JITTER_PERIOD = 50
+_JITTER_RAW = [0.85 + 0.3 * (k / JITTER_PERIOD) for k in range(JITTER_PERIOD)]
+_JITTER_MEAN = sum(_JITTER_RAW) / JITTER_PERIOD
+JITTER_FACTORS = tuple(f / _JITTER_MEAN for f in _JITTER_RAW)
+# Prefix sums, so the offset of keystroke n is O(1) whatever the step size
+_JITTER_PREFIX = [0.0]
+for _f in JITTER_FACTORS:
+    _JITTER_PREFIX.append(_JITTER_PREFIX[-1] + _f)
+del _f
+
+
+def jitter_offset(n: int) -> float:
+    """Offset of keystroke n from the session start, in units of one interval"""
+    periods, rest = divmod(n, JITTER_PERIOD)
+    return periods * _JITTER_PREFIX[JITTER_PERIOD] + _JITTER_PREFIX[rest]
+
+
+# Achieved rate stays within this fraction of the target across 50-1000 wpm,
+# as long as a single injection takes less time than one keystroke interval.
+RATE_TOLERANCE = 0.02
+
+# Rate controller: adjust every CONTROL_PERIOD seconds from the rate achieved
+# over the last CONTROL_WINDOW seconds, within +/- MAX_RATE_TRIM of target
+CONTROL_PERIOD = 0.25
+CONTROL_WINDOW = 2.0
+CONTROL_GAIN = 0.5
+CONTROL_INTEGRAL_GAIN = 0.5
+MAX_RATE_TRIM = 0.5
+
+# Seconds over which the ETA's throughput average forgets old samples
+ETA_TIME_CONSTANT = 5.0
+
+# Rates a time budget may solve to (chars/sec); far wider than the slider
+MIN_BUDGET_CPS = 0.05
+MAX_BUDGET_CPS = 1000.0
+
+
+def wpm_to_cps(wpm: float) -> float:
+    """Convert words per minute to characters per second (5 chars per word)"""
+    return (wpm * 5) / 60
+
+
+class DeadlineScheduler:
+    """Schedules keystrokes against absolute monotonic deadlines.
+
+    Keystroke ``i`` is due at ``start + sum(interval * jitter[0..i-1])``,
+    so time spent injecting and sleep overshoot never accumulate into drift.
+    The jitter is the built-in sawtooth unless ``wait`` is given the run's
+    step from a precomputed timing profile (see app.timing).
+    After a stall the scheduler catches up by at most ``max_catchup`` seconds
+    of keystrokes and forgives the rest, so a hiccup never turns into a burst.
+    """
+
+    def __init__(self, chars_per_sec: float, max_catchup: float = 0.25,
+                 clock=time.monotonic, sleep=time.sleep):
+        if chars_per_sec <= 0:
+            raise ValueError("chars_per_sec must be positive")
+        self.interval = 1.0 / chars_per_sec
+        self.max_catchup = max(0.0, max_catchup)
+        self.clock = clock
+        self.sleep = sleep
+        self.start_time = None
+        self._offset = 0.0
+        self._index = 0
+        self._position = 0.0
+        self.forgiven = 0.0
+
+    def start(self):
+        """Anchor the schedule at the current time"""
+        self.start_time = self.clock()
+        self._offset = 0.0
+        self._index = 0
+        self._position = 0.0
+        self.forgiven = 0.0
+
+    def shift(self, seconds: float):
+        """Push every remaining deadline back, e.g. after a pause"""
+        if self.start_time is not None:
+            self.start_time += seconds
+
+    @property
+    def scheduled(self) -> int:
+        """Keystrokes scheduled so far"""
+        return self._index
+
+    @property
+    def position(self) -> float:
+        """Schedule position in intervals: the sum of all steps so far"""
+        return self._position
+
+    def set_rate(self, chars_per_sec: float):
+        """Change the rate from the next keystroke on, without moving its deadline"""
+        if chars_per_sec <= 0:
+            raise ValueError("chars_per_sec must be positive")
+        interval = 1.0 / chars_per_sec
+        position = self._position
+        if self.start_time is not None:
+            self.start_time += (self.interval - interval) * position
+        self.interval = interval
+        self._offset = interval * position
+
+    def next_deadline(self) -> float:
+        """Absolute time at which the next keystroke is due"""
+        return self.start_time + self._offset
+
+    def wait(self, count: int = 1, step: Optional[float] = None) -> Optional[float]:
+        """Block until the next keystroke is due; return lateness in seconds.
+
+        ``count`` is the number of characters about to be sent in one go, so
+        the following deadline moves on by that many keystrokes; ``step`` is
+        their summed delay factors, in intervals, when precomputed. If
+        ``sleep`` returns True (woken early, e.g. by a pause) this returns
+        None without advancing, and the same run should wait again.
+        """
+        if self.start_time is None:
+            self.start()
+
+        deadline = self.start_time + self._offset
+        now = self.clock()
+        remaining = deadline - now
+        if remaining > 0:
+            if self.sleep(remaining):
+                return None
+            lateness = max(0.0, self.clock() - deadline)
+        else:
+            lateness = -remaining
+            if lateness > self.max_catchup:
+                # Stall: forgive everything beyond the catch-up bound
+                excess = lateness - self.max_catchup
+                self.start_time += excess
+                self.forgiven += excess
+                lateness = self.max_catchup
+
+        if step is None:
+            step = jitter_offset(self._index + count) - jitter_offset(self._index)
+        self._index += count
+        self._position += step
+        self._offset = self.interval * self._position
+        return lateness
+
+    def achieved_cps(self, typed: int) -> float:
+        """Characters per second actually achieved since start, stalls forgiven"""
+        if self.start_time is None or typed <= 0:
+            return 0.0
+        elapsed = self.clock() - self.start_time
+        return typed / elapsed if elapsed > 0 else 0.0
+
+
+class RateController:
+    """Closed loop around a DeadlineScheduler that holds the target rate.
+
+    Deadlines alone keep the rate only while every injection fits in one
+    interval; when the target app is slow to accept input or stalls are
+    forgiven, the real speed sags. Every ``period`` seconds the controller
+    measures the rate achieved over the last ``window`` seconds (relative to
+    the jittered schedule, so rhythm is not mistaken for error) and trims the
+    scheduler's rate with a PI law, bounded to +/- ``max_trim`` of target.
+    """
+
+    def __init__(self, scheduler: DeadlineScheduler, period: float = CONTROL_PERIOD,
+                 window: float = CONTROL_WINDOW, gain: float = CONTROL_GAIN,
+                 integral_gain: float = CONTROL_INTEGRAL_GAIN, max_trim: float = MAX_RATE_TRIM):
+        self.scheduler = scheduler
+        self.target_interval = scheduler.interval
+        self.period = period
+        self.window = window
+        self.gain = gain
+        self.integral_gain = integral_gain
+        self.max_trim = max_trim
+        self.multiplier = 1.0
+        self.efficiency = 1.0
+        self._integral = 0.0
+        self._samples = deque()
+        self._next = None
+
+    def reset(self):
+        """Forget the measurement window, e.g. after a pause"""
+        self._samples.clear()
+        self._next = None
+
+    def update(self):
+        """Called after each scheduled run; adjusts at most once per period"""
+        scheduler = self.scheduler
+        now = scheduler.clock()
+        if self._next is not None and now < self._next:
+            return
+        self._next = now + self.period
+        position = scheduler.position
+        samples = self._samples
+        samples.append((now, position))
+        while len(samples) > 2 and now - samples[1][0] >= self.window:
+            samples.popleft()
+        started, first = samples[0]
+        if now - started < self.period or position == first:
+            return
+
+        # Achieved / target rate over the window: 1.0 when on schedule
+        expected = self.target_interval * (position - first)
+        self.efficiency = expected / (now - started)
+        error = 1.0 - self.efficiency
+        integral = self._integral + error * self.period
+        multiplier = 1.0 + self.gain * error + self.integral_gain * integral
+        if abs(multiplier - 1.0) <= self.max_trim:
+            self._integral = integral
+        else:
+            # Saturated, e.g. the app cannot accept input any faster: clamp
+            # without winding up, so there is no burst once it recovers
+            multiplier = min(1.0 + self.max_trim, max(1.0 - self.max_trim, multiplier))
+        if abs(multiplier - self.multiplier) > 0.005:
+            self.multiplier = multiplier
+            scheduler.set_rate(multiplier / self.target_interval)
+
+
+class BudgetPlanner:
+    """Re-solves a DeadlineScheduler's rate so typing ends on a deadline.
+
+    Every ``period`` seconds the schedule still ahead (in intervals, so the
+    timing profile's jitter is included) is spread over the time left. Time
+    lost to pauses, stalls or a slow target app is absorbed by the rest of
+    the session instead of pushing the finish back.
+    """
+
+    def __init__(self, scheduler: DeadlineScheduler, deadline: float,
+                 period: float = CONTROL_PERIOD, min_cps: float = MIN_BUDGET_CPS,
+                 max_cps: float = MAX_BUDGET_CPS):
+        self.scheduler = scheduler
+        self.deadline = deadline
+        self.period = period
+        self.min_cps = min_cps
+        self.max_cps = max_cps
+        self.rate = 1.0 / scheduler.interval
+        self._next = None
+
+    def solve(self, total_position: float, now: float) -> float:
+        """Rate (chars/sec) that ends ``total_position`` at the deadline"""
+        left = total_position - self.scheduler.position
+        time_left = self.deadline - now
+        if left <= 0:
+            return self.rate
+        if time_left <= 0:
+            return self.max_cps
+        return min(self.max_cps, max(self.min_cps, left / time_left))
+
+    def reset(self):
+        """Re-plan at the next update, e.g. after a pause"""
+        self._next = None
+
+    def update(self, total_position: Callable[[], float]):
+        """Called after each scheduled run; ``total_position`` is only
+        evaluated when a re-plan is due"""
+        now = self.scheduler.clock()
+        if self._next is not None and now < self._next:
+            return
+        self._next = now + self.period
+        rate = self.solve(total_position(), now)
+        if abs(rate * self.scheduler.interval - 1.0) > 0.001:
+            self.scheduler.set_rate(rate)
+        self.rate = rate
+
+
+class RateEstimator:
+    """EWMA of observed throughput, for a remaining-time estimate.
+
+    Starts from the configured rate and converges on what the target app
+    actually accepts, so the ETA tracks reality instead of the static plan.
+    """
+
+    def __init__(self, initial_rate: float, time_constant: float = ETA_TIME_CONSTANT,
+                 min_sample: float = CONTROL_PERIOD):
+        self.rate = initial_rate
+        self.time_constant = time_constant
+        self.min_sample = min_sample
+        self._last = None
+
+    def update(self, elapsed: float, done: float) -> float:
+        """Feed the active time and progress so far; returns the averaged rate"""
+        if self._last is None:
+            self._last = (elapsed, done)
+            return self.rate
+        last_elapsed, last_done = self._last
+        dt = elapsed - last_elapsed
+        if dt < self.min_sample:
+            return self.rate
+        alpha = 1.0 - math.exp(-dt / self.time_constant)
+        self.rate += alpha * ((done - last_done) / dt - self.rate)
+        self._last = (elapsed, done)
+        return self.rate
+
+    def remaining(self, left: float) -> Optional[float]:
+        """Seconds to finish ``left`` units at the averaged rate"""
+        if self.rate <= 0:
+            return None
+        return max(0.0, left) / self.rate
@@ -0,0 +1,187 @@
+"""
+Keystroke Plan - compiles text into compact arrays of key actions
+"""
+
+import re
+import logging
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.backends import KeyboardBackend
+from app.timing import TimingProfile, char_class
+
+logger = logging.getLogger(__name__)
+
+# Characters per compiled chunk; small enough that the first chunk is ready
+# almost instantly, large enough that per-chunk overhead is negligible
+CHUNK_SIZE = 4096
+
+# Burst modes: how many characters go to the backend per call
+BURST_OFF = "off"
+BURST_WORDS = "words"
+BURST_CHUNKS = "chunks"
+BURST_MODES = (BURST_OFF, BURST_WORDS, BURST_CHUNKS)
+
+_WORD_RUN = re.compile(r"\S+\s*|\s+")
+
+
+def iter_runs(text: str, mode: str = BURST_OFF, size: int = 32) -> Iterator[str]:
+    """Split text into the runs injected by a single backend call.
+
+    ``words`` yields each word with its trailing whitespace, ``chunks`` yields
+    fixed-size slices; either way no run is longer than ``size`` characters.
+    """
+    if mode == BURST_OFF or size <= 1:
+        yield from text
+    elif mode == BURST_CHUNKS:
+        for start in range(0, len(text), size):
+            yield text[start:start + size]
+    elif mode == BURST_WORDS:
+        for match in _WORD_RUN.finditer(text):
+            run = match.group()
+            if len(run) <= size:
+                yield run
+            else:
+                for start in range(0, len(run), size):
+                    yield run[start:start + size]
+    else:
+        raise ValueError(f"unknown burst mode: {mode}")
+
+
+class KeyTable:
+    """Memoized char -> backend key translation, shared across runs.
+
+    Each distinct character is translated once and given a small integer id;
+    plans store ids and the engine looks the native key up in ``keys``.
+    Characters the backend cannot type are remembered as well, so neither the
+    translation nor the failure path is paid more than once per character.
+    ``classes`` holds each id's character class for timing profiles.
+    """
+
+    def __init__(self, backend: KeyboardBackend):
+        self.backend = backend
+        self.ids: Dict[str, int] = {}
+        self.keys: List[object] = []
+        self.classes = array("B")
+        self.untypeable = set()
+
+    def lookup(self, char: str) -> int:
+        """Return the key id for char, or -1 if it cannot be typed"""
+        key_id = self.ids.get(char)
+        if key_id is None:
+            if char in self.untypeable:
+                return -1
+            key = self.backend.translate(char)
+            if key is None:
+                self.untypeable.add(char)
+                return -1
+            key_id = len(self.keys)
+            self.keys.append(key)
+            self.classes.append(char_class(char))
+            self.ids[char] = key_id
+        return key_id
+
+    def mark_failed(self, key_id: int):
+        """Stop sending a key after the backend rejected it at run time"""
+        for char, other in self.ids.items():
+            if other == key_id:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"skipped: {repr(char)}")
+                self.untypeable.add(char)
+                del self.ids[char]
+                break
+        self.keys[key_id] = None
+
+
+class PlanChunk:
+    """A slice of the document compiled to key ids.
+
+    ``ids`` holds one key id per keystroke, ``bounds`` the end index of each
+    run sent in one backend call, ``offsets`` the absolute source offset
+    reached once that run is sent, for progress reporting, and ``chars`` the
+    exact number of source characters consumed by then, for checkpoints.
+    ``steps`` is each run's delay in target intervals, from the timing profile.
+    """
+
+    __slots__ = ("ids", "bounds", "offsets", "chars", "steps", "skipped")
+
+    def __init__(self):
+        self.ids = array("I")
+        self.bounds = array("I")
+        self.offsets = array("Q")
+        self.chars = array("Q")
+        self.steps = array("d")
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def compile_plan(pieces: Iterator[Tuple], table: KeyTable, skipped: Dict[str, int],
+                 burst_mode: str = BURST_OFF, burst_size: int = 32,
+                 chunk_size: int = CHUNK_SIZE, start_chars: int = 0,
+                 profile: Optional[TimingProfile] = None) -> Iterator[PlanChunk]:
+    """Lazily compile source pieces into plan chunks.
+
+    ``pieces`` are ``(text, units)`` pairs from a TextSource; run offsets are
+    expressed in those units, interpolated within a piece and exact at its
+    end (an empty piece just advances the offset, e.g. past resumed text).
+    Preprocessed pieces (see app.preprocess) are ``(text, units, chars)``,
+    where ``chars`` is the source characters the text stands for.
+    Untypeable characters are dropped and counted into ``skipped`` as they
+    are found, so callers can report them before typing reaches them.
+    Each finished chunk gets its run ``steps`` from ``profile`` in one pass.
+    """
+    if profile is None:
+        profile = TimingProfile()
+    lookup = table.lookup
+    ids_get = table.ids.get
+    keystrokes = 0
+
+    def finish(chunk):
+        nonlocal keystrokes
+        chunk.steps = profile.steps(chunk.ids, chunk.bounds, keystrokes, table.classes)
+        keystrokes += len(chunk.ids)
+        return chunk
+
+    chunk = PlanChunk()
+    base = 0
+    chars = start_chars
+    for item in pieces:
+        piece, units = item[0], item[1]
+        consumed = item[2] if len(item) > 2 else len(piece)
+        length = len(piece)
+        if not length:
+            base += units
+            chars += consumed
+            continue
+        position = 0
+        chars_base = chars
+        for run in iter_runs(piece, burst_mode, burst_size):
+            ids = chunk.ids
+            for char in run:
+                key_id = ids_get(char)
+                if key_id is None:
+                    key_id = lookup(char)
+                if key_id < 0:
+                    skipped[char] = skipped.get(char, 0) + 1
+                    chunk.skipped += 1
+                else:
+                    ids.append(key_id)
+            position += len(run)
+            chars = chars_base + (position * consumed) // length
+            offset = base + (position * units) // length
+            if len(chunk.bounds) and chunk.bounds[-1] == len(ids):
+                # Run was entirely untypeable; fold its source span into the last run
+                chunk.offsets[-1] = offset
+                chunk.chars[-1] = chars
+            else:
+                chunk.bounds.append(len(ids))
+                chunk.offsets.append(offset)
+                chunk.chars.append(chars)
+            if len(ids) >= chunk_size:
+                yield finish(chunk)
+                chunk = PlanChunk()
+        base += units
+    if len(chunk.bounds) or chunk.skipped:
+        yield finish(chunk)
@@ -0,0 +1,379 @@
+"""
+Preprocessing - streaming text rewrites applied before injection
+
+Stages rewrite the text line by line as it streams from a TextSource into
+the plan compiler, so editors that indent or close brackets by themselves
+get only the keystrokes they need. Each stage counts the keystrokes it
+saved (negative if it had to add some).
+"""
+
+import itertools
+import logging
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+STAGE_CRLF = "crlf"
+STAGE_TABS = "tabs"
+STAGE_STRIP_INDENT = "strip-indent"
+STAGE_AUTOPAIR = "autopair"
+
+# Forward delete; the pynput backend sends it as the Delete key
+FORWARD_DELETE = "\x7f"
+
+# A line longer than this is passed on in parts, bounding the line buffer
+MAX_LINE = 64 * 1024
+
+BRACKETS = {"(": ")", "[": "]", "{": "}"}
+_CLOSERS = {closer: opener for opener, closer in BRACKETS.items()}
+
+
+def _lines(text: str) -> Iterator[str]:
+    """Split on '\\n' only, keeping it (str.splitlines also splits on \\r, \\f...)"""
+    start = 0
+    end = len(text)
+    while start < end:
+        stop = text.find("\n", start) + 1 or end
+        yield text[start:stop]
+        start = stop
+
+
+class Stage:
+    """Base class: rewrites one line at a time, ``at_start`` unless it
+    continues a line that was too long to buffer. ``editor`` stages rely
+    on the target editor reacting to typed keys, so pastes skip them."""
+
+    name = "base"
+    editor = False
+
+    def __init__(self):
+        self.saved = 0
+
+    def reset(self):
+        self.saved = 0
+
+    def line(self, line: str, at_start: bool) -> str:
+        raise NotImplementedError
+
+
+class CRLFStage(Stage):
+    """Windows line endings to '\\n', so each newline is one Enter, not two"""
+
+    name = STAGE_CRLF
+
+    def line(self, line, at_start):
+        if line.endswith("\r\n"):
+            return line[:-2] + "\n"
+        return line
+
+
+class TabIndentStage(Stage):
+    """Leading spaces to tabs, for targets whose Tab key inserts spaces"""
+
+    name = STAGE_TABS
+    editor = True
+
+    def __init__(self, tab_width: int = 4):
+        super().__init__()
+        self.tab_width = max(1, tab_width)
+
+    def line(self, line, at_start):
+        if not at_start:
+            return line
+        indent = len(line) - len(line.lstrip(" "))
+        if indent < self.tab_width:
+            return line
+        tabs, spaces = divmod(indent, self.tab_width)
+        return "\t" * tabs + " " * spaces + line[indent:]
+
+
+class StripIndentStage(Stage):
+    """Drop leading whitespace, for targets that indent every line themselves"""
+
+    name = STAGE_STRIP_INDENT
+    editor = True
+
+    def line(self, line, at_start):
+        return line.lstrip(" \t") if at_start else line
+
+
+class AutoPairStage(Stage):
+    """Delete the closer an editor inserts for a bracket left open at line end.
+
+    Typed at the end of the document, an opener makes the editor add its
+    closer; a closer typed on the same line just types over it, but one on
+    a later line would be doubled. So an opener still unmatched when its
+    line ends is followed by a forward delete, and its closer is typed
+    where the source has it.
+    """
+
+    name = STAGE_AUTOPAIR
+    editor = True
+
+    def line(self, line, at_start):
+        stack: List[int] = []
+        for i, char in enumerate(line):
+            if char in BRACKETS:
+                stack.append(i)
+            elif char in _CLOSERS and stack and line[stack[-1]] == _CLOSERS[char]:
+                stack.pop()
+        if not stack:
+            return line
+        parts = []
+        start = 0
+        for i in stack:
+            parts.append(line[start:i + 1])
+            parts.append(FORWARD_DELETE)
+            start = i + 1
+        parts.append(line[start:])
+        return "".join(parts)
+
+
+STAGES = {
+    cls.name: cls
+    for cls in (CRLFStage, TabIndentStage, StripIndentStage, AutoPairStage)
+}
+
+
+# Characters a stage may drop or replace; any other change is an inserted delete
+_WHITESPACE = " \t\r"
+
+
+def _segments(original: str, line: str) -> Iterator[Tuple[str, int]]:
+    """Align a rewritten line with its source as ``(text, source chars)`` runs.
+
+    Stages keep most characters and only drop or replace whitespace, or
+    insert forward deletes, so a greedy walk finds the edits: unchanged
+    runs map one to one, each edit gets its own segment.
+    """
+    i = j = 0
+    n, m = len(original), len(line)
+    if original.endswith(line):
+        # Only a head dropped, e.g. a stripped indent
+        yield "", n - m
+        if m:
+            yield line, m
+        return
+    if m and original[-1] == line[-1] and original.startswith(line[:-1]):
+        # Only something before the last char dropped, e.g. the CR of a CRLF
+        yield line[:-1], m - 1
+        yield "", n - m
+        yield line[-1], 1
+        return
+    while i < n or j < m:
+        k = 0
+        while i + k < n and j + k < m and original[i + k] == line[j + k]:
+            k += 1
+        if k:
+            yield line[j:j + k], k
+            i += k
+            j += k
+        elif j < m and line[j] == FORWARD_DELETE:
+            yield FORWARD_DELETE, 0
+            j += 1
+        else:
+            i2, j2 = i, j
+            while i2 < n and original[i2] in _WHITESPACE:
+                i2 += 1
+            while j2 < m and line[j2] in " \t":
+                j2 += 1
+            if i2 == i and j2 == j:
+                # Not an edit the stages make: keep the rest as one span
+                i2, j2 = n, m
+            yield line[j:j2], i2 - i
+            i, j = i2, j2
+
+
+class _UnitScale:
+    """Source units at a char position in a block made of a carried-over
+    line start (``carry`` chars, ``carry_units``) and the head of a piece
+    (``length`` chars, ``units``), rounded like the cut between them"""
+
+    def __init__(self, carry: int, carry_units: int, length: int = 0, units: int = 0):
+        self.carry = carry
+        self.carry_units = carry_units
+        self.length = length
+        self.units = units
+        # One unit per char (in-memory text): positions are units
+        self.identity = carry == carry_units and length == units
+
+    def __call__(self, position: int) -> int:
+        if position <= self.carry:
+            return self.carry_units * position // self.carry if self.carry else 0
+        return self.carry_units + self.units * (position - self.carry) // self.length
+
+
+class Pipeline:
+    """Runs stages over source pieces, one whole line at a time.
+
+    Pieces come in as ``(text, units)`` and go out as ``(text, units, chars)``
+    where ``units`` and ``chars`` are the source progress units and source
+    characters the rewritten text stands for, so progress and checkpoints
+    stay in source terms whatever the stages remove or add. Each line goes
+    out as its unchanged runs and its edits (a dropped ``\\r`` or indent as
+    ``("", units, chars)``), so offsets are exact between any two keystrokes
+    except inside a replaced indent, where they are interpolated.
+    """
+
+    def __init__(self, stages: Sequence[Stage]):
+        self.stages = list(stages)
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+    @property
+    def names(self) -> List[str]:
+        return [stage.name for stage in self.stages]
+
+    @property
+    def saved(self) -> int:
+        return sum(stage.saved for stage in self.stages)
+
+    def report(self) -> Dict[str, int]:
+        return {stage.name: stage.saved for stage in self.stages}
+
+    def for_paste(self) -> Optional["Pipeline"]:
+        """The stages that still apply to pasted text; None if there are none"""
+        stages = [stage for stage in self.stages if not stage.editor]
+        return Pipeline(stages) if stages else None
+
+    def run(self, pieces: Iterator[Tuple[str, int]],
+            skip_chars: int = 0) -> Iterator[Tuple[str, int, int]]:
+        """Rewrite ``pieces``, which start at the beginning of the source.
+
+        With ``skip_chars`` (resuming), the line holding that position is
+        still rewritten whole, as stages need the entire line, and only
+        what follows the position is passed on, after one ``("", units, 0)``
+        piece for everything skipped.
+        """
+        if not skip_chars:
+            yield from self._rewrite(pieces, True)
+            return
+        pieces = iter(pieces)
+        seen = seen_units = 0
+        line, line_units = "", 0
+        at_start = True
+        for text, units in pieces:
+            if not text:
+                seen_units += units
+                continue
+            if seen + len(text) >= skip_chars:
+                # Start the rewrite at the line start before the resume point
+                cut = text.rfind("\n", 0, skip_chars - seen) + 1
+                if cut:
+                    head_units = units * cut // len(text)
+                    seen, seen_units = seen + cut, seen_units + head_units
+                    text, units = text[cut:], units - head_units
+                    line, line_units, at_start = "", 0, True
+                break
+            seen += len(text)
+            seen_units += units
+            cut = text.rfind("\n") + 1
+            if cut:
+                line, line_units, at_start = text[cut:], units - units * cut // len(text), True
+            else:
+                line, line_units = line + text, line_units + units
+            if len(line) >= MAX_LINE:
+                # Rewritten in parts the first time too: resume mid-line
+                line, line_units, at_start = "", 0, False
+        else:
+            yield "", seen_units, 0
+            return
+
+        target = skip_chars - (seen - len(line))
+        skipped = seen_units - line_units
+        rest = [(line, line_units), (text, units)] if line else [(text, units)]
+        done = 0
+        for piece, piece_units, piece_chars in self._rewrite(itertools.chain(rest, pieces), at_start):
+            if skipped is None:
+                yield piece, piece_units, piece_chars
+                continue
+            if not piece_chars:
+                if done < target:
+                    skipped += piece_units
+                    continue
+                # An insertion right at the point: typed (again), e.g. a delete
+            elif done + piece_chars <= target:
+                skipped += piece_units
+                done += piece_chars
+                continue
+            elif done < target:
+                # Straddles the point: cut where the compiler's interpolation put it
+                before = target - done
+                cut = -(-before * len(piece) // piece_chars)
+                cut_units = piece_units * cut // len(piece) if piece else 0
+                yield "", skipped + cut_units, 0
+                yield piece[cut:], piece_units - cut_units, piece_chars - before
+                skipped = None
+                continue
+            yield "", skipped, 0
+            yield piece, piece_units, piece_chars
+            skipped = None
+        if skipped is not None:
+            yield "", skipped, 0
+
+    def _rewrite(self, pieces: Iterator[Tuple[str, int]],
+                 at_start: bool) -> Iterator[Tuple[str, int, int]]:
+        carry, carry_units = "", 0
+        for text, units in pieces:
+            if not text:
+                yield "", units, 0
+                continue
+            cut = text.rfind("\n") + 1
+            if not cut and len(carry) + len(text) < MAX_LINE:
+                carry += text
+                carry_units += units
+                continue
+            if not cut:
+                cut = len(text)
+            head_units = units * cut // len(text)
+            block = carry + text[:cut]
+            scale = _UnitScale(len(carry), carry_units, len(text), units)
+            at_start = yield from self._process(block, at_start, scale)
+            carry, carry_units = text[cut:], units - head_units
+        if carry:
+            yield from self._process(carry, at_start, _UnitScale(len(carry), carry_units))
+        elif carry_units:
+            yield "", carry_units, 0
+
+    def _process(self, block: str, at_start: bool, scale: _UnitScale):
+        """Yield the block's rewritten pieces; return whether it ends at a line start"""
+        start = 0
+        identity = scale.identity
+        for original in _lines(block):
+            line = original
+            for stage in self.stages:
+                rewritten = stage.line(line, at_start)
+                stage.saved += len(line) - len(rewritten)
+                line = rewritten
+            if line == original:
+                end = start + len(line)
+                yield line, len(line) if identity else scale(end) - scale(start), len(line)
+                start = end
+            else:
+                for text, chars in _segments(original, line):
+                    end = start + chars
+                    yield text, chars if identity else scale(end) - scale(start), chars
+                    start = end
+            at_start = line.endswith("\n")
+        return at_start
+
+    def count(self, pieces: Iterator[Tuple[str, int]], skip_chars: int = 0) -> int:
+        """Keystrokes the pieces come to after preprocessing (resets savings)"""
+        self.reset()
+        total = sum(len(text) for text, _, _ in self.run(pieces, skip_chars))
+        self.reset()
+        return total
+
+
+def create_pipeline(names: Sequence[str], tab_width: int = 4) -> Optional[Pipeline]:
+    """Build a pipeline from stage names in order; None when there are none"""
+    stages = []
+    for name in names:
+        try:
+            cls = STAGES[name]
+        except KeyError:
+            raise ValueError(f"unknown preprocessing stage: {name}") from None
+        stages.append(cls(tab_width) if cls is TabIndentStage else cls())
+    return Pipeline(stages) if stages else None
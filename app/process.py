@@ -0,0 +1,615 @@
+"""
+Engine Process - types in a child process, away from the UI's GIL
+
+The window's threads (Flet, window events, timers, ``page.run_thread``
+callbacks) share one interpreter lock with the typing thread, so UI work
+shows up as jitter between keystrokes. ``EngineProcess`` stands in for a
+TypingEngine and runs the real one in a child (``main.py engine``):
+
+- commands (run, pause, resume, stop) go to the child's stdin and events
+  (status, started, complete) come back on its stdout, one JSON object
+  per line;
+- progress is a block of counters in a shared memory mapping that the
+  child writes after every run of keys and the UI reads whenever it
+  draws a frame, without a message per keystroke.
+
+If the child dies the job fails with a message and the next run starts a
+new child; the window is unaffected.
+"""
+
+import json
+import logging
+import math
+import mmap
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from app.backends import create_backend
+from app.checkpoint import CHECKPOINT_INTERVAL, Checkpointer, CheckpointStore
+from app.engine import TypingEngine
+from app.plan import BURST_OFF
+from app.preprocess import TabIndentStage, create_pipeline
+from app.sources import MappedFileSource, StringSource, TextSource
+from app.telemetry import SessionTelemetry
+from app.timing import PROFILE_SAWTOOTH
+
+logger = logging.getLogger(__name__)
+
+# The child's log file, next to acheiria.log
+ENGINE_LOG = 'acheiria-engine.log'
+
+# Progress block layout: doubles, NaN for "not set". SEQ is odd while the
+# child is writing; readers retry until they see the same even value on
+# both sides of their copy (a seqlock)
+SEQ, TYPED, CHARS, TOTAL, STARTED, PLANNED, DEADLINE, REMAINING, STAMP = range(9)
+FIELDS = 9
+BLOCK_SIZE = 8 * FIELDS
+READ_RETRIES = 16
+
+# Seconds to wait for the child to exit on close before killing it
+CLOSE_TIMEOUT = 2.0
+
+# Seconds the child waits for a finishing run before refusing the next one
+RUN_JOIN_TIMEOUT = 1.0
+
+NAN = float("nan")
+
+
+def _number(value: Optional[float]) -> float:
+    return NAN if value is None else float(value)
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+def _shared_dir() -> Optional[str]:
+    # A tmpfs on Linux, so the mapping never has dirty pages to write back
+    return "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+class ProgressBlock:
+    """Fixed-size counter block in a shared file mapping.
+
+    One process writes (the child, or the parent while no run is in
+    progress); any number read. ``time.monotonic`` is system-wide on every
+    platform acheiria runs on, so the child's timestamps are valid in the
+    parent as they are.
+    """
+
+    def __init__(self, path, create: bool = False):
+        self.path = Path(path)
+        if create:
+            with open(self.path, "wb") as f:
+                f.write(bytes(BLOCK_SIZE))
+        self._file = open(self.path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), BLOCK_SIZE)
+        self._view = memoryview(self._map).cast("d")
+
+    @classmethod
+    def create(cls) -> "ProgressBlock":
+        fd, path = tempfile.mkstemp(prefix="acheiria-progress-", suffix=".bin", dir=_shared_dir())
+        os.close(fd)
+        return cls(path, create=True)
+
+    def write(self, values: Sequence[float]):
+        view = self._view
+        view[SEQ] += 1
+        view[TYPED:FIELDS] = array("d", values)
+        view[SEQ] += 1
+
+    def read(self) -> Tuple[float, ...]:
+        """Consistent copy of the fields after SEQ (indexed from TYPED - 1)"""
+        view = self._view
+        for _ in range(READ_RETRIES):
+            seq = view[SEQ]
+            values = tuple(view[TYPED:FIELDS])
+            if seq % 2 == 0 and view[SEQ] == seq:
+                break
+        # Still mid-write after every retry: at worst one field is a frame old
+        return values
+
+    def close(self, unlink: bool = False):
+        self._view.release()
+        self._map.close()
+        self._file.close()
+        if unlink:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+
+_IDLE = (0.0, 0.0, 0.0, NAN, NAN, NAN, NAN, 0.0)
+
+
+def _source_spec(source: TextSource) -> Dict[str, Any]:
+    """How the child reopens a source"""
+    if isinstance(source, MappedFileSource):
+        return {"kind": "file", "path": str(source.path), "encoding": source.encoding}
+    if isinstance(source, StringSource):
+        return {"kind": "text", "text": source.text}
+    raise ValueError(f"can't type a {type(source).__name__} in the typing process")
+
+
+def _open_source(spec: Dict[str, Any]) -> TextSource:
+    if spec["kind"] == "file":
+        return MappedFileSource(spec["path"], spec.get("encoding", "utf-8"))
+    return StringSource(spec["text"])
+
+
+def engine_command() -> List[str]:
+    """Command line that starts a child typing process"""
+    if getattr(sys, 'frozen', False):
+        return [sys.executable, "engine"]
+    main = Path(__file__).resolve().parent.parent / "main.py"
+    return [sys.executable, str(main), "engine"]
+
+
+class EngineProcess:
+    """Drop-in for TypingEngine (as used by the worker, UI and CLI) that
+    types in a child process.
+
+    Settings (``burst_mode``, ``timing_profile``, ``preprocess``...) are read
+    from this object and sent with each run; ``checkpointer`` and
+    ``telemetry`` only say where the child saves checkpoints and reports.
+    ``on_progress`` is not supported: progress is read from ``typed``.
+    Hooks are called from the event reader thread, except ``on_complete``,
+    which is called from the thread running ``run``.
+    """
+
+    def __init__(self, backend: str = "pynput", max_catchup: float = 0.25,
+                 rate_control: bool = True, clock=time.monotonic):
+        self.backend_name = backend
+        self.max_catchup = max_catchup
+        self.rate_control = rate_control
+        self.clock = clock
+
+        # Mirrors TypingEngine's settings; backends are created in the child
+        self.backend = None
+        self.turbo_backend = None
+        self.burst_mode = BURST_OFF
+        self.burst_size = 32
+        self.timing_profile = PROFILE_SAWTOOTH
+        self.preprocess = None
+        self.checkpointer = None
+        self.telemetry = None
+
+        # State
+        self.is_typing = False
+        self.is_paused = False
+        self.stop_requested = False
+        self.unit = "chars"
+        self._prepared = False
+
+        # Hooks
+        self.on_status: Optional[Callable[[str], None]] = None
+        self.on_started: Optional[Callable[[], None]] = None
+        self.on_complete: Optional[Callable[[bool, str], None]] = None
+
+        self._proc: Optional[subprocess.Popen] = None
+        self._block: Optional[ProgressBlock] = None
+        self._lock = threading.Lock()
+        self._state = threading.Lock()
+        self._done = threading.Event()
+        self._waiting = False
+        self._result = (False, "stopped")
+
+    # Child process
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self):
+        """Start the child unless it is running (``run`` does this itself)"""
+        with self._lock:
+            if self.alive:
+                return
+            if self._block is not None:
+                self._block.close(unlink=True)
+            self._block = ProgressBlock.create()
+            command = engine_command() + ["--block", str(self._block.path),
+                                          "--backend", self.backend_name]
+            self._proc = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                # Windowed frozen builds have no stderr to inherit
+                stderr=subprocess.DEVNULL if sys.stderr is None else None,
+                text=True,
+                encoding="utf-8",
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+            )
+            threading.Thread(target=self._read_events, args=(self._proc,),
+                             name="engine-events", daemon=True).start()
+            logger.info(f"typing process started (pid {self._proc.pid})")
+
+    def close(self, timeout: float = CLOSE_TIMEOUT):
+        """Stop typing and end the child"""
+        self.stop()
+        proc = self._proc
+        if proc is not None:
+            self._send({"cmd": "close"})
+            try:
+                proc.wait(timeout)
+            except subprocess.TimeoutExpired:
+                logger.warning("typing process did not exit, killing it")
+                proc.kill()
+                proc.wait()
+            self._proc = None
+        if self._block is not None:
+            self._block.close(unlink=True)
+            self._block = None
+
+    def _send(self, command: Dict[str, Any]) -> bool:
+        proc = self._proc
+        if proc is None:
+            return False
+        line = json.dumps(command) + "\n"
+        with self._lock:
+            try:
+                proc.stdin.write(line)
+                proc.stdin.flush()
+                return True
+            except (OSError, ValueError):
+                # Gone: the event reader reports it
+                return False
+
+    def _read_events(self, proc: subprocess.Popen):
+        failure = None
+        for line in proc.stdout:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                logger.debug(f"typing process: {line.rstrip()}")
+                continue
+            kind = event.get("event")
+            if kind == "status":
+                self._emit(self.on_status, event.get("text", ""))
+            elif kind == "started":
+                self._emit(self.on_started)
+            elif kind == "complete":
+                self._finish(proc, event["success"], event["message"], event.get("report"))
+            elif kind == "failed":
+                failure = event.get("message")
+        code = proc.wait()
+        if code:
+            logger.error(f"typing process exited with code {code}")
+        else:
+            logger.info("typing process exited")
+        self._finish(proc, False, f"error: {failure or f'typing process exited (code {code})'}")
+
+    def _finish(self, proc, success: bool, message: str, report=None):
+        with self._state:
+            # Ignore a previous child's exit and events outside a run
+            if proc is not self._proc or not self._waiting:
+                return
+            self._waiting = False
+        if self.telemetry is not None:
+            self.telemetry.report = report
+        self._result = (success, message)
+        self._done.set()
+
+    def _emit(self, hook, *args):
+        if hook is None:
+            return
+        try:
+            hook(*args)
+        except Exception as e:
+            logger.error(f"engine hook error: {e}", exc_info=True)
+
+    # Control
+
+    def stop(self):
+        self.stop_requested = True
+        self._send({"cmd": "stop"})
+
+    def pause(self):
+        self.is_paused = True
+        self._send({"cmd": "pause"})
+
+    def resume(self):
+        self.is_paused = False
+        self._send({"cmd": "resume"})
+
+    def prepare(self):
+        """Clear stop and pause ahead of ``run`` (see TypingEngine.prepare)"""
+        self.is_paused = False
+        self.stop_requested = False
+        self._prepared = True
+
+    def _settings(self) -> Dict[str, Any]:
+        pipeline = self.preprocess
+        tab_width = 4
+        if pipeline is not None:
+            for stage in pipeline.stages:
+                if isinstance(stage, TabIndentStage):
+                    tab_width = stage.tab_width
+        checkpointer, telemetry = self.checkpointer, self.telemetry
+        return {
+            "max_catchup": self.max_catchup,
+            "rate_control": self.rate_control,
+            "burst_mode": self.burst_mode,
+            "burst_size": self.burst_size,
+            "timing_profile": self.timing_profile,
+            "preprocess": pipeline.names if pipeline is not None else [],
+            "tab_width": tab_width,
+            "checkpoint": str(checkpointer.store.path) if checkpointer is not None else None,
+            "checkpoint_interval": checkpointer.interval if checkpointer is not None else None,
+            "telemetry": telemetry is not None,
+            "report": str(telemetry.path) if telemetry is not None and telemetry.path else None,
+        }
+
+    def run(self, text: Union[str, TextSource], countdown: int = 0,
+            speed: Optional[int] = 60, settle_delay: float = 0.2, start_chars: int = 0,
+            turbo_chunk: int = 0, budget: Optional[float] = None, start_offset: int = 0):
+        """Type in the child and wait for it to finish (see TypingEngine.run)"""
+        source = StringSource(text) if isinstance(text, str) else text
+        if not self._prepared:
+            self.prepare()
+        self._prepared = False
+        self.is_typing = True
+        self.unit = source.unit
+        if self.telemetry is not None:
+            self.telemetry.report = None
+        try:
+            command = {
+                "cmd": "run",
+                "source": _source_spec(source),
+                "countdown": countdown,
+                "speed": speed,
+                "settle_delay": settle_delay,
+                "start_chars": start_chars,
+                "start_offset": start_offset,
+                "turbo_chunk": turbo_chunk,
+                "budget": budget,
+                "settings": self._settings(),
+            }
+            self.start()
+            # The child is idle between runs, so the parent may write
+            self._block.write((start_offset, start_chars, source.total) + _IDLE[3:])
+            self._done.clear()
+            with self._state:
+                self._waiting = True
+            # A child that exited before we started waiting was never reported
+            if not self._send(command) or not self.alive:
+                raise RuntimeError("typing process is not running")
+            if self.stop_requested:
+                # Stopped while the run was being sent: the child prepared after it
+                self._send({"cmd": "stop"})
+            self._done.wait()
+            success, message = self._result
+        except Exception as e:
+            logger.error(f"typing process error: {e}", exc_info=True)
+            with self._state:
+                self._waiting = False
+            success, message = False, f"error: {str(e)}"
+        finally:
+            self.is_typing = False
+        self._emit(self.on_complete, success, message)
+
+    # Progress, read from the shared block
+
+    def _values(self) -> Tuple[float, ...]:
+        block = self._block
+        if block is None:
+            return _IDLE
+        try:
+            return block.read()
+        except ValueError:
+            # Closed under us while shutting down
+            return _IDLE
+
+    @property
+    def typed(self) -> int:
+        return int(self._values()[TYPED - 1])
+
+    @property
+    def chars_typed(self) -> int:
+        return int(self._values()[CHARS - 1])
+
+    @property
+    def total(self) -> int:
+        return int(self._values()[TOTAL - 1])
+
+    @property
+    def start_time(self) -> Optional[float]:
+        return _optional(self._values()[STARTED - 1])
+
+    @property
+    def planned_duration(self) -> Optional[float]:
+        return _optional(self._values()[PLANNED - 1])
+
+    @property
+    def deadline(self) -> Optional[float]:
+        return _optional(self._values()[DEADLINE - 1])
+
+    def elapsed(self) -> float:
+        start_time = self.start_time
+        if start_time is None:
+            return 0.0
+        return self.clock() - start_time
+
+    def remaining_time(self) -> Optional[float]:
+        """The child's estimate, aged by the time since it was written
+        unless paused"""
+        values = self._values()
+        deadline = _optional(values[DEADLINE - 1])
+        if deadline is not None:
+            return max(0.0, deadline - self.clock())
+        remaining = _optional(values[REMAINING - 1])
+        if remaining is None or self.is_paused:
+            return remaining
+        return max(0.0, remaining - (self.clock() - values[STAMP - 1]))
+
+
+class _EngineHost:
+    """The child's side: runs commands against a TypingEngine and publishes
+    its progress to the block"""
+
+    def __init__(self, engine: TypingEngine, block: ProgressBlock, send: Callable[..., None]):
+        self.engine = engine
+        self.block = block
+        self.send = send
+        self._thread: Optional[threading.Thread] = None
+        engine.progress_every = 1
+        engine.on_status = self._status
+        engine.on_started = self._started
+        engine.on_progress = self._publish
+        engine.on_complete = self._complete
+
+    def _publish(self, *args):
+        engine = self.engine
+        remaining = engine.remaining_time() if engine.deadline is None else None
+        self.block.write((
+            engine.typed, engine.chars_typed, engine.total,
+            _number(engine.start_time), _number(engine.planned_duration),
+            _number(engine.deadline), _number(remaining), engine.clock(),
+        ))
+
+    def _status(self, text: str):
+        self._publish()
+        self.send("status", text=text)
+
+    def _started(self):
+        self._publish()
+        self.send("started")
+
+    def _complete(self, success: bool, message: str):
+        self._publish()
+        telemetry = self.engine.telemetry
+        report = telemetry.report if telemetry is not None else None
+        self.send("complete", success=success, message=message, report=report)
+
+    def handle(self, command: Dict[str, Any]) -> bool:
+        """Carry out one command; False once told to exit"""
+        engine = self.engine
+        name = command.get("cmd")
+        if name == "run":
+            if self._thread is not None:
+                # "complete" is sent just before the previous run returns
+                self._thread.join(RUN_JOIN_TIMEOUT)
+            if self._thread is not None and self._thread.is_alive():
+                self.send("complete", success=False, message="error: already typing")
+                return True
+            # Prepared here, so a stop read right after the run is kept
+            engine.prepare()
+            self._thread = threading.Thread(target=self._run, args=(command,),
+                                            name="typing", daemon=True)
+            self._thread.start()
+        elif name == "pause":
+            engine.pause()
+        elif name == "resume":
+            engine.resume()
+        elif name == "stop":
+            engine.stop()
+        elif name == "close":
+            return False
+        else:
+            logger.warning(f"unknown command: {name}")
+        return True
+
+    def wait(self, timeout: float = 5.0):
+        """Stop typing and let the run finish (checkpoint and report included)"""
+        self.engine.stop()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _configure(self, settings: Dict[str, Any], turbo_chunk: int):
+        engine = self.engine
+        engine.max_catchup = settings["max_catchup"]
+        engine.rate_control = settings["rate_control"]
+        engine.burst_mode = settings["burst_mode"]
+        engine.burst_size = settings["burst_size"]
+        engine.timing_profile = settings["timing_profile"]
+        engine.preprocess = create_pipeline(settings["preprocess"], settings["tab_width"])
+        if settings["checkpoint"]:
+            engine.checkpointer = Checkpointer(CheckpointStore(Path(settings["checkpoint"])),
+                                               settings["checkpoint_interval"] or CHECKPOINT_INTERVAL)
+        else:
+            engine.checkpointer = None
+        if not settings["telemetry"]:
+            engine.telemetry = None
+        elif engine.telemetry is None or engine.telemetry.path != _path(settings["report"]):
+            engine.telemetry = SessionTelemetry(_path(settings["report"]))
+        if turbo_chunk and engine.turbo_backend is None:
+            # Dry-run backends stand in for the clipboard too
+            backend = engine.backend
+            engine.turbo_backend = create_backend("clipboard") if backend.name == "pynput" else backend
+
+    def _run(self, command: Dict[str, Any]):
+        try:
+            source = _open_source(command["source"])
+            self._configure(command["settings"], command["turbo_chunk"])
+        except Exception as e:
+            logger.error(f"can't start typing: {e}", exc_info=True)
+            self._complete(False, f"error: {str(e)}")
+            return
+        self.engine.run(source, command["countdown"], command["speed"],
+                        settle_delay=command["settle_delay"], start_chars=command["start_chars"],
+                        turbo_chunk=command["turbo_chunk"], budget=command["budget"],
+                        start_offset=command["start_offset"])
+
+
+def _path(value: Optional[str]) -> Optional[Path]:
+    return Path(value) if value else None
+
+
+def serve(block_path: str, backend_name: str = "pynput") -> int:
+    """Child entry point: read commands from stdin until it closes"""
+    # Keep stdout for events only; anything else printed goes to stderr
+    channel = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    try:
+        os.dup2(2, 1)
+    except OSError:
+        pass
+    sys.stdout = sys.stderr
+    # Ctrl-C in a terminal reaches the whole process group; the parent
+    # turns it into a stop, which leaves a checkpoint behind
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    lock = threading.Lock()
+
+    def send(event: str, **fields):
+        line = json.dumps({"event": event, **fields}) + "\n"
+        with lock:
+            try:
+                channel.write(line)
+                channel.flush()
+            except (OSError, ValueError):
+                pass
+
+    try:
+        backend = create_backend(backend_name)
+    except Exception as e:
+        logger.error(f"keyboard backend unavailable: {e}")
+        send("failed", message=f"keyboard backend unavailable: {e}")
+        return 1
+
+    block = ProgressBlock(block_path)
+    host = _EngineHost(TypingEngine(backend), block, send)
+    logger.info(f"typing process ready (pid {os.getpid()}, {backend_name} backend)")
+    try:
+        for line in sys.stdin:
+            try:
+                command = json.loads(line)
+            except ValueError:
+                logger.warning(f"ignoring malformed command: {line.rstrip()[:80]}")
+                continue
+            if not host.handle(command):
+                break
+    finally:
+        # Told to close, or the window went away: never type on unattended
+        host.wait()
+        block.close()
+    logger.info("typing process exiting")
+    return 0
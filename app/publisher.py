@@ -0,0 +1,63 @@
+"""
+UI Publisher - coalesces engine state into rate-limited Flet updates
+"""
+
+import logging
+import threading
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE_HZ = 12
+
+
+class UIPublisher:
+    """Pushes at most one merged update per frame from a single thread.
+
+    ``render`` is called once per frame; it reads the latest engine state,
+    assigns new values only to the controls whose value actually changed and
+    returns those controls. They are then sent in one ``page.update`` call,
+    so nothing is sent at all on frames where nothing changed.
+    """
+
+    def __init__(self, page, render: Callable[[], List], rate_hz: float = DEFAULT_RATE_HZ):
+        self.page = page
+        self.render = render
+        self.interval = 1.0 / max(1.0, min(60.0, rate_hz))
+        self.frames = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self, flush: bool = True):
+        """Stop publishing; ``flush`` pushes one last frame with the final state"""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self._thread = None
+        if flush:
+            self.publish()
+
+    def publish(self):
+        """Render and push one frame now"""
+        try:
+            changed = self.render()
+            if changed:
+                self.page.update(*changed)
+                self.frames += 1
+        except Exception as e:
+            logger.debug(f"publish error: {e}")
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.publish()
@@ -0,0 +1,161 @@
+"""
+Text Sources - where the typing engine reads its text from
+"""
+
+import codecs
+import hashlib
+import logging
+import mmap
+import os
+from pathlib import Path
+from typing import Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bytes decoded per step when streaming from a file
+BLOCK_SIZE = 64 * 1024
+
+
+class TextSource:
+    """Base class for text fed to the typing engine.
+
+    Sources yield ``(text, units)`` pieces, where ``units`` is how far the
+    piece advances progress. ``total`` is the sum of all units, so progress
+    and ETA never require the whole document in memory.
+    """
+
+    unit = "chars"
+    unit_name = "characters"
+    total = 0
+
+    def iter_pieces(self, skip_chars: int = 0) -> Iterator[Tuple[str, int]]:
+        """Yield pieces; with ``skip_chars`` the first piece is ``("", units skipped)``"""
+        raise NotImplementedError
+
+    def excerpt(self, offset: int, limit: int) -> str:
+        """Up to ``limit`` characters starting ``offset`` units in, for previews"""
+        raise NotImplementedError
+
+    def fingerprint(self) -> str:
+        """Stable hash of the source text, used to match checkpoints"""
+        if self._fingerprint is None:
+            self._fingerprint = self._hash()
+        return self._fingerprint
+
+    _fingerprint = None
+
+    def _hash(self) -> str:
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return f"{self.total} {self.unit_name}"
+
+
+class StringSource(TextSource):
+    """Text already held in memory, e.g. from the text field"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.total = len(text)
+
+    def iter_pieces(self, skip_chars: int = 0) -> Iterator[Tuple[str, int]]:
+        skip_chars = min(skip_chars, len(self.text))
+        if skip_chars:
+            yield "", skip_chars
+        if skip_chars < len(self.text):
+            yield self.text[skip_chars:], len(self.text) - skip_chars
+
+    def excerpt(self, offset: int, limit: int) -> str:
+        return self.text[offset:offset + limit]
+
+    def _hash(self) -> str:
+        digest = hashlib.blake2b(self.text.encode("utf-8", "surrogatepass"), digest_size=16)
+        return digest.hexdigest()
+
+
+class MappedFileSource(TextSource):
+    """Memory-maps a file and decodes it incrementally.
+
+    Memory use is bounded by ``block_size`` regardless of file size, and
+    progress is measured in bytes so no up-front character count is needed.
+    """
+
+    unit = "bytes"
+    unit_name = "bytes"
+
+    def __init__(self, path, encoding: str = "utf-8", block_size: int = BLOCK_SIZE):
+        self.path = Path(path)
+        self.encoding = encoding
+        self.block_size = block_size
+        self.total = os.path.getsize(self.path)
+
+    def iter_pieces(self, skip_chars: int = 0) -> Iterator[Tuple[str, int]]:
+        if self.total == 0:
+            return
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        with open(self.path, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            size = len(mapped)
+            carry = 0
+            held = 0
+            for start in range(0, size, self.block_size):
+                end = min(size, start + self.block_size)
+                text = decoder.decode(mapped[start:end], final=end >= size)
+                # Bytes held back for a split multi-byte character are carried
+                # into the next piece, so units always sum to the file size
+                units = carry + end - start
+                if text and skip_chars:
+                    # Nothing is yielded before the resume point, so the
+                    # skipped units are its byte offset; the text starts
+                    # with the bytes held back from the previous block
+                    if skip_chars >= len(text):
+                        skip_chars -= len(text)
+                        carry = units
+                        held = len(decoder.getstate()[0])
+                        if not skip_chars:
+                            # Resume right after this piece
+                            yield "", end - held
+                            carry = held
+                        continue
+                    head = text[:skip_chars]
+                    head_units = min(units, start - held + len(head.encode(self.encoding, "replace")))
+                    skip_chars = 0
+                    yield "", head_units
+                    text, units = text[len(head):], units - head_units
+                held = len(decoder.getstate()[0])
+                if text:
+                    yield text, units
+                    carry = 0
+                else:
+                    carry = units
+            logger.debug(f"finished streaming {self.path}")
+
+    def excerpt(self, offset: int, limit: int) -> str:
+        # Read only what the preview needs; utf-8 needs at most 4 bytes a char
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read(4 * limit)
+        text = data.decode(self.encoding, errors="replace")
+        # An offset inside a multi-byte character decodes as replacements
+        return text.lstrip("\ufffd")[:limit]
+
+    def _hash(self) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        if self.total:
+            with open(self.path, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for start in range(0, len(mapped), 1024 * 1024):
+                    digest.update(mapped[start:start + 1024 * 1024])
+        return digest.hexdigest()
+
+    def describe(self) -> str:
+        return f"{self.path.name} ({format_size(self.total)})"
+
+
+def format_size(size: int) -> str:
+    """Format a byte count to a readable size"""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
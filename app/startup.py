@@ -0,0 +1,184 @@
+"""
+Startup Profile - import time and time-to-first-frame for cold starts
+
+Set ``ACHEIRIA_PROFILE_STARTUP=1`` (or pass ``--profile-startup``) to log a
+startup report and write it to ~/.acheiria/startup.json. With the value
+``exit`` the window closes again as soon as the first frame is sent.
+
+Check a script or frozen build against a cold-start budget with::
+
+    python -m app.startup                       # python main.py
+    python -m app.startup --imports-only        # no display needed
+    python -m app.startup --exe dist/Acheiria   # PyInstaller build
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV = "ACHEIRIA_PROFILE_STARTUP"
+PROFILE_FLAG = "--profile-startup"
+
+# Cold-start budgets in seconds, measured from process launch
+IMPORT_BUDGET = 1.5
+FIRST_FRAME_BUDGET = 4.0
+
+# Seconds to wait for a profiled launch before giving up
+CHECK_TIMEOUT = 60.0
+
+
+def profile_mode() -> Optional[str]:
+    """'report', 'exit', or None when startup profiling is off"""
+    value = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if value == "exit":
+        return "exit"
+    if value not in ("", "0", "false", "no") or PROFILE_FLAG in sys.argv[1:]:
+        return "report"
+    return None
+
+
+def report_path() -> Path:
+    return Path.home() / '.acheiria' / 'startup.json'
+
+
+class StartupProfile:
+    """Named timestamps from the top of main.py to the first frame.
+
+    ``started`` / ``started_wall`` should be taken before any other import,
+    so ``imports`` covers Flet and the app package. Marks are free when
+    profiling is off.
+    """
+
+    def __init__(self, started: Optional[float] = None, started_wall: Optional[float] = None):
+        self.started = time.perf_counter() if started is None else started
+        self.started_wall = time.time() if started_wall is None else started_wall
+        self.mode = profile_mode()
+        self.marks: List[tuple] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    def mark(self, name: str):
+        if self.mode is not None:
+            self.marks.append((name, time.perf_counter() - self.started))
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "frozen": bool(getattr(sys, 'frozen', False)),
+            "python": sys.version.split()[0],
+            "started_wall": self.started_wall,
+            "marks": {name: round(seconds, 4) for name, seconds in self.marks},
+            "modules": len(sys.modules),
+        }
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """Log and save the report; returns it, or None if profiling is off"""
+        if self.mode is None:
+            return None
+        report = self.report()
+        report["finished_wall"] = time.time()
+        timings = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.marks)
+        logger.info(f"startup: {timings} ({report['modules']} modules loaded)")
+        try:
+            path = report_path()
+            path.parent.mkdir(exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+        except Exception as e:
+            logger.warning(f"could not save startup report: {e}")
+        return report
+
+
+def measure(command: List[str], timeout: float = CHECK_TIMEOUT,
+            cwd: Optional[str] = None) -> Dict[str, Any]:
+    """Launch command once with profiling set to exit and return its timings.
+
+    ``launch`` times are measured from just before the process is spawned,
+    so they include interpreter start-up or the PyInstaller bootloader.
+    """
+    import subprocess
+
+    path = report_path()
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    env = dict(os.environ, **{PROFILE_ENV: "exit"})
+    launched = time.time()
+    subprocess.run(command, env=env, cwd=cwd, timeout=timeout, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    with open(path, 'r') as f:
+        report = json.load(f)
+    marks = report.get("marks", {})
+    offset = report["started_wall"] - launched
+    result = {"launch_to_main": offset}
+    for name, seconds in marks.items():
+        result[name] = offset + seconds
+    return result
+
+
+def check_budget(command: List[str], import_budget: float, frame_budget: Optional[float],
+                 runs: int = 3, cwd: Optional[str] = None) -> int:
+    """Measure ``runs`` launches and fail if the slowest exceeds a budget"""
+    samples = [measure(command, cwd=cwd) for _ in range(max(1, runs))]
+    budgets = {"imports": import_budget}
+    if frame_budget is not None:
+        budgets["first frame"] = frame_budget
+    status = 0
+    for name, budget in budgets.items():
+        values = [sample.get(name) for sample in samples]
+        if None in values:
+            print(f"{name:12s} missing from report", file=sys.stderr)
+            status = 1
+            continue
+        worst = max(values)
+        ok = worst <= budget
+        status = status or (0 if ok else 1)
+        print(f"{name:12s} worst {worst * 1000:7.0f} ms  best {min(values) * 1000:7.0f} ms"
+              f"  budget {budget * 1000:.0f} ms  {'ok' if ok else 'OVER BUDGET'}")
+    return status
+
+
+_IMPORT_ONLY = "import main; main.startup.finish()"
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m app.startup",
+                                     description="cold-start budget check")
+    parser.add_argument("--exe", help="frozen build to launch instead of main.py")
+    parser.add_argument("--imports-only", action="store_true",
+                        help="only import main.py (no window, no display needed)")
+    parser.add_argument("--runs", type=int, default=3, help="launches to measure")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET,
+                        help="seconds from launch until imports finish")
+    parser.add_argument("--frame-budget", type=float, default=FIRST_FRAME_BUDGET,
+                        help="seconds from launch until the first frame is sent")
+    args = parser.parse_args(argv)
+
+    root = str(Path(__file__).resolve().parent.parent)
+    frame_budget = args.frame_budget
+    if args.exe:
+        command = [args.exe]
+    elif args.imports_only:
+        command = [sys.executable, "-c", _IMPORT_ONLY]
+        frame_budget = None
+    else:
+        command = [sys.executable, "main.py"]
+    try:
+        return check_budget(command, args.import_budget, frame_budget, args.runs, cwd=root)
+    except Exception as e:
+        print(f"startup check failed: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
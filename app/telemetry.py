@@ -0,0 +1,178 @@
+"""
+Session Telemetry - per-run latency and lateness, reported after each session
+"""
+
+import logging
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Any, Optional, Sequence
+
+from app.config import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+# Samples kept per series; long sessions are decimated to fit
+SAMPLE_CAPACITY = 1 << 16
+
+# Seconds per effective-WPM window
+WPM_WINDOW = 5.0
+
+# Upper bin edges (ms) of the latency / lateness histograms
+HISTOGRAM_EDGES_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of a sequence"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[rank]
+
+
+def histogram(values: Sequence[float], edges_ms: Sequence[float] = HISTOGRAM_EDGES_MS) -> Dict[str, int]:
+    """Count values (seconds) into millisecond bins labelled by upper edge"""
+    counts = [0] * (len(edges_ms) + 1)
+    for value in values:
+        ms = value * 1000
+        for i, edge in enumerate(edges_ms):
+            if ms <= edge:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f"<={edge:g}" for edge in edges_ms] + [f">{edges_ms[-1]:g}"]
+    return dict(zip(labels, counts))
+
+
+def _series(values: Sequence[float]) -> Dict[str, Any]:
+    return {
+        "p50": round(percentile(values, 50) * 1000, 3),
+        "p90": round(percentile(values, 90) * 1000, 3),
+        "p99": round(percentile(values, 99) * 1000, 3),
+        "max": round(max(values, default=0.0) * 1000, 3),
+        "histogram": histogram(values),
+    }
+
+
+def default_report_path() -> Path:
+    """session-report.json next to acheiria.log"""
+    from app.logs import log_path
+    return log_path().with_name('session-report.json')
+
+
+class SessionTelemetry:
+    """Records every backend call of a session into preallocated arrays.
+
+    ``record`` is called from the typing loop with the send time, the
+    scheduling lateness and how long the backend call took; it only writes
+    into fixed arrays. When they fill up every other sample is dropped and
+    the sampling stride doubles, so memory stays bounded for any length.
+    """
+
+    def __init__(self, path: Optional[Path] = None, capacity: int = SAMPLE_CAPACITY,
+                 window: float = WPM_WINDOW):
+        self.path = Path(path) if path is not None else None
+        self.capacity = capacity
+        self.window = window
+        self.latency = array("d", bytes(8 * capacity))
+        self.lateness = array("d", bytes(8 * capacity))
+        self.window_wpm = array("d")
+        self.report: Optional[Dict[str, Any]] = None
+        self.begin(0.0, None)
+
+    def begin(self, started: float, target_wpm: Optional[int]):
+        self.started = started
+        self.target_wpm = target_wpm
+        self.report = None
+        self.count = 0
+        self.stride = 1
+        self._skip = 0
+        self.runs = 0
+        self.keys = 0
+        self.paused = 0.0
+        del self.window_wpm[:]
+        self._window_end = started + self.window
+        self._window_keys = 0
+
+    def record(self, now: float, lateness: float, latency: float, count: int):
+        self.runs += 1
+        self.keys += count
+        if now >= self._window_end:
+            self._close_windows(now)
+        self._window_keys += count
+        if self._skip:
+            self._skip -= 1
+            return
+        i = self.count
+        if i == self.capacity:
+            i = self._compact()
+        self.latency[i] = latency
+        self.lateness[i] = lateness
+        self.count = i + 1
+        self._skip = self.stride - 1
+
+    def pause(self, seconds: float):
+        """Exclude a pause from the WPM windows"""
+        self.paused += seconds
+        self._window_end += seconds
+
+    def _close_windows(self, now: float):
+        per_minute = 60.0 / self.window
+        while now >= self._window_end:
+            self.window_wpm.append(self._window_keys / 5 * per_minute)
+            self._window_keys = 0
+            self._window_end += self.window
+
+    def _compact(self) -> int:
+        latency = self.latency[0:self.count:2]
+        kept = len(latency)
+        self.latency[0:kept] = latency
+        self.lateness[0:kept] = self.lateness[0:self.count:2]
+        self.stride *= 2
+        self.count = kept
+        return kept
+
+    def end(self, now: float, success: bool, description: str = "") -> Dict[str, Any]:
+        """Build the session report, save it, and keep it as ``report``"""
+        elapsed = max(0.0, now - self.started - self.paused)
+        latency = self.latency[:self.count]
+        lateness = self.lateness[:self.count]
+        minutes = elapsed / 60
+        achieved = self.keys / 5 / minutes if minutes > 0 else 0.0
+        self.report = {
+            "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "source": description,
+            "completed": success,
+            "typing_seconds": round(elapsed, 3),
+            "paused": round(self.paused, 3),
+            "keystrokes": self.keys,
+            "calls": self.runs,
+            "target_wpm": self.target_wpm,
+            "achieved_wpm": round(achieved, 1),
+            "samples": self.count,
+            "sample_stride": self.stride,
+            "latency_ms": _series(latency),
+            "lateness_ms": _series(lateness),
+            "window_seconds": self.window,
+            "window_wpm": [round(wpm, 1) for wpm in self.window_wpm],
+        }
+        path = self.path or default_report_path()
+        try:
+            write_json_atomic(path, self.report)
+        except Exception as e:
+            logger.warning(f"could not save session report: {e}")
+        logger.info(f"session: {summary_line(self.report)}")
+        return self.report
+
+
+def summary_line(report: Dict[str, Any]) -> str:
+    """One-line summary for the status area"""
+    target = report.get("target_wpm")
+    wpm = f"{report['achieved_wpm']:.0f}" + (f"/{target}" if target else "") + " wpm"
+    late = report["lateness_ms"]
+    send = report["latency_ms"]
+    return (f"{wpm} • late p50 {late['p50']:.1f} / p99 {late['p99']:.1f} ms"
+            f" • send p99 {send['p99']:.2f} ms")
+
@@ -0,0 +1,154 @@
+"""
+Timing Profiles - precomputed inter-key delays for each compiled plan chunk
+
+A profile turns a chunk's keystrokes into one delay factor per keystroke
+(the gap after it, in units of the target interval) and sums them per run,
+so the typing loop only reads ``chunk.steps[r]``. Factors are normalised
+to a mean of 1.0, so every profile types at exactly the target WPM and the
+planned duration is the number of keystrokes divided by the target rate.
+"""
+
+import logging
+import random
+from array import array
+from itertools import accumulate
+from typing import Sequence
+
+from app.pacing import jitter_offset
+
+logger = logging.getLogger(__name__)
+
+PROFILE_STEADY = "steady"
+PROFILE_SAWTOOTH = "sawtooth"
+PROFILE_UNIFORM = "uniform"
+PROFILE_LOGNORMAL = "lognormal"
+PROFILE_NATURAL = "natural"
+PROFILES = (PROFILE_SAWTOOTH, PROFILE_STEADY, PROFILE_UNIFORM, PROFILE_LOGNORMAL, PROFILE_NATURAL)
+
+# Character classes, stored per key id in the KeyTable
+CLASS_OTHER = 0
+CLASS_SPACE = 1
+CLASS_PUNCTUATION = 2
+CLASS_NEWLINE = 3
+
+# Relative pause after each class in the 'natural' profile
+CLASS_WEIGHTS = (1.0, 1.3, 2.5, 4.0)
+
+# Spread of the random profiles
+UNIFORM_SPREAD = 0.3
+LOGNORMAL_SIGMA = 0.35
+
+
+def char_class(char: str) -> int:
+    if char in "\n\r":
+        return CLASS_NEWLINE
+    if char in ".,;:!?)]}":
+        return CLASS_PUNCTUATION
+    if char.isspace():
+        return CLASS_SPACE
+    return CLASS_OTHER
+
+
+class TimingProfile:
+    """Sawtooth rhythm (the original pacing); base class for other profiles"""
+
+    name = PROFILE_SAWTOOTH
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self._rng = None
+
+    def steps(self, ids: Sequence[int], bounds: Sequence[int], first_key: int,
+              classes: Sequence[int]) -> array:
+        """Summed delay factors of each run; ``first_key`` is the keystroke
+        index of ``ids[0]`` within the session"""
+        steps = array("d")
+        previous = jitter_offset(first_key)
+        for end in bounds:
+            position = jitter_offset(first_key + end)
+            steps.append(position - previous)
+            previous = position
+        return steps
+
+
+class SteadyProfile(TimingProfile):
+    """Every key one interval apart"""
+
+    name = PROFILE_STEADY
+
+    def steps(self, ids, bounds, first_key, classes) -> array:
+        steps = array("d")
+        previous = 0
+        for end in bounds:
+            steps.append(end - previous)
+            previous = end
+        return steps
+
+
+class RandomProfile(TimingProfile):
+    """Random factors per keystroke, optionally weighted by character class"""
+
+    def _factors(self, rng, ids, classes):
+        raise NotImplementedError
+
+    def steps(self, ids, bounds, first_key, classes) -> array:
+        if not len(ids):
+            return array("d", bytes(8 * len(bounds)))
+        if self._rng is None:
+            self._rng = random.Random(self.seed)
+        factors = self._factors(self._rng, ids, classes)
+        scale = len(factors) / sum(factors)
+        prefix = array("d", [0.0])
+        prefix.extend(accumulate(factor * scale for factor in factors))
+        steps = array("d")
+        previous = 0.0
+        for end in bounds:
+            position = prefix[end]
+            steps.append(position - previous)
+            previous = position
+        return steps
+
+
+class UniformProfile(RandomProfile):
+    """Factors uniform in 1 +/- UNIFORM_SPREAD"""
+
+    name = PROFILE_UNIFORM
+
+    def _factors(self, rng, ids, classes):
+        low, high = 1 - UNIFORM_SPREAD, 1 + UNIFORM_SPREAD
+        return array("d", (rng.uniform(low, high) for _ in range(len(ids))))
+
+
+class LognormalProfile(RandomProfile):
+    """Log-normal factors: mostly even, with an occasional long gap"""
+
+    name = PROFILE_LOGNORMAL
+
+    def _factors(self, rng, ids, classes):
+        return array("d", (rng.lognormvariate(0.0, LOGNORMAL_SIGMA) for _ in range(len(ids))))
+
+
+class NaturalProfile(LognormalProfile):
+    """Log-normal factors with longer pauses after spaces, punctuation and newlines"""
+
+    name = PROFILE_NATURAL
+
+    def _factors(self, rng, ids, classes):
+        factors = super()._factors(rng, ids, classes)
+        for i, key_id in enumerate(ids):
+            factors[i] *= CLASS_WEIGHTS[classes[key_id]]
+        return factors
+
+
+_PROFILE_CLASSES = {
+    cls.name: cls
+    for cls in (TimingProfile, SteadyProfile, UniformProfile, LognormalProfile, NaturalProfile)
+}
+
+
+def create_profile(name: str = PROFILE_SAWTOOTH, seed: int = 0) -> TimingProfile:
+    """Instantiate a timing profile by name"""
+    try:
+        return _PROFILE_CLASSES[name](seed)
+    except KeyError:
+        raise ValueError(f"unknown timing profile: {name}") from None
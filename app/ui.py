@@ -1,23 +1,71 @@
 import flet as ft
 import logging
-import pyperclip
-import time
-import threading
 import platform
-import asyncio
 from typing import Dict, Any
 from pathlib import Path
 
+from app.backends import HAS_PYNPUT, ClipboardBackend, PynputBackend
+from app.checkpoint import CHECKPOINT_INTERVAL, Checkpointer, CheckpointStore
+from app.engine import TypingEngine, format_time, parse_time
+from app.meter import UpdateMeter, meter_enabled
+from app.plan import BURST_MODES, BURST_OFF, BURST_WORDS
+from app.preprocess import create_pipeline
+from app.process import EngineProcess
+from app.publisher import DEFAULT_RATE_HZ, UIPublisher
+from app.sources import MappedFileSource, StringSource
+from app.telemetry import SessionTelemetry, summary_line
+from app.timing import PROFILES, PROFILE_SAWTOOTH
+from app.worker import TypingJob, TypingWorker
+
 logger = logging.getLogger(__name__)
 
-# Import pynput for keyboard control 
-try:
-    from pynput import keyboard
-    HAS_PYNPUT = True
-    logger.info("pynput loaded")
-except ImportError:
-    HAS_PYNPUT = False
-    logger.error("pynput not installed")
+# The text field shows at most this many lines; more only adds a scrollbar
+MAX_VISIBLE_LINES = 3
+
+# Pastes longer than this are held server-side and only previewed, so the
+# client never receives (or re-receives on every update) the whole text
+INLINE_TEXT_LIMIT = 10_000
+
+# A held source's preview: lines from the start and at the typing position
+PREVIEW_LINES = 3
+PREVIEW_WIDTH = 80
+
+TEXT_HINT = "paste or type your stuff here..."
+
+# Texts up to this long are preprocessed once up front for the estimate;
+# longer ones get the exact figure from the plan during the countdown
+COUNT_LIMIT = 200_000
+
+
+def _count_lines(text: str, cap: int) -> int:
+    """Count lines in text, stopping the scan once ``cap`` lines are found"""
+    if not text:
+        return 1
+    lines = 1
+    pos = text.find('\n')
+    while pos != -1 and lines < cap:
+        lines += 1
+        pos = text.find('\n', pos + 1)
+    return lines
+
+
+def _has_text(text: str) -> bool:
+    """True if text has any non-whitespace (stops at the first one found)"""
+    return bool(text) and not text.isspace()
+
+
+def _first_lines(text: str, lines: int = PREVIEW_LINES, width: int = PREVIEW_WIDTH) -> str:
+    return "\n".join(line[:width] for line in text.split("\n", lines)[:lines])
+
+
+def _preview(source, offset: int = 0) -> str:
+    """First lines of a held source and, once typing, the lines at ``offset``"""
+    limit = 4 * PREVIEW_LINES * PREVIEW_WIDTH
+    head = _first_lines(source.excerpt(0, limit))
+    if offset <= 0:
+        return head
+    return f"{head}\n⋯\n▸ {_first_lines(source.excerpt(offset, limit))}"
+
 
 class AcheiriaApp(ft.Column):
     """Main application UI - Black & Oxblood Theme - NEW Flet API"""
@@ -30,28 +78,70 @@ class AcheiriaApp(ft.Column):
         
         # State
         self.is_folded = False
-        self.is_typing = False
-        self.is_paused = False
-        self.stop_typing = False
-        self.current_thread = None
-        self.timer_thread = None
-        self.typing_start_time = None
+        self.held_source = None
+        self._preview_source = None
+        self.resume_checkpoint = None
         self.estimated_duration = 0
+        self.speed_label = ""
+        self._status_post = (0, None)
+        self._status_applied = 0
+        self._published_typed = -1
         
         # Platform
         self.os_type = platform.system()
         logger.info(f"running on {self.os_type}")
         
-        # Initialize keyboard
-        if HAS_PYNPUT:
-            try:
-                self.keyboard = keyboard.Controller()
-                logger.info("keyboard initialized")
-            except Exception as e:
-                logger.error(f"keyboard init failed: {e}")
-                self.keyboard = None
+        # Keyboard backends are created on first use (see _ensure_keyboard)
+        self.keyboard = None
+        self.turbo_backend = None
+        
+        # Typing engine, in a child process when UI work must not touch pacing
+        if self.config.get('engine_process', False):
+            self.engine = EngineProcess(
+                max_catchup=self.config.get('max_catchup', 0.25),
+                rate_control=self.config.get('rate_control', True),
+            )
         else:
-            self.keyboard = None
+            self.engine = TypingEngine(
+                None,
+                max_catchup=self.config.get('max_catchup', 0.25),
+                rate_control=self.config.get('rate_control', True),
+            )
+        self.engine.on_status = self._post_status
+        
+        # Resume points for long sessions
+        self.checkpoints = CheckpointStore()
+        self.saved_checkpoint = self.checkpoints.load()
+        self.engine.checkpointer = Checkpointer(
+            self.checkpoints,
+            interval=self.config.get('checkpoint_interval', CHECKPOINT_INTERVAL),
+        )
+        
+        # Per-session latency report, shown in the status area when done
+        self.telemetry = SessionTelemetry()
+        self.engine.telemetry = self.telemetry
+        
+        # Long-lived worker that types queued jobs back-to-back
+        self.worker = TypingWorker(self.engine)
+        self.worker.on_job_started = self._job_started
+        self.worker.on_job_finished = self._job_finished
+        self.worker.on_queue_changed = self._queue_changed
+        
+        # Debug counts of updates and bytes sent, logged after each job
+        self.update_meter = UpdateMeter(page).install() if meter_enabled() else None
+        
+        # Single publisher for progress, status and timer updates
+        self.publisher = UIPublisher(
+            page,
+            self._render_frame,
+            rate_hz=self.config.get('ui_refresh_hz', DEFAULT_RATE_HZ),
+        )
+        burst_mode = self.config.get('burst_mode', BURST_OFF)
+        self.engine.burst_mode = burst_mode if burst_mode in BURST_MODES else BURST_OFF
+        self.engine.burst_size = max(1, int(self.config.get('burst_size', 32)))
+        profile = self.config.get('timing_profile', PROFILE_SAWTOOTH)
+        self.engine.timing_profile = profile if profile in PROFILES else PROFILE_SAWTOOTH
+        self.engine.preprocess = self._create_pipeline(self.config.get('preprocess', []))
         
         # Black & Oxblood Theme
         self.bg_color = "#000000"  # Black background
@@ -64,6 +154,7 @@ class AcheiriaApp(ft.Column):
         
         # Window state
         self.window_initialized = False
+        self._window_height = None
         
         # Build the UI immediately (new API)
         self._build_ui()
@@ -71,6 +162,15 @@ class AcheiriaApp(ft.Column):
         # Initialize
         self.did_mount()
     
+    def is_isolated(self):
+        # Keep page.update() (window size, always on top) from diffing the
+        # whole app; its controls are pushed with targeted updates instead
+        return True
+    
+    def _refresh(self, *controls):
+        """Send just these controls to the client, in one message"""
+        self.page.update(*controls)
+    
     def _build_ui(self):
         """Build UI with Black & Oxblood theme - NEW API"""
         
@@ -90,7 +190,7 @@ class AcheiriaApp(ft.Column):
         
         # Text input with max 3 lines and scrolling
         self.text_input = ft.TextField(
-            hint_text="paste or type your stuff here...",
+            hint_text=TEXT_HINT,
             hint_style=ft.TextStyle(color="#666666"),
             multiline=True,
             min_lines=1,
@@ -106,13 +206,24 @@ class AcheiriaApp(ft.Column):
             expand=True,
         )
         
+        # Preview of a file or long paste held outside the text field
+        self.preview_text = ft.Text(
+            "",
+            color="#999999",
+            size=11,
+            font_family="Courier New",
+            no_wrap=True,
+            visible=False,
+        )
+        
         # Container for text input with scrolling
         self.text_container = ft.Container(
             content=ft.Column([
                 ft.Container(
                     content=self.text_input,
                     expand=True,
-                )
+                ),
+                self.preview_text,
             ], scroll=ft.ScrollMode.AUTO),
             expand=True,
             padding=10,
@@ -131,6 +242,19 @@ class AcheiriaApp(ft.Column):
             height=36,
         )
         
+        self.file_btn = ft.ElevatedButton(
+            "file",
+            on_click=self.pick_file,
+            style=ft.ButtonStyle(
+                bgcolor={"": self.oxblood_dark, "hovered": self.oxblood},
+                color=self.text_color,
+                padding=8,
+                overlay_color={"": self.oxblood_light},
+            ),
+            height=36,
+        )
+        self.file_picker = None
+        
         self.type_btn = ft.ElevatedButton(
             "autotype",
             on_click=self.start_typing,
@@ -144,6 +268,39 @@ class AcheiriaApp(ft.Column):
             disabled=True,
         )
         
+        self.queue_btn = ft.ElevatedButton(
+            "queue",
+            on_click=self.queue_current,
+            style=ft.ButtonStyle(
+                bgcolor={"": self.oxblood_dark, "hovered": self.oxblood},
+                color=self.text_color,
+                padding=8,
+                overlay_color={"": self.oxblood_light},
+            ),
+            height=36,
+        )
+        
+        # Queued jobs, next first
+        self.queue_list = ft.Column(spacing=0, scroll=ft.ScrollMode.AUTO)
+        self.queue_container = ft.Container(
+            content=self.queue_list,
+            padding=ft.padding.only(left=10, right=10, bottom=5),
+            visible=False,
+        )
+        
+        self.resume_btn = ft.ElevatedButton(
+            "resume",
+            on_click=self.resume_typing,
+            style=ft.ButtonStyle(
+                bgcolor={"": self.oxblood_dark, "hovered": self.oxblood},
+                color=self.text_color,
+                padding=8,
+                overlay_color={"": self.oxblood_light},
+            ),
+            height=36,
+            visible=False,
+        )
+        
         self.pause_btn = ft.ElevatedButton(
             "pause",
             on_click=self.toggle_pause,
@@ -200,6 +357,20 @@ class AcheiriaApp(ft.Column):
             expand=True,
         )
         
+        # Time budget: when set, the speed is solved to finish in this long
+        self.budget_input = ft.TextField(
+            value=self.config.get('time_budget', ''),
+            hint_text="e.g. 12m",
+            hint_style=ft.TextStyle(color="#666666", size=10),
+            text_style=ft.TextStyle(color=self.text_color, size=11),
+            border_color=self.oxblood_dark,
+            focused_border_color=self.oxblood,
+            content_padding=6,
+            dense=True,
+            width=80,
+            on_change=self.update_budget_setting,
+        )
+        
         self.always_on_top_switch = ft.Switch(
             value=self.config.get('always_on_top', True),
             active_color=self.oxblood,
@@ -207,6 +378,20 @@ class AcheiriaApp(ft.Column):
             on_change=self.toggle_always_on_top,
         )
         
+        self.burst_switch = ft.Switch(
+            value=self.engine.burst_mode != BURST_OFF,
+            active_color=self.oxblood,
+            inactive_thumb_color=self.oxblood_dark,
+            on_change=self.toggle_burst_mode,
+        )
+        
+        self.turbo_switch = ft.Switch(
+            value=self.config.get('turbo_mode', False),
+            active_color=self.oxblood,
+            inactive_thumb_color=self.oxblood_dark,
+            on_change=self.toggle_turbo_mode,
+        )
+        
         # Progress bar
         self.progress_bar = ft.ProgressBar(
             value=0,
@@ -231,6 +416,10 @@ class AcheiriaApp(ft.Column):
                     ft.Text("acheiria[by_phemi]", size=15, weight=ft.FontWeight.BOLD, color=self.accent_color),
                 ], spacing=8),
                 ft.Row([
+                    ft.Text("turbo", size=10, color=self.text_color),
+                    self.turbo_switch,
+                    ft.Text("burst", size=10, color=self.text_color),
+                    self.burst_switch,
                     ft.Text("always on top", size=10, color=self.text_color),
                     self.always_on_top_switch,
                 ], spacing=6),
@@ -257,7 +446,10 @@ class AcheiriaApp(ft.Column):
                 ft.Container(
                     content=ft.Row([
                         self.paste_btn,
+                        self.file_btn,
                         self.type_btn,
+                        self.queue_btn,
+                        self.resume_btn,
                         ft.Container(expand=True),
                         self.pause_btn,
                         self.stop_btn,
@@ -265,6 +457,9 @@ class AcheiriaApp(ft.Column):
                     padding=ft.padding.only(left=10, right=10, bottom=5),
                 ),
                 
+                # Job queue
+                self.queue_container,
+                
                 # Settings panel
                 ft.Container(
                     content=ft.Column([
@@ -278,6 +473,8 @@ class AcheiriaApp(ft.Column):
                                    weight=ft.FontWeight.BOLD, width=80),
                             self.speed_slider,
                             ft.Text("wpm", size=10, color=self.oxblood_light),
+                            ft.Text("or finish in", size=10, color=self.text_color),
+                            self.budget_input,
                         ], spacing=10),
                     ], spacing=8),
                     padding=10,
@@ -328,280 +525,557 @@ class AcheiriaApp(ft.Column):
     
     def did_mount(self):
         """Initialize window and check permissions - called automatically"""
-        self._check_and_request_permissions()
+        if self.os_type == "Darwin":
+            # Probing permissions loads pynput; keep it off the first frame
+            self.page.run_thread(self._check_and_request_permissions)
+        if isinstance(self.engine, EngineProcess):
+            # Start the child now, so the first job doesn't wait for it
+            self.page.run_thread(self.engine.start)
+        # Matching the saved file hashes it; keep that off the first frame too
+        self.page.run_thread(self._offer_saved_file)
         self._calculate_window_size(initial=True)
         self.window_initialized = True
     
     def will_unmount(self):
         """Clean up resources"""
-        self.stop_typing = True
-        if self.current_thread and self.current_thread.is_alive():
-            self.current_thread.join(timeout=1)
+        self.worker.close(timeout=1)
+        if isinstance(self.engine, EngineProcess):
+            self.engine.close()
+        self.config_manager.flush()
+        if self.update_meter is not None:
+            self.update_meter.log("ui updates this run")
     
     # Rest of the methods remain the same (on_text_changed, paste_from_clipboard, etc.)
     # Only change is remove the old build() method and use _build_ui() instead
     
     def on_text_changed(self, e):
         """Handle text changes without auto-positioning window"""
-        has_text = bool(self.text_input.value and self.text_input.value.strip())
-        self.type_btn.disabled = not has_text or not HAS_PYNPUT
+        if self.held_source is not None and self.text_input.value:
+            # Typing into the field replaces the held file or paste
+            self._release_source()
+            self._refresh(self.text_input, self.preview_text)
+        disabled = not self._can_type()
+        if self.type_btn.disabled != disabled:
+            self.type_btn.disabled = disabled
+            self.type_btn.update()
+        
+        # Only hash the text when its length matches the saved checkpoint
+        text = self.text_input.value or ""
+        saved = self.saved_checkpoint
+        if self.resume_checkpoint or (saved and saved.get('total') == len(text)):
+            if self.held_source is None:
+                self._refresh_resume(StringSource(text))
+                self.resume_btn.update()
         
         # Auto-adjust window height based on content without repositioning
         self._calculate_window_size()
-        
-        self.update()
     
     def paste_from_clipboard(self, e):
         """Paste from clipboard without auto-positioning window"""
         try:
+            import pyperclip
             text = pyperclip.paste()
             if text:
-                self.text_input.value = text
+                source = StringSource(text)
+                if len(text) > INLINE_TEXT_LIMIT:
+                    self._hold_source(source, f"pasted {source.describe()} • type here to replace")
+                else:
+                    self._release_source()
+                    self.text_input.value = text
                 self.type_btn.disabled = not HAS_PYNPUT
-                self.show_status(f"pasted {len(text)} characters")
+                self._set_status(f"pasted {len(text)} characters")
                 logger.info(f"pasted {len(text)} chars")
+                self._refresh_resume(source)
                 
                 # Auto-adjust window height after pasting without repositioning
                 self._calculate_window_size()
             else:
-                self.show_status("clipboard is empty", True)
+                self._set_status("clipboard is empty", True)
         except Exception as ex:
             logger.error(f"paste error: {ex}")
-            self.show_status(f"paste failed: {str(ex)}", True)
-        self.update()
+            self._set_status(f"paste failed: {str(ex)}", True)
+        self._refresh(self.text_input, self.preview_text, self.type_btn, self.resume_btn,
+                      self.status_text)
+    
+    def pick_file(self, e):
+        """Open a file picker for typing straight from a file"""
+        if self.file_picker is None:
+            self.file_picker = ft.FilePicker(on_result=self.on_file_picked)
+            self.page.overlay.append(self.file_picker)
+            self.page.update()
+        self.file_picker.pick_files(dialog_title="type from file", allow_multiple=False)
+    
+    def on_file_picked(self, e):
+        """Use the picked file as the typing source, without loading it"""
+        if not e.files:
+            return
+        path = e.files[0].path
+        try:
+            source = MappedFileSource(path)
+            self._hold_source(source, f"typing from file: {source.describe()}")
+        except Exception as ex:
+            logger.error(f"file open error: {ex}")
+            self.show_status(f"could not open file: {str(ex)}", True)
+            return
+        self.type_btn.disabled = not HAS_PYNPUT or source.total == 0
+        self._refresh_resume(source)
+        self._calculate_window_size()
+        self._set_status(f"file ready: {source.describe()}")
+        self._refresh(self.text_input, self.preview_text, self.type_btn, self.resume_btn,
+                      self.status_text)
+        logger.info(f"typing source set to {path}")
+    
+    def _current_source(self):
+        """The held file or paste if there is one, else the text field contents"""
+        if self.held_source is not None:
+            return self.held_source
+        text = self.text_input.value
+        return StringSource(text) if text else None
+    
+    def _hold_source(self, source, hint: str):
+        """Keep source server-side: the field stays empty above a bounded preview"""
+        self.held_source = source
+        self.text_input.value = ""
+        self.text_input.hint_text = hint
+        self.preview_text.value = _preview(source)
+        self.preview_text.visible = True
+    
+    def _release_source(self):
+        """Drop the held source and go back to the editable field"""
+        self.held_source = None
+        self.text_input.hint_text = TEXT_HINT
+        self.preview_text.value = ""
+        self.preview_text.visible = False
+    
+    def _refresh_resume(self, source):
+        """Show the resume button if source matches the saved checkpoint"""
+        checkpoint = None
+        if source is not None and self.saved_checkpoint:
+            try:
+                checkpoint = self.checkpoints.find(source, self.saved_checkpoint)
+            except Exception as ex:
+                logger.debug(f"checkpoint match error: {ex}")
+        self.resume_checkpoint = checkpoint
+        self.resume_btn.visible = checkpoint is not None
+        if checkpoint:
+            percent = int(checkpoint.get('offset', 0) / max(1, checkpoint['total']) * 100)
+            self.resume_btn.text = f"resume ({percent}%)"
+    
+    def _offer_saved_file(self):
+        """Reopen the file of an interrupted session so it can be resumed"""
+        saved = self.saved_checkpoint
+        if not saved or saved.get('source', {}).get('kind') != 'file':
+            return
+        path = saved['source'].get('path')
+        if not path or not Path(path).exists():
+            return
+        try:
+            source = MappedFileSource(path)
+        except Exception as ex:
+            logger.debug(f"saved file unavailable: {ex}")
+            return
+        if self.held_source is not None or self.text_input.value:
+            # The user picked something else while the file was opening
+            return
+        self._refresh_resume(source)
+        if self.resume_checkpoint:
+            self._hold_source(source, f"typing from file: {source.describe()}")
+            self.type_btn.disabled = not HAS_PYNPUT
+            self._set_status(f"interrupted session found: {source.describe()}")
+            self._calculate_window_size()
+            self._refresh(self.text_input, self.preview_text, self.type_btn, self.resume_btn,
+                          self.status_text)
+    
+    def _can_type(self) -> bool:
+        """True if there is text, a file or a queued job to type"""
+        has_work = self.held_source or _has_text(self.text_input.value) or self.worker.pending
+        return bool(has_work) and HAS_PYNPUT
     
     def start_typing(self, e):
-        """Start typing process"""
-        if not HAS_PYNPUT or not self.keyboard:
+        """Type the current text (after any queued jobs)"""
+        source = self._current_source()
+        if source is not None:
+            self._begin_typing(source, int(self.speed_slider.value))
+        elif self.worker.pending:
+            self._start_worker()
+    
+    def queue_current(self, e):
+        """Add the current text or file to the job queue without typing it yet"""
+        source = self._current_source()
+        if source is None:
+            self.show_status("nothing to queue", True)
+            return
+        if not self._ensure_turbo():
+            return
+        budget = self._budget()
+        if budget is False:
+            return
+        job = TypingJob(
+            source, int(self.speed_slider.value), int(self.countdown_slider.value),
+            turbo_chunk=self._turbo_chunk(), budget=budget,
+        )
+        job.keystrokes = self._count_keystrokes(source)
+        self.worker.submit(job)
+        # Clear the field for the next snippet
+        self._release_source()
+        self.text_input.value = ""
+        self.resume_checkpoint = None
+        self.resume_btn.visible = False
+        self.type_btn.disabled = not self._can_type()
+        self._set_status(f"queued {job.source.describe()}")
+        logger.info(f"queued job {job.id}")
+        self._calculate_window_size()
+        self._refresh(self.text_input, self.preview_text, self.type_btn, self.resume_btn,
+                      self.status_text)
+    
+    def resume_typing(self, e):
+        """Continue an interrupted session from its last checkpoint"""
+        checkpoint = self.resume_checkpoint
+        source = self._current_source()
+        if not checkpoint or source is None:
+            return
+        settings = checkpoint.get('settings', {})
+        speed = settings.get('speed') or int(self.speed_slider.value)
+        self.speed_slider.value = max(50, min(1000, speed))
+        burst_mode = settings.get('burst_mode')
+        if burst_mode in BURST_MODES:
+            self.engine.burst_mode = burst_mode
+            self.engine.burst_size = settings.get('burst_size', self.engine.burst_size)
+            self.burst_switch.value = burst_mode != BURST_OFF
+        self.turbo_switch.value = bool(settings.get('turbo'))
+        if settings.get('timing_profile') in PROFILES:
+            self.engine.timing_profile = settings['timing_profile']
+        if 'preprocess' in settings:
+            self.engine.preprocess = self._create_pipeline(settings['preprocess'])
+        logger.info(f"resuming at {checkpoint['chars']} chars")
+        self._refresh(self.speed_slider, self.burst_switch, self.turbo_switch)
+        self._begin_typing(source, speed, checkpoint['chars'], checkpoint.get('offset', 0))
+    
+    def _begin_typing(self, source, speed: int, start_chars: int = 0, start_offset: int = 0):
+        """Queue source (or the rest of it, when resuming) and start the worker"""
+        if not self._ensure_keyboard():
             self.show_status("please install pynput first", True)
             self._show_permission_dialog()
             return
-        
-        text = self.text_input.value
-        if not text:
+        if not self._ensure_turbo():
+            return
+        budget = self._budget()
+        if budget is False:
             return
-        
         countdown = int(self.countdown_slider.value)
-        speed = int(self.speed_slider.value)
-        
-        # Calculate estimated duration
-        total_chars = len(text)
-        chars_per_sec = (speed * 5) / 60
-        self.estimated_duration = total_chars / chars_per_sec
+        job = TypingJob(source, speed, countdown, start_chars, start_offset, self._turbo_chunk(),
+                        budget)
+        job.keystrokes = self._count_keystrokes(source, start_chars)
+        self.worker.submit(job)
+        self._start_worker()
+    
+    def _start_worker(self):
+        """Run the queued jobs back-to-back"""
+        if not self._ensure_keyboard():
+            self.show_status("please install pynput first", True)
+            self._show_permission_dialog()
+            return
+        self.type_btn.disabled = True
+        self.queue_btn.disabled = True
+        self._refresh(self.type_btn, self.queue_btn)
+        self.worker.start()
+    
+    def _job_started(self, job: TypingJob):
+        """A job left the queue (worker thread): switch the UI to typing"""
+        self.speed_label = job.speed_label
+        self._preview_source = job.source if job.source is self.held_source else None
+        self.estimated_duration = job.estimated_duration
+        self._published_typed = -1
         
         # Update UI
         self.type_btn.disabled = True
+        self.queue_btn.disabled = True
         self.paste_btn.disabled = True
+        self.file_btn.disabled = True
+        self.resume_btn.visible = False
         self.pause_btn.visible = True
+        self.pause_btn.text = "pause"
         self.stop_btn.visible = True
         self.progress_bar.visible = True
-        self.status_text.value = f"starting in {countdown}s..."
-        self.estimated_time_text.value = f"est. duration: {self._format_time(self.estimated_duration)}"
-        self.update()
-        
-        # Start typing thread
-        self.stop_typing = False
-        self.is_typing = True
-        self.is_paused = False
-        
-        self.current_thread = threading.Thread(
-            target=self._typing_thread,
-            args=(text, countdown, speed),
-            daemon=True
+        self.progress_bar.value = 0
+        self.status_text.value = f"starting in {job.countdown}s..."
+        self.status_text.color = self.oxblood_light
+        self.elapsed_time_text.value = ""
+        self.estimated_time_text.value = f"est. duration: {format_time(self.estimated_duration)}"
+        self._refresh(self.type_btn, self.queue_btn, self.paste_btn, self.file_btn,
+                      self.resume_btn, self.pause_btn, self.stop_btn, self.progress_bar,
+                      self.status_text, self.elapsed_time_text, self.estimated_time_text)
+        if self.update_meter is not None:
+            self.update_meter.reset()
+        
+        self.publisher.start()
+        logger.info(f"started typing {job.source.describe()} at {job.speed_label}")
+    
+    def _job_finished(self, job: TypingJob, success: bool, message: str):
+        """Worker finished a job: stop publishing; reset the UI unless more follow"""
+        self.publisher.stop(flush=False)
+        if self.update_meter is not None:
+            self.update_meter.log(f"ui updates during job {job.id}")
+        if self.worker.held:
+            self._complete(success, message)
+        else:
+            self.status_text.value = f"{message} • {self.worker.pending} more queued"
+            logger.info(f"job {job.id} complete: {message}")
+            self.status_text.update()
+    
+    def _queue_changed(self):
+        """Show the queued jobs, next first, with controls to reorder them"""
+        jobs = self.worker.jobs()
+        rows = []
+        for number, job in enumerate(jobs, 1):
+            rows.append(ft.Row([
+                ft.Text(f"{number}. {job.describe()}", size=11, color=self.text_color,
+                        no_wrap=True, expand=True),
+                self._queue_button("↑", lambda e, job_id=job.id: self.worker.move(job_id, -1)),
+                self._queue_button("↓", lambda e, job_id=job.id: self.worker.move(job_id, 1)),
+                self._queue_button("×", lambda e, job_id=job.id: self.worker.remove(job_id)),
+            ], spacing=0, height=26))
+        self.queue_list.controls = rows
+        self.queue_container.visible = bool(rows)
+        if self.worker.current is None:
+            self.type_btn.disabled = not self._can_type()
+        self._calculate_window_size()
+        self._refresh(self.queue_container, self.type_btn)
+    
+    def _queue_button(self, label: str, on_click):
+        return ft.TextButton(
+            label,
+            on_click=on_click,
+            style=ft.ButtonStyle(color=self.oxblood_light, padding=0),
+            width=26,
+            height=24,
         )
-        self.current_thread.start()
-        logger.info(f"started typing {len(text)} chars at {speed} wpm")
     
 
-    def _typing_thread(self, text: str, countdown: int, speed: int):
-        """Background typing thread"""
+    def _ensure_keyboard(self) -> bool:
+        """Create the keyboard backend on first use; False if unavailable"""
+        if self.keyboard is None and HAS_PYNPUT:
+            try:
+                self.keyboard = PynputBackend()
+                self.engine.backend = self.keyboard
+                logger.info("keyboard initialized")
+            except Exception as e:
+                logger.error(f"keyboard init failed: {e}")
+        return self.keyboard is not None
+    
+    def _create_pipeline(self, names):
+        """Preprocessing pipeline for the given stage names; None if empty or invalid"""
         try:
-            logger.info(f"typing on {self.os_type}")
-            
-            # Countdown
-            for i in range(countdown, 0, -1):
-                if self.stop_typing:
-                    logger.info("cancelled during countdown")
-                    return
-                
-                # FIXED: Use run_thread for regular functions, not run_task
-                self.page.run_thread(lambda i=i: self._update_status(
-                    f" {i}s to put your cursor where you want to type"
-                ))
-                time.sleep(1)
-            
-            # Start typing
-            self.typing_start_time = time.time()
-            self.page.run_thread(lambda: self._update_status("typing now..."))
-            
-            # Start timer thread
-            self.timer_thread = threading.Thread(target=self._timer_update, daemon=True)
-            self.timer_thread.start()
-            
-            time.sleep(0.2)
-            
-            # Calculate speed
-            total = len(text)
-            chars_per_sec = (speed * 5) / 60
-            delay = 1.0 / chars_per_sec
-            
-            logger.info(f"typing {total} chars at {speed} wpm ({chars_per_sec:.2f} chars/sec)")
-            
-            # Type each character
-            for i, char in enumerate(text):
-                if self.stop_typing:
-                    logger.info(f"stopped at {i}/{total}")
-                    break
-                
-                # Handle pause
-                pause_start = None
-                while self.is_paused and not self.stop_typing:
-                    if pause_start is None:
-                        pause_start = time.time()
-                    time.sleep(0.1)
-                
-                if pause_start:
-                    # Adjust start time to account for pause
-                    self.typing_start_time += (time.time() - pause_start)
-                
-                if self.stop_typing:
-                    break
-                
-                # Type using pynput
-                try:
-                    self.keyboard.type(char)
-                except:
-                    try:
-                        self.keyboard.press(char)
-                        self.keyboard.release(char)
-                    except:
-                        logger.debug(f"skipped: {repr(char)}")
-                
-                # Update progress - FIXED: Use run_thread
-                if i % 20 == 0 or i == total - 1:
-                    progress = (i + 1) / total
-                    self.page.run_thread(lambda p=progress, c=i+1, t=total, s=speed:
-                                        self._update_progress(p, c, t, s))
-                
-                # Natural typing delay
-                time.sleep(delay * (0.85 + 0.3 * ((i % 50) / 50)))
-            
-            # Complete - FIXED: Use run_thread
-            final_time = time.time() - self.typing_start_time if self.typing_start_time else 0
-            if not self.stop_typing:
-                logger.info(f"completed {total} chars in {final_time:.1f}s")
-                self.page.run_thread(lambda: self._complete(True, f"typed {total} characters in {self._format_time(final_time)}"))
-            else:
-                self.page.run_thread(lambda: self._complete(False, "stopped by user"))
-        
+            return create_pipeline(names, self.config.get('tab_width', 4))
+        except ValueError as e:
+            logger.warning(f"preprocessing disabled: {e}")
+            return None
+    
+    def _count_keystrokes(self, source, start_chars: int = 0):
+        """Keystrokes left after preprocessing, for texts short enough to count now"""
+        if self.engine.preprocess is None or not isinstance(source, StringSource):
+            return None
+        if source.total - start_chars > COUNT_LIMIT:
+            return None
+        # A fresh pipeline: the engine's may be busy with the running job
+        pipeline = self._create_pipeline(self.engine.preprocess.names)
+        if pipeline is not None and self._turbo_chunk():
+            pipeline = pipeline.for_paste()
+        if pipeline is None:
+            return None
+        return pipeline.count(source.iter_pieces(), start_chars)
+    
+    def _budget(self):
+        """Seconds from the budget field, None if empty, False (and a status) if invalid"""
+        text = (self.budget_input.value or "").strip()
+        if not text:
+            return None
+        try:
+            budget = parse_time(text)
+        except ValueError:
+            budget = 0
+        if budget <= 0:
+            self.show_status(f"can't read time budget '{text}', try 12m or 1:30", True)
+            return False
+        return budget
+    
+    def _turbo_chunk(self) -> int:
+        """Characters per paste when turbo mode is on, else 0"""
+        if not self.turbo_switch.value:
+            return 0
+        return max(1, int(self.config.get('turbo_chunk_size', 2000)))
+    
+    def _ensure_turbo(self) -> bool:
+        """Create the clipboard backend if turbo mode needs it; False if unavailable"""
+        if not self.turbo_switch.value or self.turbo_backend is not None:
+            return True
+        try:
+            self.turbo_backend = ClipboardBackend()
+            self.engine.turbo_backend = self.turbo_backend
+            logger.info("clipboard backend initialized")
         except Exception as e:
-            logger.error(f"typing error: {e}", exc_info=True)
-            # FIXED: Use run_thread for error handling
-            self.page.run_thread(lambda: self._complete(False, f"error: {str(e)}"))
-
-
-    def _timer_update(self):
-        """Update timer display while typing"""
-        while self.is_typing and not self.stop_typing:
-            if self.typing_start_time and not self.is_paused:
-                elapsed = time.time() - self.typing_start_time
+            logger.error(f"clipboard backend init failed: {e}")
+            self.show_status(f"turbo mode unavailable: {str(e)}", True)
+        return self.turbo_backend is not None
+    
+    def _post_status(self, text: str):
+        """Hand an engine status message to the publisher (engine thread)"""
+        self._status_post = (self._status_post[0] + 1, text)
+    
+    def _render_frame(self):
+        """Apply the latest engine state; return only the controls that changed"""
+        engine = self.engine
+        changed = []
+        
+        def assign(control, value):
+            if control.value != value:
+                control.value = value
+                if control not in changed:
+                    changed.append(control)
+        
+        # Progress
+        typed, total = engine.typed, engine.total
+        if total and typed != self._published_typed:
+            self._published_typed = typed
+            progress = typed / total
+            assign(self.progress_bar, progress)
+            assign(self.progress_text, f"doing something... {typed}/{total} {engine.unit}")
+            assign(self.status_text, f"{int(progress * 100)}% complete • {self.speed_label}")
+            if self._preview_source is not None:
+                assign(self.preview_text, _preview(self._preview_source, typed))
+        
+        # Status messages from the engine (countdown, warnings)
+        seq, text = self._status_post
+        if seq != self._status_applied:
+            self._status_applied = seq
+            assign(self.progress_text, text)
+        
+        # Exact duration, once the whole plan compiled during the countdown
+        planned = engine.planned_duration
+        if engine.start_time is None and planned is not None and planned != self.estimated_duration:
+            self.estimated_duration = planned
+            assign(self.estimated_time_text, f"est. duration: {format_time(planned)}")
+        
+        # Timer
+        if engine.start_time is not None and not engine.is_paused:
+            elapsed = engine.elapsed()
+            remaining = engine.remaining_time()
+            if remaining is None:
                 remaining = max(0, self.estimated_duration - elapsed)
-                
-                # FIXED: Use run_thread for timer updates
-                self.page.run_thread(lambda e=elapsed, r=remaining: self._update_timer(e, r))
-            
-            time.sleep(0.5)
-    
-    def _update_timer(self, elapsed: float, remaining: float):
-        """Update timer displays"""
-        self.elapsed_time_text.value = f"elapsed: {self._format_time(elapsed)}"
-        self.estimated_time_text.value = f"remaining: ~{self._format_time(remaining)}"
-        self.update()
-    
-    def _format_time(self, seconds: float) -> str:
-        """Format seconds to readable time"""
-        if seconds < 60:
-            return f"{int(seconds)}s"
-        else:
-            mins = int(seconds // 60)
-            secs = int(seconds % 60)
-            return f"{mins}m {secs}s"
-    
-    def _update_status(self, text: str):
-        """Update status (thread-safe)"""
-        self.progress_text.value = text
-        self.update()
-    
-    def _update_progress(self, progress: float, current: int, total: int, speed: int):
-        """Update progress (thread-safe)"""
-        self.progress_bar.value = progress
-        self.progress_text.value = f"doing something... {current}/{total} chars"
-        self.status_text.value = f"{int(progress * 100)}% complete • {speed} wpm"
-        self.update()
+            assign(self.elapsed_time_text, f"elapsed: {format_time(elapsed)}")
+            assign(self.estimated_time_text, f"remaining: ~{format_time(remaining)}")
+        
+        return changed
     
     def _complete(self, success: bool, message: str):
         """Complete typing"""
-        self.is_typing = False
-        self.is_paused = False
-        self.typing_start_time = None
-        self.type_btn.disabled = not bool(self.text_input.value and self.text_input.value.strip())
+        self.type_btn.disabled = not self._can_type()
+        self.queue_btn.disabled = False
         self.paste_btn.disabled = False
+        self.file_btn.disabled = False
         self.pause_btn.visible = False
+        self.pause_btn.text = "pause"
         self.stop_btn.visible = False
         self.progress_bar.visible = False
         self.progress_bar.value = 0
         self.progress_text.value = "ready"
+        if self.held_source is not None:
+            self.preview_text.value = _preview(self.held_source)
+        self._preview_source = None
         
         self.status_text.value = message
         self.status_text.color = self.oxblood if success else "#FF3B30"
         
-        self.elapsed_time_text.value = ""
+        report = self.telemetry.report
+        self.elapsed_time_text.value = summary_line(report) if report else ""
         self.estimated_time_text.value = ""
         
+        # A stopped or failed run leaves a checkpoint to resume from
+        self.saved_checkpoint = self.checkpoints.load()
+        self._refresh_resume(self._current_source())
+        
         logger.info(f"complete: {message}")
-        self.update()
+        self._refresh(self.type_btn, self.queue_btn, self.paste_btn, self.file_btn,
+                      self.resume_btn, self.pause_btn, self.stop_btn, self.progress_bar,
+                      self.progress_text, self.status_text, self.preview_text,
+                      self.elapsed_time_text, self.estimated_time_text)
     
     def toggle_pause(self, e):
         """Toggle pause"""
-        self.is_paused = not self.is_paused
-        self.pause_btn.text = "resume" if self.is_paused else "pause"
-        self.status_text.value = "paused - click to resume" if self.is_paused else "typing resumed..."
-        logger.info(f"{'paused' if self.is_paused else 'resumed'}")
-        self.update()
+        if self.engine.is_paused:
+            self.engine.resume()
+        else:
+            self.engine.pause()
+        is_paused = self.engine.is_paused
+        self.pause_btn.text = "resume" if is_paused else "pause"
+        self.status_text.value = "paused - click to resume" if is_paused else "typing resumed..."
+        logger.info(f"{'paused' if is_paused else 'resumed'}")
+        self._refresh(self.pause_btn, self.status_text)
     
     def stop_typing_action(self, e):
-        """Stop typing"""
-        self.stop_typing = True
+        """Stop typing; queued jobs stay queued"""
+        self.worker.stop()
         logger.info("stop button pressed")
     
     def update_countdown_setting(self, e):
         """Update countdown"""
         value = int(self.countdown_slider.value)
         self.config['countdown_duration'] = value
-        self.config_manager.save_config(self.config)
+        self.config_manager.update_config({'countdown_duration': value})
         self.show_status(f"delay set to {value}s")
     
     def update_speed_setting(self, e):
         """Update speed"""
         value = int(self.speed_slider.value)
         self.config['typing_speed'] = value
-        self.config_manager.save_config(self.config)
+        self.config_manager.update_config({'typing_speed': value})
         self.show_status(f"speed set to {value} wpm")
     
+    def update_budget_setting(self, e):
+        """Remember the time budget; an empty field types at the set speed"""
+        value = (self.budget_input.value or "").strip()
+        self.config['time_budget'] = value
+        self.config_manager.update_config({'time_budget': value})
+    
     def toggle_always_on_top(self, e):
         """Toggle always on top"""
         self.page.window.always_on_top = self.always_on_top_switch.value
         self.config['always_on_top'] = self.always_on_top_switch.value
-        self.config_manager.save_config(self.config)
+        self.config_manager.update_config({'always_on_top': self.always_on_top_switch.value})
         status = "enabled" if self.always_on_top_switch.value else "disabled"
-        self.show_status(f"always on top {status}")
+        self._set_status(f"always on top {status}")
+        # The window flag is a page property; the app is isolated, so this
+        # page update carries only it and the status text goes on its own
         self.page.update()
+        self.status_text.update()
+    
+    def toggle_burst_mode(self, e):
+        """Toggle burst injection (whole words per keystroke call)"""
+        mode = BURST_WORDS if self.burst_switch.value else BURST_OFF
+        if mode != BURST_OFF and self.config.get('burst_mode') in BURST_MODES[1:]:
+            # Keep a configured non-default burst mode, e.g. chunks
+            mode = self.config['burst_mode']
+        self.engine.burst_mode = mode
+        self.config['burst_mode'] = mode
+        self.config_manager.update_config({'burst_mode': mode})
+        self.show_status(f"burst mode {mode}")
+    
+    def toggle_turbo_mode(self, e):
+        """Toggle turbo mode (paste chunks through the clipboard)"""
+        enabled = bool(self.turbo_switch.value)
+        self.config['turbo_mode'] = enabled
+        self.config_manager.update_config({'turbo_mode': enabled})
+        self.show_status("turbo mode on: pasting chunks" if enabled else "turbo mode off")
     
     def show_status(self, message: str, is_error: bool = False):
         """Show status message"""
+        self._set_status(message, is_error)
+        self.status_text.update()
+    
+    def _set_status(self, message: str, is_error: bool = False):
+        """Set the status message without sending it"""
         self.status_text.value = message
         self.status_text.color = "#FF3B30" if is_error else self.oxblood_light
-        self.update()
     
     def _calculate_window_size(self, initial=False):
         """Calculate optimal window size based on content without auto-positioning"""
@@ -610,20 +1084,32 @@ class AcheiriaApp(ft.Column):
         
         # Text area height
         line_height = 20
-        text_lines = len(self.text_input.value.split('\n')) if self.text_input.value else 1
-        visible_lines = min(3, text_lines)
+        text_lines = _count_lines(self.text_input.value, MAX_VISIBLE_LINES + 1)
+        visible_lines = min(MAX_VISIBLE_LINES, text_lines)
         text_area_height = visible_lines * line_height + 25
         
-        if text_lines > 3:
+        if text_lines > MAX_VISIBLE_LINES:
             text_area_height += 15
         
-        total_height = base_height + text_area_height
+        # Preview of a held source
+        if self.preview_text.visible:
+            text_area_height += _count_lines(self.preview_text.value, 2 * PREVIEW_LINES + 1) * 15
+        
+        # Queue rows, scrolling past four
+        queued = len(self.queue_list.controls)
+        queue_height = min(4, queued) * 26 + 5 if queued else 0
+        
+        total_height = base_height + text_area_height + queue_height
+        height = max(350, min(600, total_height))
+        
+        # Nothing to resize: skip the window round trip entirely
+        if not initial and height == self._window_height:
+            return
+        self._window_height = height
         
         if initial:
             self.page.window.width = 600
-            self.page.window.height = max(350, min(600, total_height))
-        else:
-            self.page.window.height = max(350, min(600, total_height))
+        self.page.window.height = height
         
         self.page.window.min_width = 500
         self.page.window.min_height = 350
@@ -636,11 +1122,9 @@ class AcheiriaApp(ft.Column):
     
     def _check_and_request_permissions(self):
         """Check and request accessibility permissions on macOS"""
-        if self.os_type == "Darwin" and HAS_PYNPUT:
+        if self.os_type == "Darwin" and self._ensure_keyboard():
             try:
-                test = keyboard.Controller()
-                test.press(keyboard.Key.shift)
-                test.release(keyboard.Key.shift)
+                self.keyboard.probe()
                 logger.info("accessibility permissions granted")
             except Exception as e:
                 logger.warning(f"accessibility permissions needed: {e}")
@@ -0,0 +1,212 @@
+"""
+Typing Worker - one long-lived thread that types a queue of jobs
+"""
+
+import itertools
+import logging
+import math
+import threading
+from collections import deque
+from typing import Callable, List, Optional
+
+from app.backends import PASTE_DELAY
+from app.engine import format_time
+from app.pacing import wpm_to_cps
+from app.sources import TextSource
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_STOPPED = "stopped"
+
+
+class TypingJob:
+    """One source to type, with its own speed and start delay.
+
+    A ``turbo_chunk`` pastes chunks of that many characters instead of
+    typing at ``speed``; a ``budget`` types it in that many seconds.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, source: TextSource, speed: int, countdown: int = 0,
+                 start_chars: int = 0, start_offset: int = 0, turbo_chunk: int = 0,
+                 budget: Optional[float] = None):
+        self.id = next(TypingJob._ids)
+        self.source = source
+        self.speed = speed
+        self.countdown = countdown
+        self.start_chars = start_chars
+        self.start_offset = start_offset
+        self.turbo_chunk = turbo_chunk
+        self.budget = budget if not turbo_chunk else None
+        # Keystrokes after preprocessing, when counted up front
+        self.keystrokes: Optional[int] = None
+        self.status = JOB_QUEUED
+        self.message = ""
+
+    @property
+    def estimated_duration(self) -> float:
+        """Seconds at the job's speed (one byte ~ one char for file sources)"""
+        if self.budget:
+            return self.budget
+        left = self.source.total - self.start_offset
+        if self.keystrokes is not None:
+            left = self.keystrokes
+        if self.turbo_chunk:
+            return math.ceil(left / self.turbo_chunk) * PASTE_DELAY
+        return left / wpm_to_cps(self.speed)
+
+    @property
+    def speed_label(self) -> str:
+        if self.turbo_chunk:
+            return "turbo"
+        if self.budget:
+            return f"in {format_time(self.budget)}"
+        return f"{self.speed} wpm"
+
+    def describe(self) -> str:
+        return f"{self.source.describe()} • {self.speed_label} • {self.countdown}s"
+
+
+class TypingWorker:
+    """Runs queued jobs back-to-back on one thread that owns the engine.
+
+    The thread starts once and blocks on a condition while there is nothing
+    to do, so an idle worker never wakes. Jobs reuse the same engine, backend
+    and key table. New jobs wait until ``start``; when the queue drains, or
+    a job is stopped, the worker holds again until the next ``start``.
+
+    Hooks are called from the worker thread.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.current: Optional[TypingJob] = None
+        self.held = True
+
+        # Hooks
+        self.on_job_started: Optional[Callable[[TypingJob], None]] = None
+        self.on_job_finished: Optional[Callable[[TypingJob, bool, str], None]] = None
+        self.on_queue_changed: Optional[Callable[[], None]] = None
+
+        self._jobs = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._result = (False, "")
+        engine.on_complete = self._engine_complete
+        self._thread = threading.Thread(target=self._loop, name="typing-worker", daemon=True)
+        self._thread.start()
+
+    # Queue
+
+    def submit(self, job: TypingJob) -> TypingJob:
+        with self._cond:
+            self._jobs.append(job)
+            self._cond.notify()
+        self._emit(self.on_queue_changed)
+        return job
+
+    def jobs(self) -> List[TypingJob]:
+        """Snapshot of the queued jobs, next first"""
+        with self._cond:
+            return list(self._jobs)
+
+    @property
+    def pending(self) -> int:
+        return len(self._jobs)
+
+    def move(self, job_id: int, delta: int) -> bool:
+        """Move a queued job ``delta`` places (negative is sooner)"""
+        with self._cond:
+            for index, job in enumerate(self._jobs):
+                if job.id == job_id:
+                    break
+            else:
+                return False
+            target = max(0, min(len(self._jobs) - 1, index + delta))
+            if target == index:
+                return False
+            del self._jobs[index]
+            self._jobs.insert(target, job)
+        self._emit(self.on_queue_changed)
+        return True
+
+    def remove(self, job_id: int) -> bool:
+        with self._cond:
+            for job in self._jobs:
+                if job.id == job_id:
+                    self._jobs.remove(job)
+                    break
+            else:
+                return False
+        self._emit(self.on_queue_changed)
+        return True
+
+    def clear(self):
+        with self._cond:
+            self._jobs.clear()
+        self._emit(self.on_queue_changed)
+
+    # Control
+
+    def start(self):
+        """Run queued jobs until the queue is empty"""
+        with self._cond:
+            self.held = False
+            self._cond.notify()
+
+    def stop(self):
+        """Stop the current job and hold the rest of the queue"""
+        with self._cond:
+            self.held = True
+        self.engine.stop()
+
+    def close(self, timeout: float = 1.0):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self.engine.stop()
+        self._thread.join(timeout=timeout)
+
+    def _engine_complete(self, success: bool, message: str):
+        self._result = (success, message)
+
+    def _emit(self, hook, *args):
+        if hook is None:
+            return
+        try:
+            hook(*args)
+        except Exception as e:
+            logger.error(f"worker hook error: {e}", exc_info=True)
+
+    def _loop(self):
+        engine = self.engine
+        while True:
+            with self._cond:
+                while not self._closed and (self.held or not self._jobs):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                job = self._jobs.popleft()
+                job.status = JOB_RUNNING
+                self.current = job
+                engine.prepare()
+            self._emit(self.on_queue_changed)
+            self._emit(self.on_job_started, job)
+            logger.info(f"job {job.id}: {job.describe()}")
+
+            self._result = (False, "stopped")
+            engine.run(job.source, job.countdown, job.speed, start_chars=job.start_chars,
+                       turbo_chunk=job.turbo_chunk, budget=job.budget, start_offset=job.start_offset)
+            success, message = self._result
+
+            with self._cond:
+                job.status = JOB_DONE if success else JOB_STOPPED
+                job.message = message
+                self.current = None
+                if not success or not self._jobs:
+                    self.held = True
+            self._emit(self.on_job_finished, job, success, message)
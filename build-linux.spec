@@ -24,7 +24,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['pyautogui', 'google.generativeai', 'aiohttp'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
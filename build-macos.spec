@@ -25,7 +25,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['pyautogui', 'google.generativeai', 'aiohttp'],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -3,33 +3,32 @@
 Acheiria - acheiria: nuturing laziness in youths
 """
 
-import flet as ft
+import time
+
+# Taken before anything else is imported, for the startup profile
+_started, _started_wall = time.perf_counter(), time.time()
+
 import sys
 import logging
-import time
 import threading
-from pathlib import Path
 
-# Get user's home directory for logs (writable in bundled apps)
-if getattr(sys, 'frozen', False):
-    # Running as bundled app
-    log_dir = Path.home() / '.acheiria'
-    log_dir.mkdir(exist_ok=True)
-    log_file = log_dir / 'acheiria.log'
-else:
-    # Running as script
-    log_file = Path('acheiria.log')
+from app.logs import setup_logging
+
+# Headless command line: never import Flet or build the window
+if __name__ == "__main__" and len(sys.argv) > 1 and not sys.argv[1].startswith('-'):
+    setup_logging(console=False)
+    from app.cli import main as cli_main
+    sys.exit(cli_main(sys.argv[1:]))
+
+import flet as ft
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(str(log_file)),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging: queued, written to a rotating file in ~/.acheiria
+log_file = setup_logging()
 logger = logging.getLogger(__name__)
+
+# Seconds without window move events before the position is saved
+WINDOW_MOVE_SETTLE = 0.5
+
 logger.info("="*50)
 logger.info("acheiria acheiria: nuturing laziness in youths is starting")
 logger.info(f"Log file: {log_file}")
@@ -39,6 +38,7 @@ logger.info("="*50)
 try:
     from app.ui import AcheiriaApp
     from app.config import ConfigManager
+    from app.startup import StartupProfile
 except ImportError as e:
     logger.error(f"Import error: {e}")
     logger.error("Make sure app/ui.py and app/config.py exist")
@@ -48,6 +48,9 @@ except ImportError as e:
     ft.app(target=main)
     sys.exit(1)
 
+startup = StartupProfile(_started, _started_wall)
+startup.mark("imports")
+
 def main(page: ft.Page):
     """
     Main function that initializes the Flet application
@@ -90,39 +93,47 @@ def main(page: ft.Page):
         app = AcheiriaApp(page, config_manager)
         page.add(app)
         
-        # Save window position on move
+        # Save window position once a move settles
+        move_timer = None
+        
         def handle_window_move():
             try:
-                config = config_manager.load_config()
-                config['window_position'] = {
-                    'x': page.window.left or 100,
-                    'y': page.window.top or 100
-                }
-                config_manager.save_config(config)
+                left, top = page.window.left, page.window.top
+                if left is None or top is None:
+                    return
+                position = {'x': left, 'y': top}
+                if config_manager.view().get('window_position') == position:
+                    return
+                config_manager.update_config({'window_position': position})
             except Exception as e:
                 logger.debug(f"Window move save error: {e}")
         
-        # Monitor window position
-        def monitor_window():
-            last_pos = None
-            while True:
-                try:
-                    current_pos = (page.window.left, page.window.top)
-                    if current_pos != last_pos and all(current_pos):
-                        last_pos = current_pos
-                        handle_window_move()
-                    time.sleep(1)
-                except:
-                    time.sleep(1)
+        def on_window_event(e):
+            nonlocal move_timer
+            # Linux reports MOVE where other platforms send MOVED
+            if e.type not in (ft.WindowEventType.MOVE, ft.WindowEventType.MOVED):
+                return
+            # Debounce: only the position after the last move event is saved
+            if move_timer is not None:
+                move_timer.cancel()
+            move_timer = threading.Timer(WINDOW_MOVE_SETTLE, handle_window_move)
+            move_timer.daemon = True
+            move_timer.start()
+        
+        page.window.on_event = on_window_event
         
-        monitor_thread = threading.Thread(target=monitor_window, daemon=True)
-        monitor_thread.start()
+        # Write any debounced config changes before the session goes away
+        page.on_disconnect = lambda e: config_manager.flush()
         
         # Update the page (use regular update, not update_async)
         page.update()
+        startup.mark("first frame")
         
         logger.info("Acheiria acheiria: nuturing laziness in youths started successfully")
         
+        if startup.finish() is not None and startup.mode == "exit":
+            page.window.destroy()
+        
     except Exception as e:
         logger.error(f"Error starting application: {e}", exc_info=True)
         # Simple error display
@@ -63,7 +63,7 @@ if [ -f "requirements.txt" ]; then
     echo "   ✓ Dependencies installed"
 else
     echo "   ⚠️  requirements.txt not found. Installing core dependencies..."
-    pip install flet google-generativeai pyautogui pyperclip pynput pillow
+    pip install flet pyperclip pynput
     echo "   ✓ Core dependencies installed"
 fi
 
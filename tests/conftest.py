@@ -0,0 +1,57 @@
+"""Shared helpers: drive the engine headless against a recording backend"""
+
+import pytest
+
+from app.backends import RecordingBackend
+from app.engine import TypingEngine
+from app.preprocess import create_pipeline
+
+
+class FakeClock:
+    """Monotonic clock whose sleeps overshoot by ``overshoot`` seconds"""
+
+    def __init__(self, overshoot=0.0):
+        self.now = 1000.0
+        self.overshoot = overshoot
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds + self.overshoot
+        return False
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class StoppingBackend(RecordingBackend):
+    """Stops the engine once ``limit`` keystrokes were sent"""
+
+    def __init__(self, limit=None):
+        super().__init__()
+        self.limit = limit
+        self.engine = None
+
+    def type(self, text):
+        super().type(text)
+        if self.limit is not None and len(self.text) >= self.limit:
+            self.engine.stop()
+        return True
+
+
+@pytest.fixture
+def type_text():
+    """Type a source unpaced; return (text sent, engine) after it ends or stops"""
+
+    def run(source, names=(), start_chars=0, stop_after=None, checkpointer=None):
+        backend = StoppingBackend(stop_after)
+        engine = backend.engine = TypingEngine(backend)
+        engine.preprocess = create_pipeline(list(names))
+        engine.checkpointer = checkpointer
+        engine.run(source, 0, None, settle_delay=0, start_chars=start_chars)
+        return backend.text, engine
+
+    return run
@@ -0,0 +1,63 @@
+"""Keystroke backends and the benchmark's pass/fail checks"""
+
+import pytest
+
+from app.backends import KeyboardBackend, NullBackend, RecordingBackend, create_backend
+from app.bench import check_paced, make_corpus
+from app.pacing import RATE_TOLERANCE
+
+
+class PickyBackend(KeyboardBackend):
+    """Rejects one character at send time"""
+
+    def __init__(self, reject):
+        self.reject = reject
+        self.sent = []
+
+    def send_key(self, key):
+        if key == self.reject:
+            return False
+        self.sent.append(key)
+        return True
+
+
+def test_control_characters_are_untypeable():
+    backend = NullBackend()
+    assert backend.translate("a") == "a"
+    for char in "\n\r\t\x7f":
+        assert backend.translate(char) == char
+    assert backend.translate("\x00") is None
+    assert backend.translate("\x1b") is None
+
+
+def test_send_keys_stops_at_first_rejected_key():
+    backend = PickyBackend("x")
+    assert backend.send_keys(list("abxcd")) == 2
+    assert backend.sent == ["a", "b"]
+
+
+def test_recording_backend_keeps_text_and_times():
+    ticks = iter(range(10))
+    backend = RecordingBackend(clock=lambda: next(ticks))
+    backend.type("ab")
+    backend.send_keys(["c", "d"])
+    assert backend.text == "abcd"
+    assert [t for t, _ in backend.events] == [0, 1]
+
+
+def test_create_backend_by_name():
+    assert isinstance(create_backend("null"), NullBackend)
+    with pytest.raises(ValueError):
+        create_backend("telepathy")
+
+
+def test_corpus_is_deterministic():
+    assert make_corpus(500) == make_corpus(500)
+    assert len(make_corpus(500)) == 500
+
+
+def test_paced_run_fails_outside_tolerance():
+    limit = RATE_TOLERANCE * 100
+    assert check_paced({"rate_error_pct": limit / 2, "cpu_ms_per_1k": 10}) == []
+    assert len(check_paced({"rate_error_pct": -2 * limit, "cpu_ms_per_1k": 10})) == 1
+    assert len(check_paced({"rate_error_pct": 0, "cpu_ms_per_1k": 500}, cpu_budget=400)) == 1
@@ -0,0 +1,46 @@
+"""Fixed time budgets: the rate is planned to finish on a deadline"""
+
+import pytest
+
+from app.backends import RecordingBackend
+from app.engine import TypingEngine
+from app.pacing import BudgetPlanner, DeadlineScheduler, jitter_offset
+
+from conftest import FakeClock
+
+
+def test_budget_lands_on_deadline_after_a_stall():
+    clock = FakeClock()
+    pacer = DeadlineScheduler(20, 0.0, clock=clock, sleep=clock.sleep)
+    total = 400
+    planner = BudgetPlanner(pacer, clock.now + 20.0)
+    pacer.start()
+    for n in range(total):
+        if n == 100:
+            clock.now += 4.0
+        pacer.wait()
+        planner.update(lambda: jitter_offset(total))
+    assert clock.now == pytest.approx(planner.deadline, abs=0.1)
+
+
+class FirstKeyBackend(RecordingBackend):
+    """Records the engine's planned duration at the first keystroke, then stops it"""
+
+    def __init__(self):
+        super().__init__()
+        self.engine = None
+        self.planned = None
+
+    def type(self, text):
+        super().type(text)
+        if self.planned is None:
+            self.planned = self.engine.planned_duration
+            self.engine.stop()
+        return True
+
+
+def test_budget_is_kept_when_plan_finishes_in_countdown():
+    backend = FirstKeyBackend()
+    engine = backend.engine = TypingEngine(backend)
+    engine.run("hello world " * 10, 1, 60, settle_delay=0, budget=30)
+    assert backend.planned == 30
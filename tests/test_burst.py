@@ -0,0 +1,36 @@
+"""Burst injection: whole words or chunks per backend call"""
+
+from app.backends import RecordingBackend
+from app.engine import TypingEngine
+from app.plan import BURST_CHUNKS, BURST_OFF, BURST_WORDS, KeyTable, compile_plan, iter_runs
+
+
+def test_off_sends_one_character_per_run():
+    assert list(iter_runs("ab c", BURST_OFF)) == ["a", "b", " ", "c"]
+
+
+def test_words_keep_trailing_whitespace():
+    assert list(iter_runs("one two\n  three", BURST_WORDS)) == ["one ", "two\n  ", "three"]
+
+
+def test_runs_never_exceed_size():
+    text = "a" * 20 + " b"
+    for mode in (BURST_WORDS, BURST_CHUNKS):
+        runs = list(iter_runs(text, mode, 8))
+        assert "".join(runs) == text
+        assert max(len(run) for run in runs) <= 8
+
+
+def test_word_bursts_end_on_word_boundaries():
+    table = KeyTable(RecordingBackend())
+    chunk, = compile_plan(iter([("one two three", 13)]), table, {}, burst_mode=BURST_WORDS)
+    assert list(chunk.bounds) == [4, 8, 13]
+    assert list(chunk.offsets) == [4, 8, 13]
+
+
+def test_engine_sends_one_call_per_word():
+    backend = RecordingBackend()
+    engine = TypingEngine(backend)
+    engine.burst_mode = BURST_WORDS
+    engine.run("the quick brown fox", 0, 600, settle_delay=0)
+    assert [text for _, text in backend.events] == ["the ", "quick ", "brown ", "fox"]
@@ -0,0 +1,64 @@
+"""Checkpoints written by a stopped run resume it exactly"""
+
+import pytest
+
+from app.backends import RecordingBackend
+from app.checkpoint import Checkpointer, CheckpointStore
+from app.engine import TypingEngine
+from app.sources import MappedFileSource, StringSource
+
+TEXT = "    if x:\r\n        y = (1, 2)\r\n\tz = [3]\r\n" * 200
+
+
+@pytest.mark.parametrize("names", [[], ["crlf"], ["crlf", "tabs", "strip-indent"]],
+                         ids=["none", "crlf", "editor"])
+def test_resume_from_checkpoint_is_exact(tmp_path, type_text, names):
+    store = CheckpointStore(tmp_path / "checkpoint.json")
+    source = StringSource(TEXT)
+    full, _ = type_text(source, names)
+
+    first, engine = type_text(source, names, stop_after=1234, checkpointer=Checkpointer(store, 60))
+    checkpoint = store.find(source)
+    assert checkpoint is not None
+    assert checkpoint["chars"] == engine.chars_typed
+    assert checkpoint["offset"] == engine.typed
+
+    rest, _ = type_text(source, names, start_chars=checkpoint["chars"],
+                        checkpointer=Checkpointer(store, 60))
+    assert first + rest == full
+    # A completed run leaves nothing to resume
+    assert store.load() is None
+
+
+def test_checkpoint_matches_only_its_source(tmp_path, type_text):
+    store = CheckpointStore(tmp_path / "checkpoint.json")
+    type_text(StringSource(TEXT), stop_after=100, checkpointer=Checkpointer(store, 60))
+    assert store.find(StringSource(TEXT)) is not None
+    assert store.find(StringSource(TEXT.upper())) is None
+    assert store.find(StringSource(TEXT[:-1])) is None
+
+
+def test_file_checkpoint_resumes_at_exact_bytes(tmp_path, type_text):
+    path = tmp_path / "notes.txt"
+    path.write_bytes(("naïve café → ok\n" * 300).encode("utf-8"))
+    source = MappedFileSource(path, block_size=101)
+    store = CheckpointStore(tmp_path / "checkpoint.json")
+    full, _ = type_text(source)
+
+    first, _ = type_text(source, stop_after=777, checkpointer=Checkpointer(store, 60))
+    checkpoint = store.find(source)
+    assert checkpoint["offset"] == len(full[:len(first)].encode("utf-8"))
+    rest, _ = type_text(source, start_chars=checkpoint["chars"])
+    assert first + rest == full
+
+
+def test_resumed_run_stopped_before_typing_keeps_offset(tmp_path):
+    store = CheckpointStore(tmp_path / "checkpoint.json")
+    source = StringSource(TEXT)
+    engine = TypingEngine(RecordingBackend())
+    engine.checkpointer = Checkpointer(store, 60)
+    engine.on_started = engine.stop
+    engine.run(source, 0, None, settle_delay=0, start_chars=500, start_offset=500)
+    checkpoint = store.find(source)
+    assert checkpoint["chars"] == 500
+    assert checkpoint["offset"] == 500
@@ -0,0 +1,38 @@
+"""The headless 'type' command"""
+
+import pytest
+
+from app.cli import main
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path, monkeypatch):
+    # Checkpoints and reports go to ~/.acheiria; config.json to the cwd
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_types_text_with_null_backend(home, capsys):
+    assert main(["type", "--backend", "null", "--text", "hello", "--delay", "0", "-q"]) == 0
+    assert "typed 5 characters" in capsys.readouterr().err
+    # Scripted runs read the config without writing one
+    assert not (home / "config.json").exists()
+
+
+def test_types_file(home, capsys):
+    path = home / "notes.txt"
+    path.write_text("one\r\ntwo\r\n")
+    assert main(["type", "--backend", "null", "--file", str(path), "--delay", "0", "-q"]) == 0
+
+
+def test_delay_must_be_whole_seconds():
+    with pytest.raises(SystemExit) as exit_info:
+        main(["type", "--backend", "null", "--text", "x", "--delay", "0.5"])
+    assert exit_info.value.code == 2
+
+
+def test_unknown_stage_is_an_error(capsys):
+    assert main(["type", "--backend", "null", "--text", "x", "--delay", "0",
+                 "--preprocess", "nope"]) == 1
+    assert "unknown preprocessing stage" in capsys.readouterr().err
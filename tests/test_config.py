@@ -0,0 +1,111 @@
+"""ConfigManager's parsed cache and write-behind saves"""
+
+import json
+import os
+import time
+
+import pytest
+
+from app.config import ConfigManager, write_json_atomic
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"typing_speed": 90}))
+    return path
+
+
+def test_missing_keys_come_from_defaults(config_path):
+    manager = ConfigManager(str(config_path))
+    config = manager.load_config()
+    assert config["typing_speed"] == 90
+    assert config["countdown_duration"] == manager.default_config["countdown_duration"]
+
+
+def test_cache_is_reused_until_file_changes(config_path):
+    manager = ConfigManager(str(config_path))
+    view = manager.view()
+    assert manager.view() == view
+    assert manager._current() is manager._current()
+
+    config_path.write_text(json.dumps({"typing_speed": 120, "burst_size": 8}))
+    os.utime(config_path, ns=(1, 1))
+    assert manager.view()["typing_speed"] == 120
+
+
+def test_unchanged_file_is_parsed_once(config_path, monkeypatch):
+    import app.config
+    loads = []
+    real_load = json.load
+    monkeypatch.setattr(app.config.json, "load", lambda f: loads.append(1) or real_load(f))
+    manager = ConfigManager(str(config_path))
+    for _ in range(5):
+        manager.load_config()
+    assert len(loads) == 1
+
+
+def test_unreadable_file_keeps_last_good_config(config_path):
+    manager = ConfigManager(str(config_path))
+    assert manager.view()["typing_speed"] == 90
+    config_path.write_text("{not json")
+    os.utime(config_path, ns=(2, 2))
+    assert manager.view()["typing_speed"] == 90
+
+
+def test_load_config_returns_private_copy(config_path):
+    manager = ConfigManager(str(config_path))
+    config = manager.load_config()
+    config["preprocess"].append("tabs")
+    assert "tabs" not in manager.view()["preprocess"]
+
+
+def test_saves_are_debounced_until_flush(config_path):
+    manager = ConfigManager(str(config_path), save_delay=60)
+    manager.update_config({"typing_speed": 100})
+    manager.update_config({"burst_size": 16})
+    assert manager.dirty
+    # Pending changes are visible before they reach the file
+    assert manager.view()["typing_speed"] == 100
+    assert json.loads(config_path.read_text()) == {"typing_speed": 90}
+
+    assert manager.flush()
+    assert not manager.dirty
+    saved = json.loads(config_path.read_text())
+    assert saved["typing_speed"] == 100 and saved["burst_size"] == 16
+
+
+def test_immediate_save_writes_now(config_path):
+    manager = ConfigManager(str(config_path), save_delay=60)
+    manager.save_config({"typing_speed": 70}, immediate=True)
+    assert not manager.dirty
+    assert json.loads(config_path.read_text()) == {"typing_speed": 70}
+
+
+def test_debounced_save_flushes_itself(config_path):
+    manager = ConfigManager(str(config_path), save_delay=0.05)
+    manager.update_config({"typing_speed": 100})
+    for _ in range(100):
+        if not manager.dirty:
+            break
+        time.sleep(0.02)
+    assert json.loads(config_path.read_text())["typing_speed"] == 100
+
+
+def test_atomic_write_keeps_old_file_on_failure(tmp_path):
+    path = tmp_path / "data.json"
+    write_json_atomic(path, {"a": 1})
+    with pytest.raises(TypeError):
+        write_json_atomic(path, {"a": object()})
+    assert json.loads(path.read_text()) == {"a": 1}
+    # No temp files left behind either way
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
+
+
+def test_load_without_create_leaves_no_file(tmp_path):
+    path = tmp_path / "config.json"
+    manager = ConfigManager(str(path))
+    assert manager.load_config(create=False) == manager.default_config
+    assert not path.exists()
+    manager.load_config()
+    assert path.exists()
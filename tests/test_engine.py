@@ -0,0 +1,60 @@
+"""TypingEngine against in-memory backends"""
+
+from app.backends import NullBackend, RecordingBackend
+from app.engine import TypingEngine
+
+TEXT = "def f(x):\n\treturn x  # done\n" * 20
+
+
+def run_engine(backend, text=TEXT, **kwargs):
+    engine = TypingEngine(backend)
+    results = []
+    engine.on_complete = lambda success, message: results.append((success, message))
+    engine.run(text, 0, None, settle_delay=0, **kwargs)
+    return engine, results
+
+
+def test_types_text_exactly():
+    backend = RecordingBackend()
+    engine, results = run_engine(backend)
+    assert backend.text == TEXT
+    assert engine.typed == engine.total == len(TEXT)
+    assert results[0][0] is True
+
+
+def test_untypeable_characters_are_skipped():
+    backend = RecordingBackend()
+    engine, results = run_engine(backend, "a\x00b\x1bc")
+    assert backend.text == "abc"
+    assert engine.typed == 5
+    assert results[0][0] is True
+
+
+def test_rejected_key_is_skipped_without_duplicates():
+    class Rejecting(RecordingBackend):
+        def send_keys(self, keys):
+            if "x" in keys:
+                sent = keys.index("x")
+                self.events.append((self.clock(), "".join(keys[:sent])))
+                return sent
+            return super().send_keys(keys)
+
+        def type(self, text):
+            if "x" in text:
+                return False
+            return super().type(text)
+
+    backend = Rejecting()
+    engine = TypingEngine(backend)
+    engine.burst_mode = "words"
+    engine.run("max axe box " * 3, 0, None, settle_delay=0)
+    assert backend.text == ("ma ae bo " * 3)
+
+
+def test_progress_hook_reaches_total():
+    engine = TypingEngine(NullBackend())
+    progress = []
+    engine.on_progress = lambda typed, total: progress.append((typed, total))
+    engine.run(TEXT, 0, None, settle_delay=0)
+    assert progress[-1] == (len(TEXT), len(TEXT))
+    assert progress == sorted(progress)
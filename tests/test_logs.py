@@ -0,0 +1,54 @@
+"""Queued, rotating log file"""
+
+import logging
+import logging.handlers
+import threading
+
+import pytest
+
+from app import logs
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    root = logging.getLogger()
+    saved = root.handlers[:], root.level
+    yield tmp_path
+    logs.stop_logging()
+    root.handlers[:], root.level = saved[0], saved[1]
+
+
+def test_records_reach_the_file_through_the_queue(home):
+    path = logs.setup_logging(console=False, name="test.log")
+    assert path == home / ".acheiria" / "test.log"
+    root = logging.getLogger()
+    assert [type(h) for h in root.handlers] == [logging.handlers.QueueHandler]
+
+    written = []
+    handler = logs._listener.handlers[0]
+    emit = handler.emit
+    handler.emit = lambda record: written.append(threading.current_thread()) or emit(record)
+    logging.getLogger("app.test").info("hello from a test")
+    logs.stop_logging()
+
+    assert "hello from a test" in path.read_text()
+    # Written by the listener, not the logging thread
+    assert written and written[0] is not threading.current_thread()
+
+
+def test_setup_is_idempotent(home):
+    first = logs.setup_logging(console=False, name="test.log")
+    listener = logs._listener
+    assert logs.setup_logging(console=False, name="test.log") == first
+    assert logs._listener is listener
+
+
+def test_file_rotates(home, monkeypatch):
+    monkeypatch.setattr(logs, "LOG_MAX_BYTES", 2000)
+    path = logs.setup_logging(console=False, name="test.log")
+    for n in range(200):
+        logging.getLogger("app.test").info(f"line {n:04d} " + "x" * 40)
+    logs.stop_logging()
+    assert path.with_name("test.log.1").exists()
+    assert not path.with_name(f"test.log.{logs.LOG_BACKUPS + 1}").exists()
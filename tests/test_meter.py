@@ -0,0 +1,46 @@
+import json
+
+from app.meter import UpdateMeter
+
+
+class FakeConnection:
+    def __init__(self):
+        self.batches = []
+
+    def send_commands(self, session_id, commands):
+        self.batches.append(commands)
+
+
+class FakePage:
+    def __init__(self):
+        self._Page__conn = FakeConnection()
+
+    def update(self, *controls):
+        # Flet sends a batch on every update, empty when nothing changed
+        self._Page__conn.send_commands("session", [c for c in controls if c])
+
+
+def metered_page():
+    page = FakePage()
+    meter = UpdateMeter(page)
+    meter.encoder = json.JSONEncoder
+    meter.install()
+    return page, meter
+
+
+def test_empty_batches_are_not_messages():
+    page, meter = metered_page()
+    page.update()
+    page.update("set")
+    page.update(None)
+    stats = meter.snapshot()
+    assert stats["updates"] == 3
+    assert stats["messages"] == 1
+    assert stats["callers"] == {"test_empty_batches_are_not_messages": 3}
+
+
+def test_bytes_use_the_encoder():
+    page, meter = metered_page()
+    page.update("abc")
+    assert meter.snapshot()["bytes"] == len('["abc"]')
+    assert page._Page__conn.batches == [["abc"]]
@@ -0,0 +1,66 @@
+"""Deadline pacing against a simulated clock"""
+
+import pytest
+
+from app.pacing import JITTER_FACTORS, JITTER_PERIOD, DeadlineScheduler, jitter_offset
+
+from conftest import FakeClock
+
+
+def scheduler(cps, clock, max_catchup=0.25):
+    return DeadlineScheduler(cps, max_catchup, clock=clock, sleep=clock.sleep)
+
+
+def test_jitter_averages_to_target_rate():
+    assert sum(JITTER_FACTORS) == pytest.approx(JITTER_PERIOD)
+    assert jitter_offset(3 * JITTER_PERIOD) == pytest.approx(3 * JITTER_PERIOD)
+    assert jitter_offset(JITTER_PERIOD + 7) == pytest.approx(JITTER_PERIOD + jitter_offset(7))
+
+
+def test_deadlines_do_not_drift_with_sleep_overshoot():
+    clock = FakeClock(overshoot=0.002)
+    pacer = scheduler(50, clock)
+    pacer.start()
+    start = clock.now
+    for n in range(1, 3 * JITTER_PERIOD + 1):
+        pacer.wait()
+        assert pacer.next_deadline() == pytest.approx(start + jitter_offset(n) / 50)
+
+
+def test_lateness_within_catchup_is_made_up(clock):
+    pacer = scheduler(10, clock, max_catchup=0.25)
+    pacer.wait()
+    due = pacer.next_deadline()
+    clock.now = due + 0.1
+    assert pacer.wait() == pytest.approx(0.1)
+    assert pacer.forgiven == 0
+    # The next key is still due on the original schedule
+    assert pacer.next_deadline() == pytest.approx(due + (jitter_offset(2) - jitter_offset(1)) / 10)
+
+
+def test_stall_is_forgiven_beyond_catchup(clock):
+    pacer = scheduler(10, clock, max_catchup=0.25)
+    pacer.wait()
+    clock.now += 5.0
+    assert pacer.wait() == pytest.approx(0.25)
+    assert pacer.forgiven == pytest.approx(5.0 - 0.25 - jitter_offset(1) / 10)
+
+
+def test_run_of_keys_advances_by_its_count(clock):
+    pacer = scheduler(10, clock)
+    pacer.wait(count=5)
+    assert pacer.scheduled == 5
+    assert pacer.next_deadline() == pytest.approx(clock.now + jitter_offset(5) / 10)
+
+
+def test_achieved_rate_matches_target(clock):
+    pacer = scheduler(25, clock)
+    for _ in range(4 * JITTER_PERIOD):
+        pacer.wait()
+    # The last key was sent at its deadline, one step short of the next
+    assert pacer.achieved_cps(4 * JITTER_PERIOD - 1) == pytest.approx(25, rel=0.02)
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        DeadlineScheduler(0)
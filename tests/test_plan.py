@@ -0,0 +1,91 @@
+"""Compiled plans report exact source offsets"""
+
+from app.backends import RecordingBackend
+from app.plan import KeyTable, compile_plan
+
+
+def compile_all(pieces, **kwargs):
+    skipped = {}
+    chunks = list(compile_plan(iter(pieces), KeyTable(RecordingBackend()), skipped, **kwargs))
+    return chunks, skipped
+
+
+def test_offsets_and_chars_per_keystroke():
+    # Three units per character, as a multi-byte file source would report
+    chunks, _ = compile_all([("abc", 9), ("de", 6)])
+    chunk, = chunks
+    assert list(chunk.offsets) == [3, 6, 9, 12, 15]
+    assert list(chunk.chars) == [1, 2, 3, 4, 5]
+
+
+def test_empty_piece_advances_offset():
+    chunks, _ = compile_all([("", 7), ("xy", 2)], start_chars=5)
+    chunk, = chunks
+    assert list(chunk.offsets) == [8, 9]
+    # start_chars already covers the skipped text
+    assert list(chunk.chars) == [6, 7]
+
+
+def test_preprocessed_piece_maps_to_source_chars():
+    # "\n" standing for a CRLF: two source characters and units
+    chunks, _ = compile_all([("ab", 2), ("", 1, 1), ("\n", 1, 1)])
+    chunk, = chunks
+    assert list(chunk.offsets) == [1, 2, 4]
+    assert list(chunk.chars) == [1, 2, 4]
+
+
+def test_untypeable_run_folds_into_previous():
+    chunks, skipped = compile_all([("a\x00b", 3)])
+    chunk, = chunks
+    assert skipped == {"\x00": 1}
+    assert chunk.skipped == 1
+    assert list(chunk.bounds) == [1, 2]
+    assert list(chunk.offsets) == [2, 3]
+
+
+def test_chunks_split_at_chunk_size():
+    chunks, _ = compile_all([("x" * 25, 25)], chunk_size=10)
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert chunks[-1].offsets[-1] == 25
+
+
+class CountingBackend(RecordingBackend):
+    def __init__(self):
+        super().__init__()
+        self.translated = []
+
+    def translate(self, char):
+        self.translated.append(char)
+        return super().translate(char)
+
+
+def test_key_table_translates_each_character_once():
+    backend = CountingBackend()
+    table = KeyTable(backend)
+    list(compile_plan(iter([("abab\x00\x00", 6)]), table, {}))
+    list(compile_plan(iter([("ba\x00", 3)]), table, {}))
+    assert sorted(backend.translated) == ["\x00", "a", "b"]
+    assert table.lookup("a") == table.ids["a"]
+    assert table.lookup("\x00") == -1
+
+
+def test_failed_key_becomes_untypeable():
+    table = KeyTable(RecordingBackend())
+    key_id = table.lookup("q")
+    table.mark_failed(key_id)
+    assert table.keys[key_id] is None
+    assert table.lookup("q") == -1
+
+
+def test_compiles_lazily():
+    consumed = []
+
+    def pieces():
+        for n in range(100):
+            consumed.append(n)
+            yield "x" * 10, 10
+
+    compiler = compile_plan(pieces(), KeyTable(RecordingBackend()), {}, chunk_size=25)
+    first = next(compiler)
+    assert len(first) == 25
+    assert len(consumed) < 5
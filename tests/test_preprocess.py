@@ -0,0 +1,102 @@
+"""Preprocessed runs stop and resume at exact source offsets"""
+
+import pytest
+
+from app.backends import RecordingBackend
+from app.engine import TypingEngine
+from app.preprocess import FORWARD_DELETE, AutoPairStage, TabIndentStage, create_pipeline
+from app.sources import MappedFileSource, StringSource
+
+CASES = [
+    ("a\r\n" * 1000 + "bbbbbbbbb\r\n" * 1000, ["crlf"], 3000),
+    ("        x\n" * 1000 + "y\n" * 1000, ["strip-indent"], 10000),
+    ("    def f(x):\r\n        return (x\r\n    )\r\n" * 300, ["crlf", "tabs", "autopair"], None),
+    ("plain text, nothing to rewrite\n" * 200, ["crlf"], None),
+    ("no preprocessing at all\n" * 200, [], None),
+]
+
+
+@pytest.mark.parametrize("text, names, expected", CASES,
+                         ids=["crlf", "strip-indent", "mixed", "unchanged", "none"])
+def test_stop_and_resume_is_exact(text, names, expected, type_text):
+    full, _ = type_text(text, names)
+    first, engine = type_text(text, names, stop_after=2000)
+    assert len(first) == 2000
+    if expected is not None:
+        assert engine.chars_typed == expected
+    rest, _ = type_text(text, names, start_chars=engine.chars_typed)
+    assert first + rest == full
+
+
+@pytest.mark.parametrize("names", [["crlf"], ["strip-indent"], ["crlf", "tabs", "autopair"],
+                                   ["tabs", "strip-indent", "autopair"]])
+def test_resume_after_every_keystroke(names, type_text):
+    text = "      x = (a, [b,\r\n  c   d\r\n\tf(((\n\t\t}\n  y =    z\n  last ("
+    full, _ = type_text(text, names)
+    for stop_after in range(1, len(full)):
+        first, engine = type_text(text, names, stop_after=stop_after)
+        assert first == full[:stop_after]
+        rest, _ = type_text(text, names, start_chars=engine.chars_typed)
+        if first.endswith(FORWARD_DELETE) and rest.startswith(FORWARD_DELETE):
+            # A delete right at the resume point is sent again; with the
+            # cursor at the end of the document it deletes nothing
+            rest = rest[1:]
+        assert first + rest == full, stop_after
+
+
+def test_offsets_are_exact_at_every_line_end():
+    text = "    indented\r\n" + "x" * 50 + "\r\n" + "\tmore\n"
+    pipeline = create_pipeline(["crlf", "strip-indent"])
+    chars = units = 0
+    ends = []
+    for piece, piece_units, piece_chars in pipeline.run(StringSource(text).iter_pieces()):
+        chars += piece_chars
+        units += piece_units
+        if piece.endswith("\n"):
+            ends.append(chars)
+    assert ends == [14, 66, 72]
+    assert chars == units == len(text)
+
+
+def test_file_source_resumes_at_exact_bytes(tmp_path, type_text):
+    text = "  héllo wörld\r\n" * 500
+    path = tmp_path / "notes.txt"
+    path.write_bytes(text.encode("utf-8"))
+    source = MappedFileSource(path, block_size=997)
+    full, _ = type_text(source, ["crlf", "strip-indent"])
+    first, engine = type_text(source, ["crlf", "strip-indent"], stop_after=1500)
+    rest, _ = type_text(source, ["crlf", "strip-indent"], start_chars=engine.chars_typed)
+    assert first + rest == full
+    # Progress is in bytes and ends on the file size
+    assert engine.typed <= source.total
+
+
+def test_turbo_pastes_skip_editor_stages():
+    text = "    def f(x):\r\n        return (x,\r\n            1)\r\n"
+    backend = RecordingBackend()
+    engine = TypingEngine(backend)
+    engine.turbo_backend = backend
+    engine.preprocess = create_pipeline(["crlf", "tabs", "strip-indent", "autopair"])
+    engine.run(text, 0, None, settle_delay=0, turbo_chunk=16)
+    assert backend.text == text.replace("\r\n", "\n")
+    assert engine.chars_typed == len(text)
+
+
+def test_stages_rewrite_lines():
+    pipeline = create_pipeline(["crlf", "tabs"], tab_width=4)
+    pieces = pipeline.run(iter([("         x = 1\r\n", 16)]))
+    assert "".join(text for text, _, _ in pieces) == "\t\t x = 1\n"
+    assert pipeline.report() == {"crlf": 1, "tabs": 6}
+    assert TabIndentStage(4).line("  y\n", True) == "  y\n"
+
+
+def test_autopair_deletes_closers_for_open_brackets():
+    stage = AutoPairStage()
+    assert stage.line("f(x)\n", True) == "f(x)\n"
+    assert stage.line("f(a, [\n", True) == "f(" + FORWARD_DELETE + "a, [" + FORWARD_DELETE + "\n"
+
+
+def test_unknown_stage_is_rejected():
+    assert create_pipeline([]) is None
+    with pytest.raises(ValueError):
+        create_pipeline(["crlf", "nope"])
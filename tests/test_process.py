@@ -0,0 +1,74 @@
+"""The child typing process, driven through EngineProcess"""
+
+from app.process import FIELDS, REMAINING, STAMP, EngineProcess, ProgressBlock
+
+
+def test_types_in_child_process():
+    engine = EngineProcess("null")
+    results = []
+    engine.on_complete = lambda success, message: results.append(success)
+    try:
+        engine.run("hello world", 0, None, settle_delay=0)
+    finally:
+        engine.close()
+    assert results == [True]
+
+
+def test_run_fails_when_child_is_gone():
+    engine = EngineProcess("null")
+    results = []
+    engine.on_complete = lambda success, message: results.append((success, message))
+    engine._send = lambda command: False
+    try:
+        engine.run("hello world", 0, None, settle_delay=0)
+    finally:
+        engine._proc.kill()
+        engine.close()
+    assert results == [(False, "error: typing process is not running")]
+
+
+def test_remaining_time_holds_while_paused():
+    now = [100.0]
+    engine = EngineProcess("null", clock=lambda: now[0])
+    values = [float("nan")] * (FIELDS - 1)
+    values[REMAINING - 1] = 60.0
+    values[STAMP - 1] = 100.0
+    engine._values = lambda: tuple(values)
+    now[0] = 110.0
+    assert engine.remaining_time() == 50.0
+    engine.is_paused = True
+    assert engine.remaining_time() == 60.0
+
+
+def test_block_is_shared_between_mappings():
+    writer = ProgressBlock.create()
+    reader = ProgressBlock(writer.path)
+    try:
+        values = tuple(float(n) for n in range(FIELDS - 1))
+        writer.write(values)
+        assert reader.read() == values
+    finally:
+        reader.close()
+        writer.close(unlink=True)
+    assert not writer.path.exists()
+
+
+def test_resume_offset_is_published_before_the_child_starts():
+    engine = EngineProcess("null")
+    engine._send = lambda command: False
+    try:
+        engine.run("hello world", 0, None, settle_delay=0, start_chars=6, start_offset=6)
+        assert engine.typed == 6
+        assert engine.chars_typed == 6
+    finally:
+        engine._proc.kill()
+        engine.close()
+
+
+def test_resumed_run_finishes_the_source():
+    engine = EngineProcess("null")
+    try:
+        engine.run("hello world", 0, None, settle_delay=0, start_chars=6, start_offset=6)
+        assert (engine.typed, engine.chars_typed, engine.total) == (11, 11, 11)
+    finally:
+        engine.close()
@@ -0,0 +1,56 @@
+"""UIPublisher coalesces state into one page update per frame"""
+
+import threading
+
+from app.publisher import UIPublisher
+
+
+class FakePage:
+    def __init__(self):
+        self.updates = []
+        self.sent = threading.Event()
+
+    def update(self, *controls):
+        self.updates.append(controls)
+        self.sent.set()
+
+
+def test_frames_with_no_changes_send_nothing():
+    page = FakePage()
+    changed = []
+    publisher = UIPublisher(page, lambda: changed)
+    publisher.publish()
+    assert page.updates == []
+    changed[:] = ["bar", "label"]
+    publisher.publish()
+    assert page.updates == [("bar", "label")]
+    assert publisher.frames == 1
+
+
+def test_render_errors_are_contained():
+    page = FakePage()
+
+    def render():
+        raise RuntimeError("control gone")
+
+    publisher = UIPublisher(page, render)
+    publisher.publish()
+    assert page.updates == []
+
+
+def test_rate_is_clamped():
+    assert UIPublisher(FakePage(), list, rate_hz=1000).interval == 1 / 60
+    assert UIPublisher(FakePage(), list, rate_hz=0).interval == 1.0
+
+
+def test_loop_publishes_and_stop_flushes():
+    page = FakePage()
+    state = {"value": 0}
+    publisher = UIPublisher(page, lambda: [state["value"]], rate_hz=60)
+    publisher.start()
+    assert publisher.running
+    assert page.sent.wait(2)
+    state["value"] = 42
+    publisher.stop()
+    assert not publisher.running
+    assert page.updates[-1] == (42,)
@@ -0,0 +1,66 @@
+"""Closed-loop rate control and the EWMA ETA"""
+
+import pytest
+
+from app.pacing import MAX_RATE_TRIM, DeadlineScheduler, RateController, RateEstimator, jitter_offset
+
+from conftest import FakeClock
+
+
+def test_set_rate_keeps_next_deadline(clock):
+    pacer = DeadlineScheduler(10, clock=clock, sleep=clock.sleep)
+    for _ in range(7):
+        pacer.wait()
+    due = pacer.next_deadline()
+    pacer.set_rate(40)
+    assert pacer.next_deadline() == pytest.approx(due)
+    pacer.wait()
+    step = jitter_offset(8) - jitter_offset(7)
+    assert pacer.next_deadline() == pytest.approx(due + step / 40)
+
+
+def run_with_stalls(cps, seconds, stall, every, control=True):
+    """Type for ``seconds`` into an app that hangs for ``stall`` every ``every`` keys"""
+    clock = FakeClock()
+    pacer = DeadlineScheduler(cps, 0.0, clock=clock, sleep=clock.sleep)
+    controller = RateController(pacer) if control else None
+    pacer.start()
+    start = clock.now
+    keys = 0
+    while clock.now - start < seconds:
+        pacer.wait()
+        keys += 1
+        if keys % every == 0:
+            clock.now += stall
+        if controller is not None:
+            controller.update()
+    return controller, keys / (clock.now - start)
+
+
+def test_controller_makes_up_for_forgiven_stalls():
+    _, sagging = run_with_stalls(20, 60, 0.5, 40, control=False)
+    assert sagging < 0.85 * 20
+    controller, achieved = run_with_stalls(20, 60, 0.5, 40)
+    assert controller.multiplier > 1.0
+    assert achieved == pytest.approx(20, rel=0.05)
+
+
+def test_trim_is_bounded():
+    # Stalls this long can't be made up within the trim
+    controller, achieved = run_with_stalls(20, 60, 2.0, 20)
+    assert controller.multiplier == pytest.approx(1 + MAX_RATE_TRIM, abs=0.01)
+    assert achieved < 20
+
+
+def test_estimator_converges_on_observed_rate():
+    estimator = RateEstimator(initial_rate=10)
+    for second in range(1, 60):
+        estimator.update(second, second * 5)
+    assert estimator.rate == pytest.approx(5, rel=0.05)
+    assert estimator.remaining(50) == pytest.approx(10, rel=0.05)
+
+
+def test_estimator_ignores_short_samples():
+    estimator = RateEstimator(initial_rate=10)
+    estimator.update(1.0, 10)
+    assert estimator.update(1.01, 500) == 10
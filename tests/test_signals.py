@@ -0,0 +1,78 @@
+"""Pause and stop through events: instant reaction, no polling"""
+
+import threading
+import time
+
+from app.backends import RecordingBackend
+from app.engine import TypingEngine
+
+TEXT = "pause and stop " * 10
+
+
+class PausingBackend(RecordingBackend):
+    """Pauses the engine once ``at`` keys were sent, then runs ``then``"""
+
+    def __init__(self, at, then):
+        super().__init__()
+        self.at = at
+        self.then = then
+        self.engine = None
+        self.paused_at = None
+
+    def send_key(self, key):
+        super().type(key)
+        if self.paused_at is None and len(self.text) == self.at:
+            self.paused_at = len(self.text)
+            self.engine.pause()
+            threading.Thread(target=self.then, daemon=True).start()
+        return True
+
+
+def run_paused(then):
+    backend = PausingBackend(10, lambda: then(engine))
+    engine = backend.engine = TypingEngine(backend)
+    results = []
+    engine.on_complete = lambda success, message: results.append(success)
+    started = time.monotonic()
+    engine.run(TEXT, 0, 3000, settle_delay=0)
+    return backend, engine, results, time.monotonic() - started
+
+
+def test_resume_continues_where_it_paused():
+    def resume_later(engine):
+        time.sleep(0.2)
+        assert engine.is_paused and engine.typed == 10
+        engine.resume()
+
+    backend, engine, results, _ = run_paused(resume_later)
+    assert results == [True]
+    assert backend.text == TEXT
+
+
+def test_stop_while_paused_ends_at_once():
+    def stop_later(engine):
+        time.sleep(0.1)
+        engine.stop()
+
+    backend, engine, results, seconds = run_paused(stop_later)
+    assert results == [False]
+    assert backend.text == TEXT[:10]
+    assert seconds < 1.0
+
+
+def test_stop_interrupts_countdown():
+    engine = TypingEngine(RecordingBackend())
+    threading.Timer(0.1, engine.stop).start()
+    started = time.monotonic()
+    engine.run(TEXT, 5, 600)
+    assert time.monotonic() - started < 1.0
+    assert engine.typed == 0
+
+
+def test_prepare_clears_an_earlier_stop():
+    backend = RecordingBackend()
+    engine = TypingEngine(backend)
+    engine.stop()
+    engine.prepare()
+    engine.run("ok", 0, None, settle_delay=0)
+    assert backend.text == "ok"
@@ -0,0 +1,68 @@
+"""Text sources stream pieces whose units add up exactly"""
+
+import pytest
+
+from app.sources import MappedFileSource, StringSource, format_size
+
+TEXT = "héllo wörld → ünïcode ✓\n" * 40
+
+
+@pytest.fixture
+def mapped(tmp_path):
+    path = tmp_path / "text.txt"
+    path.write_bytes(TEXT.encode("utf-8"))
+    # Blocks that split multi-byte characters
+    return MappedFileSource(path, block_size=7)
+
+
+def test_units_sum_to_file_size(mapped):
+    pieces = list(mapped.iter_pieces())
+    assert "".join(text for text, _ in pieces) == TEXT
+    assert sum(units for _, units in pieces) == mapped.total
+
+
+def test_file_streams_like_a_string(mapped):
+    # Same text and fingerprint, whichever way the source was read
+    assert mapped.fingerprint() == StringSource(TEXT).fingerprint()
+    assert mapped.unit == "bytes"
+    assert mapped.describe() == f"text.txt ({format_size(mapped.total)})"
+
+
+def test_excerpt_skips_partial_character(mapped):
+    assert mapped.excerpt(0, 5) == "héllo"
+    # Byte 2 is inside the "é"
+    assert mapped.excerpt(2, 4) == "llo "
+
+
+def test_empty_file_yields_nothing(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    source = MappedFileSource(path)
+    assert source.total == 0
+    assert list(source.iter_pieces()) == []
+
+
+def test_format_size():
+    assert format_size(512) == "512 B"
+    assert format_size(1536) == "1.5 KB"
+    assert format_size(3 * 1024 ** 3) == "3.0 GB"
+
+
+def test_skip_resumes_at_exact_byte_offset(mapped):
+    for skip in range(len(TEXT) + 1):
+        pieces = list(mapped.iter_pieces(skip))
+        assert "".join(text for text, _ in pieces) == TEXT[skip:]
+        assert sum(units for _, units in pieces) == mapped.total
+        skipped = 0
+        for text, units in pieces:
+            if text:
+                break
+            skipped += units
+        assert skipped == len(TEXT[:skip].encode("utf-8")), skip
+
+
+def test_string_source_skip():
+    source = StringSource(TEXT)
+    pieces = list(source.iter_pieces(10))
+    assert "".join(text for text, _ in pieces) == TEXT[10:]
+    assert sum(units for _, units in pieces) == source.total
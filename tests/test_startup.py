@@ -0,0 +1,42 @@
+"""Startup profiling and lazy imports"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from app import startup
+
+
+@pytest.mark.parametrize("value, mode", [("", None), ("0", None), ("1", "report"), ("exit", "exit")])
+def test_profile_mode_from_environment(monkeypatch, value, mode):
+    monkeypatch.setenv(startup.PROFILE_ENV, value)
+    monkeypatch.setattr(sys, "argv", ["main.py"])
+    assert startup.profile_mode() == mode
+
+
+def test_marks_are_free_when_off(monkeypatch):
+    monkeypatch.delenv(startup.PROFILE_ENV, raising=False)
+    monkeypatch.setattr(sys, "argv", ["main.py"])
+    profile = startup.StartupProfile()
+    profile.mark("imports")
+    assert profile.marks == []
+    assert profile.finish() is None
+
+
+def test_report_is_saved(monkeypatch, tmp_path):
+    monkeypatch.setenv(startup.PROFILE_ENV, "1")
+    monkeypatch.setattr(startup, "report_path", lambda: tmp_path / "startup.json")
+    profile = startup.StartupProfile(started=0.0)
+    profile.mark("imports")
+    report = profile.finish()
+    assert json.loads((tmp_path / "startup.json").read_text())["marks"] == report["marks"]
+    assert "imports" in report["marks"]
+
+
+def test_headless_modules_import_no_gui_or_input_libraries():
+    code = ("import sys, app.cli, app.engine, app.process; "
+            "print(sorted(m for m in ('flet', 'pynput', 'pyperclip') if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]"
@@ -0,0 +1,39 @@
+"""Per-session keystroke telemetry"""
+
+import json
+
+import pytest
+
+from app.backends import RecordingBackend
+from app.engine import TypingEngine
+from app.telemetry import SessionTelemetry, histogram, percentile, summary_line
+
+
+def test_percentile_and_histogram():
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(50.5, abs=0.5)
+    assert percentile([], 90) == 0
+    counts = histogram([0.0005, 0.003, 0.5])
+    assert sum(counts.values()) == 3
+
+
+def test_session_report_is_written(tmp_path):
+    path = tmp_path / "report.json"
+    engine = TypingEngine(RecordingBackend())
+    engine.telemetry = SessionTelemetry(path)
+    engine.run("hello world " * 20, 0, None, settle_delay=0)
+    report = engine.telemetry.report
+    assert report is not None
+    assert json.loads(path.read_text()) == report
+    assert summary_line(report)
+
+
+def test_run_stopped_before_typing_has_no_report(tmp_path):
+    engine = TypingEngine(RecordingBackend())
+    engine.telemetry = SessionTelemetry(tmp_path / "report.json")
+    engine.run("hello", 0, None, settle_delay=0)
+    assert engine.telemetry.report is not None
+
+    engine.on_status = lambda text: engine.stop()
+    engine.run("hello", 1, None, settle_delay=0)
+    assert engine.telemetry.report is None
@@ -0,0 +1,36 @@
+"""Timing profiles keep the target rate"""
+
+from array import array
+
+import pytest
+
+from app.timing import PROFILES, char_class, create_profile
+
+TEXT = "def f(x):\n    return x, y. done\n" * 20
+
+
+def plan(text, run=3):
+    chars = sorted(set(text))
+    ids = array("I", (chars.index(c) for c in text))
+    classes = array("B", (char_class(c) for c in chars))
+    bounds = array("I", list(range(run, len(ids), run)) + [len(ids)])
+    return ids, bounds, classes
+
+
+@pytest.mark.parametrize("name", PROFILES)
+def test_profile_keeps_mean_interval(name):
+    ids, bounds, classes = plan(TEXT)
+    steps = create_profile(name, seed=7).steps(ids, bounds, 0, classes)
+    assert len(steps) == len(bounds)
+    assert all(step > 0 for step in steps)
+    if name != "sawtooth":
+        # Normalised per chunk; the sawtooth evens out over whole periods
+        assert sum(steps) == pytest.approx(len(ids))
+
+
+@pytest.mark.parametrize("name", ["uniform", "lognormal", "natural"])
+def test_random_profile_is_reproducible(name):
+    ids, bounds, classes = plan(TEXT)
+    first = create_profile(name, seed=3).steps(ids, bounds, 0, classes)
+    assert create_profile(name, seed=3).steps(ids, bounds, 0, classes) == first
+    assert create_profile(name, seed=4).steps(ids, bounds, 0, classes) != first
@@ -0,0 +1,91 @@
+"""Turbo mode: bulk text pasted through the clipboard in chunks"""
+
+import contextlib
+
+import pytest
+
+from app.backends import ClipboardBackend, RecordingBackend
+from app.engine import TypingEngine
+
+TEXT = "lorem ipsum dolor sit amet\n" * 30
+
+
+class SessionBackend(RecordingBackend):
+    def __init__(self):
+        super().__init__()
+        self.sessions = []
+
+    def begin_session(self):
+        self.sessions.append("begin")
+
+    def end_session(self):
+        self.sessions.append("end")
+
+
+class FakeClipboard:
+    def __init__(self, text):
+        self.text = text
+
+    def copy(self, text):
+        self.text = text
+
+    def paste(self):
+        return self.text
+
+
+class FakeController:
+    def __init__(self, clipboard):
+        self.clipboard = clipboard
+        self.pasted = []
+
+    @contextlib.contextmanager
+    def pressed(self, key):
+        yield
+
+    def press(self, key):
+        self.pasted.append(self.clipboard.text)
+
+    def release(self, key):
+        pass
+
+
+@pytest.fixture
+def clipboard_backend():
+    backend = ClipboardBackend.__new__(ClipboardBackend)
+    backend.clipboard = FakeClipboard("user's clipboard")
+    backend.controller = FakeController(backend.clipboard)
+    backend.modifier = "ctrl"
+    backend.paste_delay = 0
+    backend._saved = None
+    return backend
+
+
+def test_turbo_sends_chunks_through_turbo_backend():
+    keys, turbo = RecordingBackend(), SessionBackend()
+    engine = TypingEngine(keys)
+    engine.turbo_backend = turbo
+    engine.run(TEXT, 0, 60, settle_delay=0, turbo_chunk=100)
+    assert turbo.text == TEXT
+    assert [len(text) for _, text in turbo.events] == [100] * 8 + [10]
+    assert turbo.sessions == ["begin", "end"]
+    assert keys.events == []
+    assert engine.typed == len(TEXT)
+
+
+def test_turbo_needs_a_backend():
+    engine = TypingEngine(RecordingBackend())
+    with pytest.raises(ValueError):
+        engine.run(TEXT, 0, 60, turbo_chunk=100)
+
+
+def test_clipboard_is_restored_after_session(clipboard_backend):
+    clipboard_backend.begin_session()
+    assert clipboard_backend.send_keys(list("chunk")) == 5
+    assert clipboard_backend.controller.pasted == ["chunk"]
+    clipboard_backend.end_session()
+    assert clipboard_backend.clipboard.text == "user's clipboard"
+
+
+def test_paste_has_nothing_to_delete(clipboard_backend):
+    assert clipboard_backend.translate("\x7f") is None
+    assert clipboard_backend.translate("a") == "a"
@@ -0,0 +1,75 @@
+"""The persistent typing worker and its job queue"""
+
+import threading
+
+import pytest
+
+from app.backends import RecordingBackend
+from app.engine import TypingEngine
+from app.sources import StringSource
+from app.worker import JOB_DONE, JOB_QUEUED, JOB_STOPPED, TypingJob, TypingWorker
+
+
+@pytest.fixture
+def worker():
+    backend = RecordingBackend()
+    worker = TypingWorker(TypingEngine(backend))
+    worker.backend = backend
+    finished = []
+    done = threading.Event()
+
+    def on_finished(job, success, message):
+        finished.append((job.id, success))
+        if worker.held:
+            done.set()
+
+    worker.on_job_finished = on_finished
+    worker.finished, worker.done = finished, done
+    yield worker
+    worker.close()
+
+
+def job(text, countdown=0):
+    return TypingJob(StringSource(text), 6000, countdown)
+
+
+def test_jobs_wait_for_start_then_run_in_order(worker):
+    first, second = worker.submit(job("one ")), worker.submit(job("two"))
+    assert worker.pending == 2 and first.status == JOB_QUEUED
+    worker.start()
+    assert worker.done.wait(5)
+    assert worker.backend.text == "one two"
+    assert worker.finished == [(first.id, True), (second.id, True)]
+    assert first.status == second.status == JOB_DONE
+    # Drained: the worker holds until the next start
+    assert worker.held
+
+
+def test_reorder_and_remove(worker):
+    a, b, c = (worker.submit(job(text)) for text in "abc")
+    assert worker.move(c.id, -2)
+    assert not worker.move(c.id, -1)
+    assert worker.remove(b.id)
+    assert [queued.id for queued in worker.jobs()] == [c.id, a.id]
+    worker.start()
+    assert worker.done.wait(5)
+    assert worker.backend.text == "ca"
+
+
+def test_stop_holds_the_rest_of_the_queue(worker):
+    long_job = worker.submit(job("x", countdown=5))
+    rest = worker.submit(job("rest"))
+    worker.on_job_started = lambda started: worker.stop()
+    worker.start()
+    assert worker.done.wait(5)
+    assert long_job.status == JOB_STOPPED
+    assert worker.jobs() == [rest]
+    assert worker.backend.text == ""
+
+
+def test_estimated_duration():
+    assert job("x" * 500).estimated_duration == pytest.approx(1.0)
+    budgeted = TypingJob(StringSource("x" * 500), 60, budget=30)
+    assert budgeted.estimated_duration == 30
+    resumed = TypingJob(StringSource("x" * 500), 6000, start_offset=250)
+    assert resumed.estimated_duration == pytest.approx(0.5)